@@ -1,14 +1,28 @@
+import csv
+import io
+import json
 import logging
 import os
-from fastapi import FastAPI, Query, HTTPException, Depends, Header
+from contextlib import AsyncExitStack
+from time import perf_counter
+from fastapi import FastAPI, Query, HTTPException, Depends, Header, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from fastapi import BackgroundTasks
-from typing import Optional, List
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Dict, Optional, List
 from pydantic import BaseModel
-from src.database import get_db_connection, init_db  # Ensure init_db is called appropriately (e.g., on startup)
+from datetime import date, datetime, time, timedelta, timezone
+import asyncpg
+from src.config import API_EXPORT_CHUNK_SIZE
+from src.database import get_pool, init_db  # Ensure init_db is called appropriately (e.g., on startup)
+from src.jobs import Job, JobRunner
+from src.metrics import REGISTRY
 from src.scheduler import perform_scraping_and_analysis # Import the task function
-import psycopg2.extras # For DictCursor
+from . import db, search
+from .articles import articles_sql, newest_dated_sql, sort_group
+from .cache import cache_key, response_cache
+from .etag import current_watermark, etag_for, invalidate_watermark, not_modified, set_etag
+from .formats import ARROW_MEDIA_TYPE, COLUMNAR_MEDIA_TYPE, arrow_ipc, columnar_json, negotiate_format
+from .pagination import encode_cursor, decode_rank_cursor, encode_rank_cursor
 
 # --- Environment Variables ---
 # Expected: SCRAPER_API_SECRET (for securing the trigger endpoint)
@@ -18,12 +32,39 @@ SCRAPER_API_SECRET = os.getenv("SCRAPER_API_SECRET")
 app = FastAPI()
 
 # --- Middleware ---
+REQUEST_SECONDS = REGISTRY.histogram("dhanvani_http_request_seconds", "API request latency by route, up to the response headers.", ["method", "route", "status"])
+
+class RequestMetricsMiddleware:
+    """Records every request in dhanvani_http_request_seconds, labelled by route template rather than raw path."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = perf_counter()
+        status = 500
+
+        async def send_and_record(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                route = scope.get("route") # Set by the router once it has matched
+                REQUEST_SECONDS.labels(scope["method"], route.path if route else "unmatched", status).observe(perf_counter() - started)
+            await send(message)
+
+        await self.app(scope, receive, send_and_record)
+
+app.add_middleware(RequestMetricsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Since-Cursor", "ETag"],
 )
 
 # --- Pydantic Models ---
@@ -35,9 +76,26 @@ class Article(BaseModel):
     source: str
     sentiment_label: str
 
+class SearchResult(BaseModel):
+    id: int
+    title: str
+    url: str
+    published: Optional[str] = None
+    source: Optional[str] = None
+    sentiment_label: Optional[str] = None # Not yet scored
+    rank: float
+
+class TimeseriesPoint(BaseModel):
+    day: date
+    source: Optional[str] = None # Only set when grouped by source
+    sentiment_label: str
+    article_count: int
+    average_score: float
+
 class ScraperStatus(BaseModel):
     status: str
     message: str
+    job_id: Optional[str] = None # Poll /jobs/{job_id} for progress
 
 # --- Database Dependency ---
 # This ensures that init_db is called once when the application starts
@@ -48,57 +106,136 @@ async def startup_event():
     # init_db() # Call this to ensure tables are created.
     # Be cautious if your Supabase tables are managed entirely via Supabase UI/migrations.
     # If so, this call might be redundant or could be used to verify connection.
-    conn = get_db_connection()
-    if conn:
-        logging.info("Successfully connected to the database on startup.")
-        conn.close()
-    else:
-        logging.error("Failed to connect to the database on startup.")
+    await db.init_pool()
+    async with db.acquire() as conn:
+        if conn:
+            logging.info("Successfully connected to the database on startup.")
+        else:
+            logging.error("Failed to connect to the database on startup.")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    job_runner.shutdown()
+    await db.close_pool()
+    pool = get_pool() # Used by scraper runs started from this process
+    if pool is not None:
+        pool.closeall()
 
 
 # --- API Endpoints ---
 
+def _as_utc(value: datetime) -> datetime:
+    """Treat naive datetimes from query parameters as UTC."""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+def _article_filters(
+    params: db.QueryParams,
+    sentiment_label: Optional[str],
+    source: Optional[str],
+    published: Optional[date],
+    published_from: Optional[datetime],
+    published_to: Optional[datetime],
+) -> str:
+    """WHERE conditions shared by the article endpoints, each starting with AND."""
+    conditions = ""
+    if sentiment_label:
+        conditions += f" AND sentiment_label = {params.add(sentiment_label)}"
+    if source:
+        conditions += f" AND source = {params.add(source)}"
+    # Half-open ranges on the bare column, so the (..., published DESC, id DESC) indexes apply
+    if published:
+        day_start = datetime.combine(published, time.min, tzinfo=timezone.utc)
+        conditions += f" AND published >= {params.add(day_start)} AND published < {params.add(day_start + timedelta(days=1))}"
+    if published_from:
+        conditions += f" AND published >= {params.add(_as_utc(published_from))}"
+    if published_to:
+        conditions += f" AND published < {params.add(_as_utc(published_to))}"
+    return conditions
+
 @app.get("/articles", response_model=List[Article])
-def get_articles(
+async def get_articles(
+    request: Request,
+    response: Response,
     sentiment_label: Optional[str] = Query(None),
     source: Optional[str] = Query(None),
-    published: Optional[str] = Query(None, description="Format: YYYY-MM-DD"),
-    limit: int = Query(10000, ge=1, le=10000),
-    offset: int = Query(0, ge=0),
+    published: Optional[date] = Query(None, description="Format: YYYY-MM-DD (UTC day)"),
+    published_from: Optional[datetime] = Query(None, description="Published at or after this time (ISO 8601; UTC if no offset)"),
+    published_to: Optional[datetime] = Query(None, description="Published before this time (ISO 8601; UTC if no offset)"),
+    limit: int = Query(100, ge=1, le=10000),
+    offset: int = Query(0, ge=0, description="Deprecated: prefer the 'after' cursor"),
+    after: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    since: Optional[str] = Query(None, description="Cursor from the X-Since-Cursor header: only newer articles, oldest first"),
+    sort: Optional[str] = Query(None, pattern="^-?(published|source|sentiment_label)$", description="Column to order by, '-' for descending; default -published"),
+    format: Optional[str] = Query(None, pattern="^(json|columnar|arrow)$", description="Overrides the Accept header"),
+    accept: Optional[str] = Header(None),
 ):
-    conn = None
+    """
+    Articles, newest first.
+
+    Pages are walked with keyset pagination: when a page is full, its
+    X-Next-Cursor response header holds a cursor to pass back as `after` for
+    the next page. Every page costs the same, however deep.
+
+    sort=source or sort=sentiment_label (prefix '-' to reverse) groups by
+    that column, newest first within each group, and pages the same way.
+
+    X-Since-Cursor holds the newest dated article of the response. Passing
+    it back as `since` returns only articles newer than that, oldest first,
+    with a new X-Since-Cursor to continue from; this is how clients poll for
+    deltas. Articles without a published date are never returned that way.
+
+    format=columnar (or Accept: application/vnd.dhanvani.columnar+json)
+    returns one array per field, and format=arrow (or Accept:
+    application/vnd.apache.arrow.stream) an Arrow IPC stream; both skip
+    per-row model construction. Arrow needs pyarrow installed, else 406.
+    """
+    if after and since:
+        raise HTTPException(status_code=400, detail="Use either 'after' or 'since', not both")
+    if since and sort:
+        raise HTTPException(status_code=400, detail="'since' always returns the oldest new article first; drop 'sort'")
+    sort = sort or "-published"
+    group = sort_group(sort)
+    output = negotiate_format(format, accept)
+    etag = await etag_for(request, variant=output)
+    unchanged = not_modified(request, etag)
+    if unchanged:
+        return unchanged
+    set_etag(response, etag)
     try:
-        conn = get_db_connection()
-        if not conn:
-            raise HTTPException(status_code=503, detail="Database service unavailable")
+        async with db.acquire() as conn:
+            if not conn:
+                raise HTTPException(status_code=503, detail="Database service unavailable")
+
+            params = db.QueryParams()
+            conditions = _article_filters(params, sentiment_label, source, published, published_from, published_to)
+            query = articles_sql(params, conditions, sort, after or since, since=bool(since), limit=limit, offset=offset)
+            articles_db = await conn.fetch(query, *params.values)
+
+            # Undated rows sort first here but can never be polled from, so the cursor is the newest dated row
+            newest = None
+            if articles_db and sort == "-published" and not since:
+                newest = next((row for row in articles_db if row["published"] is not None), None)
+                if newest is None:
+                    params = db.QueryParams()
+                    conditions = _article_filters(params, sentiment_label, source, published, published_from, published_to)
+                    newest = await conn.fetchrow(newest_dated_sql(params, conditions), *params.values)
+
+        if since:
+            newest = articles_db[-1] if articles_db else None # Never undated: since pages leave those out
+            response.headers["X-Since-Cursor"] = encode_cursor(newest["published"], newest["id"]) if newest else since
+        else:
+            if newest is not None:
+                response.headers["X-Since-Cursor"] = encode_cursor(newest["published"], newest["id"])
+            if len(articles_db) == limit:
+                last = articles_db[-1]
+                group_value = (last[group],) if group else ()
+                response.headers["X-Next-Cursor"] = encode_cursor(last["published"], last["id"], *group_value)
+
+        if output == "columnar":
+            return Response(columnar_json(articles_db), media_type=COLUMNAR_MEDIA_TYPE, headers=dict(response.headers))
+        if output == "arrow":
+            return Response(arrow_ipc(articles_db), media_type=ARROW_MEDIA_TYPE, headers=dict(response.headers))
 
-        # Use DictCursor for dictionary-like row access
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-        query = "SELECT id, title, link, published, source, sentiment_label FROM stage.raw_articles WHERE 1=1" # Explicitly list columns
-        params = []
-
-        if sentiment_label == "": sentiment_label = None
-        if source == "": source = None
-
-        if sentiment_label:
-            query += " AND sentiment_label = %s"
-            params.append(sentiment_label)
-        if source:
-            query += " AND source = %s"
-            params.append(source)
-        if published:
-            # Ensure 'published' column is a date or timestamp type for efficient querying
-            # If it's TEXT, LIKE is okay. If TIMESTAMP, adjust query.
-            # Assuming 'published' is TIMESTAMP WITH TIME ZONE as per database.py change
-            query += " AND DATE(published) = %s" # Cast to DATE for YYYY-MM-DD comparison
-            params.append(published)
-
-        query += " ORDER BY published DESC LIMIT %s OFFSET %s"
-        params.extend([limit, offset])
-
-        cursor.execute(query, tuple(params)) # psycopg2 expects a tuple for params
-        articles_db = cursor.fetchall()
-        
         articles_list = [
             Article(
                 id=row["id"],
@@ -111,85 +248,408 @@ def get_articles(
         ]
         return articles_list
 
-    except psycopg2.Error as db_err:
+    except HTTPException:
+        raise
+    except asyncpg.PostgresError as db_err:
         logging.error(f"Database error in /articles: {db_err}")
         raise HTTPException(status_code=500, detail="Internal database error")
     except Exception as e:
         logging.error(f"Unexpected error in /articles: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if conn:
-            conn.close()
 
 
-@app.get("/sentiment-summary")
-def get_sentiment_summary():
-    conn = None
+@app.get("/search", response_model=List[SearchResult])
+async def search_articles(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description='Words, "quoted phrases", OR, -excluded and prefix* terms'),
+    sentiment_label: Optional[str] = Query(None),
+    source: Optional[str] = Query(None),
+    published: Optional[date] = Query(None, description="Format: YYYY-MM-DD (UTC day)"),
+    published_from: Optional[datetime] = Query(None, description="Published at or after this time (ISO 8601; UTC if no offset)"),
+    published_to: Optional[datetime] = Query(None, description="Published before this time (ISO 8601; UTC if no offset)"),
+    limit: int = Query(20, ge=1, le=100),
+    after: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+):
+    """
+    Full-text search over titles and summaries, best match first.
+
+    Matches in titles rank above matches in summaries. Pages are walked with
+    the X-Next-Cursor header like /articles, and take the same filters.
+    """
+    etag = await etag_for(request)
+    unchanged = not_modified(request, etag)
+    if unchanged:
+        return unchanged
+    set_etag(response, etag)
+    params = db.QueryParams()
+    tsquery = search.tsquery_sql(params, q)
+    if tsquery is None:
+        raise HTTPException(status_code=400, detail="The search query has no terms")
+    try:
+        async with db.acquire() as conn:
+            if not conn:
+                raise HTTPException(status_code=503, detail="Database service unavailable")
+
+            conditions = _article_filters(params, sentiment_label, source, published, published_from, published_to)
+            query = search.search_sql(params, tsquery, conditions, decode_rank_cursor(after) if after else None, limit)
+            rows = await conn.fetch(query, *params.values)
+
+        if len(rows) == limit:
+            response.headers["X-Next-Cursor"] = encode_rank_cursor(rows[-1]["rank"], rows[-1]["id"])
+        return [
+            SearchResult(
+                id=row["id"],
+                title=row["title"],
+                url=row["link"],
+                published=str(row["published"]) if row["published"] else None,
+                source=row["source"],
+                sentiment_label=row["sentiment_label"],
+                rank=row["rank"],
+            ) for row in rows
+        ]
+    except HTTPException:
+        raise
+    except asyncpg.PostgresError as db_err:
+        logging.error(f"Database error in /search: {db_err}")
+        raise HTTPException(status_code=500, detail="Internal database error")
+    except Exception as e:
+        logging.error(f"Unexpected error in /search: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+EXPORT_COLUMNS = ["id", "title", "url", "published", "source", "sentiment_label", "sentiment_score"]
+
+def _export_row(record: asyncpg.Record) -> list:
+    published = record["published"]
+    return [record["id"], record["title"], record["link"], published.isoformat() if published else None,
+            record["source"], record["sentiment_label"], record["sentiment_score"]]
+
+def _ndjson_chunk(rows: List[asyncpg.Record]) -> str:
+    return "".join(json.dumps(dict(zip(EXPORT_COLUMNS, _export_row(row))), ensure_ascii=False) + "\n" for row in rows)
+
+def _csv_chunk(rows: List[asyncpg.Record]) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(_export_row(row) for row in rows)
+    return buffer.getvalue()
+
+@app.get("/articles/export")
+async def export_articles(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    sentiment_label: Optional[str] = Query(None),
+    source: Optional[str] = Query(None),
+    published: Optional[date] = Query(None, description="Format: YYYY-MM-DD (UTC day)"),
+    published_from: Optional[datetime] = Query(None, description="Published at or after this time (ISO 8601; UTC if no offset)"),
+    published_to: Optional[datetime] = Query(None, description="Published before this time (ISO 8601; UTC if no offset)"),
+):
+    """
+    Every matching article, newest first, as NDJSON or CSV.
+
+    Rows are streamed from a server-side cursor, API_EXPORT_CHUNK_SIZE at a
+    time, inside one read-only repeatable-read transaction, so the export is
+    a consistent snapshot and memory use does not grow with its size.
+    """
+    params = db.QueryParams()
+    query = (
+        "SELECT id, title, link, published, source, sentiment_label, sentiment_score FROM stage.raw_articles WHERE 1=1"
+        + _article_filters(params, sentiment_label or None, source or None, published, published_from, published_to)
+        + " ORDER BY published DESC, id DESC"
+    )
+
+    # The connection is held until the stream finishes, so it is checked out here
+    # where a 503 can still be returned, and released by the generator
+    resources = AsyncExitStack()
     try:
-        conn = get_db_connection()
+        conn = await resources.enter_async_context(db.acquire())
         if not conn:
             raise HTTPException(status_code=503, detail="Database service unavailable")
-        
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-        cursor.execute(
-            """
-            SELECT sentiment_label, COUNT(*) as count
-            FROM stage.raw_articles
-            GROUP BY sentiment_label
-            """
-        )
-        results = cursor.fetchall()
-        return {row["sentiment_label"]: row["count"] for row in results}
-    except psycopg2.Error as db_err:
+        await resources.enter_async_context(conn.transaction(isolation="repeatable_read", readonly=True))
+        cursor = await conn.cursor(query, *params.values)
+    except HTTPException:
+        await resources.aclose()
+        raise
+    except asyncpg.PostgresError as db_err:
+        await resources.aclose()
+        logging.error(f"Database error in /articles/export: {db_err}")
+        raise HTTPException(status_code=500, detail="Internal database error")
+    except Exception as e:
+        await resources.aclose()
+        logging.error(f"Unexpected error in /articles/export: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    encode = _csv_chunk if format == "csv" else _ndjson_chunk
+
+    async def stream():
+        try:
+            if format == "csv":
+                yield ",".join(EXPORT_COLUMNS) + "\r\n"
+            while True:
+                rows = await cursor.fetch(API_EXPORT_CHUNK_SIZE)
+                if not rows:
+                    break
+                yield encode(rows)
+        except asyncpg.PostgresError as db_err:
+            # Headers are already sent; the client sees a truncated body
+            logging.error(f"Database error while streaming /articles/export: {db_err}")
+        finally:
+            await resources.aclose()
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        stream(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="articles.{format}"'},
+    )
+
+
+@app.get("/sentiment-summary")
+async def get_sentiment_summary(request: Request, response: Response):
+    etag = await etag_for(request)
+    unchanged = not_modified(request, etag)
+    if unchanged:
+        return unchanged
+    set_etag(response, etag)
+    key = cache_key("/sentiment-summary", watermark=await current_watermark())
+    cached = response_cache.get(key)
+    if cached is not None:
+        return cached
+    try:
+        async with db.acquire() as conn:
+            if not conn:
+                raise HTTPException(status_code=503, detail="Database service unavailable")
+
+            results = await conn.fetch(
+                """
+                SELECT sentiment_label, COUNT(*) as count
+                FROM stage.raw_articles
+                GROUP BY sentiment_label
+                """
+            )
+        summary = {row["sentiment_label"]: row["count"] for row in results}
+        response_cache.put(key, summary)
+        return summary
+    except HTTPException:
+        raise
+    except asyncpg.PostgresError as db_err:
         logging.error(f"Database error in /sentiment-summary: {db_err}")
         raise HTTPException(status_code=500, detail="Internal database error")
     except Exception as e:
         logging.error(f"Unexpected error in /sentiment-summary: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if conn:
-            conn.close()
+
+@app.get("/sentiment-timeseries", response_model=List[TimeseriesPoint])
+async def get_sentiment_timeseries(
+    request: Request,
+    response: Response,
+    start: Optional[date] = Query(None, description="First day (UTC), inclusive"),
+    end: Optional[date] = Query(None, description="Last day (UTC), inclusive"),
+    source: Optional[str] = Query(None),
+    sentiment_label: Optional[str] = Query(None),
+    by_source: bool = Query(False, description="Return one series per source instead of totals"),
+):
+    """Daily article counts and average score per sentiment label, read from the stage.sentiment_daily rollup."""
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    etag = await etag_for(request, rollup=True)
+    unchanged = not_modified(request, etag)
+    if unchanged:
+        return unchanged
+    set_etag(response, etag)
+    key = cache_key("/sentiment-timeseries", watermark=await current_watermark(rollup=True), start=start, end=end, source=source or None, sentiment_label=sentiment_label or None, by_source=by_source)
+    cached = response_cache.get(key)
+    if cached is not None:
+        return cached
+    try:
+        async with db.acquire() as conn:
+            if not conn:
+                raise HTTPException(status_code=503, detail="Database service unavailable")
+
+            params = db.QueryParams()
+            group = "day, source, sentiment_label" if by_source else "day, sentiment_label"
+            query = f"SELECT {group}, SUM(article_count)::bigint AS article_count, SUM(score_sum) AS score_sum FROM stage.sentiment_daily WHERE 1=1"
+            if start:
+                query += f" AND day >= {params.add(start)}"
+            if end:
+                query += f" AND day <= {params.add(end)}"
+            if source:
+                query += f" AND source = {params.add(source)}"
+            if sentiment_label:
+                query += f" AND sentiment_label = {params.add(sentiment_label)}"
+            query += f" GROUP BY {group} ORDER BY {group}"
+
+            rows = await conn.fetch(query, *params.values)
+        points = [
+            TimeseriesPoint(
+                day=row["day"],
+                source=row["source"] if by_source else None,
+                sentiment_label=row["sentiment_label"],
+                article_count=row["article_count"],
+                average_score=row["score_sum"] / row["article_count"],
+            ) for row in rows
+        ]
+        response_cache.put(key, points)
+        return points
+    except HTTPException:
+        raise
+    except asyncpg.PostgresError as db_err:
+        logging.error(f"Database error in /sentiment-timeseries: {db_err}")
+        raise HTTPException(status_code=500, detail="Internal database error")
+    except Exception as e:
+        logging.error(f"Unexpected error in /sentiment-timeseries: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/word-frequencies", response_model=Dict[str, int])
+async def get_word_frequencies(
+    request: Request,
+    response: Response,
+    start: Optional[date] = Query(None, description="First day (UTC), inclusive"),
+    end: Optional[date] = Query(None, description="Last day (UTC), inclusive"),
+    source: Optional[str] = Query(None),
+    sentiment_label: Optional[str] = Query(None),
+    limit: int = Query(200, ge=1, le=1000, description="Most frequent words to return"),
+):
+    """The most frequent title words of the matching articles, most frequent first, read from the stage.word_daily buckets."""
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    etag = await etag_for(request, rollup=True)
+    unchanged = not_modified(request, etag)
+    if unchanged:
+        return unchanged
+    set_etag(response, etag)
+    key = cache_key("/word-frequencies", watermark=await current_watermark(rollup=True), start=start, end=end, source=source or None, sentiment_label=sentiment_label or None, limit=limit)
+    cached = response_cache.get(key)
+    if cached is not None:
+        return cached
+    try:
+        async with db.acquire() as conn:
+            if not conn:
+                raise HTTPException(status_code=503, detail="Database service unavailable")
+
+            params = db.QueryParams()
+            query = "SELECT word, SUM(occurrences)::bigint AS occurrences FROM stage.word_daily WHERE 1=1"
+            if start:
+                query += f" AND day >= {params.add(start)}"
+            if end:
+                query += f" AND day <= {params.add(end)}"
+            if source:
+                query += f" AND source = {params.add(source)}"
+            if sentiment_label:
+                query += f" AND sentiment_label = {params.add(sentiment_label)}"
+            query += f" GROUP BY word ORDER BY occurrences DESC, word LIMIT {params.add(limit)}"
+
+            rows = await conn.fetch(query, *params.values)
+        frequencies = {row["word"]: row["occurrences"] for row in rows}
+        response_cache.put(key, frequencies)
+        return frequencies
+    except HTTPException:
+        raise
+    except asyncpg.PostgresError as db_err:
+        logging.error(f"Database error in /word-frequencies: {db_err}")
+        raise HTTPException(status_code=500, detail="Internal database error")
+    except Exception as e:
+        logging.error(f"Unexpected error in /word-frequencies: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/sources", response_model=List[str])
-def get_all_sources():
-    conn = None
+async def get_all_sources(request: Request, response: Response):
+    etag = await etag_for(request)
+    unchanged = not_modified(request, etag)
+    if unchanged:
+        return unchanged
+    set_etag(response, etag)
+    key = cache_key("/sources", watermark=await current_watermark())
+    cached = response_cache.get(key)
+    if cached is not None:
+        return cached
     try:
-        conn = get_db_connection()
-        if not conn:
-            raise HTTPException(status_code=503, detail="Database service unavailable")
+        async with db.acquire() as conn:
+            if not conn:
+                raise HTTPException(status_code=503, detail="Database service unavailable")
 
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-        cursor.execute("SELECT DISTINCT source FROM stage.raw_articles WHERE source IS NOT NULL AND source != '' ORDER BY source")
-        sources = [row["source"] for row in cursor.fetchall()]
+            rows = await conn.fetch("SELECT DISTINCT source FROM stage.raw_articles WHERE source IS NOT NULL AND source != '' ORDER BY source")
         # DISTINCT and ORDER BY in SQL should handle deduplication and sorting
+        sources = [row["source"] for row in rows]
+        response_cache.put(key, sources)
         return sources
-    except psycopg2.Error as db_err:
+    except HTTPException:
+        raise
+    except asyncpg.PostgresError as db_err:
         logging.error(f"Database error in /sources: {db_err}")
         raise HTTPException(status_code=500, detail="Internal database error")
     except Exception as e:
         logging.error(f"Error fetching sources: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/pool-stats")
+def get_pool_stats():
+    """Utilization and checkout wait times of the API's async pool and the scraper's sync pool."""
+    pool = get_pool()
+    return {"api": db.pool_stats(), "jobs": pool.stats() if pool is not None else None}
+
+@app.get("/metrics")
+def get_metrics():
+    """Scraper, analyzer, database and request metrics in Prometheus text format."""
+    return Response(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/cache-stats")
+def get_cache_stats():
+    """Hit, miss and eviction counts of the aggregate response cache."""
+    return response_cache.stats()
+
+def run_scraper_and_invalidate(job: Job):
+    """Scrape and score as a job, then drop cached aggregates so the next request sees the new rows."""
+    try:
+        perform_scraping_and_analysis(job=job)
     finally:
-        if conn:
-            conn.close()
+        response_cache.clear()
+        invalidate_watermark()
 
 # --- New Scraper Trigger Endpoint ---
-@app.post("/trigger-scraper", response_model=ScraperStatus)
-async def trigger_scraper_endpoint(
-    background_tasks: BackgroundTasks,
-    x_scraper_secret: Optional[str] = Header(None)
-):
+job_runner = JobRunner()
+
+def _check_scraper_secret(x_scraper_secret: Optional[str]) -> None:
     if not SCRAPER_API_SECRET:
         logging.error("SCRAPER_API_SECRET is not configured on the server.")
         raise HTTPException(status_code=500, detail="Scraper trigger is not configured.")
     if x_scraper_secret != SCRAPER_API_SECRET:
         logging.warning("Unauthorized attempt to trigger scraper.")
         raise HTTPException(status_code=403, detail="Invalid or missing secret.")
+
+@app.post("/trigger-scraper", response_model=ScraperStatus)
+async def trigger_scraper_endpoint(
+    x_scraper_secret: Optional[str] = Header(None)
+):
+    """
+    Start a scrape and analysis run on the job runner's worker thread.
+
+    Only one run is in flight at a time: a trigger that arrives while one is
+    queued or running is coalesced into it and gets its job id back.
+    """
+    _check_scraper_secret(x_scraper_secret)
     try:
-        logging.info("Scraper task triggered via API.")
-        background_tasks.add_task(perform_scraping_and_analysis)
-        return ScraperStatus(status="success", message="Scraping and analysis task started in background.")
+        job, started = job_runner.submit("scrape-and-analyze", run_scraper_and_invalidate)
+        if not started:
+            logging.info(f"Scraper trigger coalesced into running job {job.id}.")
+            return ScraperStatus(status="running", message="A scraping and analysis run is already in progress.", job_id=job.id)
+        logging.info(f"Scraper task triggered via API as job {job.id}.")
+        return ScraperStatus(status="success", message="Scraping and analysis task started in background.", job_id=job.id)
     except Exception as e:
         logging.error(f"Error during API-triggered scraper task: {e}")
         raise HTTPException(status_code=500, detail=f"Scraper task failed: {str(e)}")
 
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """Status of a scrape job, with per-phase progress (feeds fetched, rows inserted, rows scored)."""
+    job = job_runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job id")
+    return job.to_dict()
+
+@app.post("/jobs/{job_id}/cancel")
+def cancel_job(job_id: str, x_scraper_secret: Optional[str] = Header(None)):
+    """Ask a job to stop; it does so at its next progress report, keeping what it already committed."""
+    _check_scraper_secret(x_scraper_secret)
+    job = job_runner.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job id")
+    return job.to_dict()
@@ -0,0 +1,109 @@
+from datetime import datetime
+from typing import List, Optional
+from fastapi import HTTPException
+from . import db
+from .pagination import decode_cursor, decode_group_cursor
+
+# SQL for /articles pages.
+# Pages are keyset ranges over (published, id), or (group column, published, id) for
+# sort=source and sort=sentiment_label, each matching one of the indexes in
+# sql/migrations read forwards or backwards, so a page never scans the rows before it.
+# Grouped sorts order the groups either way round but keep each one newest first.
+
+SELECT_ARTICLES = "SELECT id, title, link, published, source, sentiment_label FROM stage.raw_articles WHERE 1=1"
+
+# sort= values other than published: the column the rows are grouped by first
+SORT_GROUPS = ("source", "sentiment_label")
+
+def sort_group(sort: str) -> Optional[str]:
+    """The column a sort= value groups by, or None for published order."""
+    column = sort.lstrip("-")
+    return column if column in SORT_GROUPS else None
+
+def after_published(params: db.QueryParams, published: Optional[datetime], article_id: int, descending: bool) -> List[str]:
+    """
+    Rows after (published, id) in the (published, id) order, newest first when descending.
+
+    Returned as alternatives to OR together. Each is a single index range, which
+    an OR of them (e.g. with `published IS NULL`) would not be.
+    """
+    if descending: # published DESC NULLS FIRST, id DESC
+        if published is None:
+            # NULL published sorts first under DESC, so everything dated comes after it
+            return [f"published IS NULL AND id < {params.add(article_id)}", "published IS NOT NULL"]
+        return [f"(published, id) < ({params.add(published)}, {params.add(article_id)})"]
+    # published ASC NULLS LAST, id ASC
+    if published is None:
+        return [f"published IS NULL AND id > {params.add(article_id)}"]
+    return [f"(published, id) > ({params.add(published)}, {params.add(article_id)})", "published IS NULL"]
+
+def after_group(params: db.QueryParams, column: str, value: Optional[str], descending: bool) -> List[str]:
+    """Rows in the groups after `value` of column, as alternatives like after_published; NULLs sort last ascending."""
+    if descending:
+        return [f"{column} IS NOT NULL"] if value is None else [f"{column} < {params.add(value)}"]
+    return [] if value is None else [f"{column} > {params.add(value)}", f"{column} IS NULL"]
+
+def published_order(descending: bool) -> str:
+    # Either way round it is the (published DESC, id DESC) index, read forwards or backwards
+    return "published DESC, id DESC" if descending else "published ASC NULLS LAST, id ASC"
+
+def newest_dated_sql(params: db.QueryParams, conditions: str) -> str:
+    """The (published, id) of the newest dated article matching conditions, to start `since` polling from."""
+    return f"SELECT published, id FROM stage.raw_articles WHERE published IS NOT NULL{conditions} ORDER BY published DESC, id DESC LIMIT {params.add(1)}"
+
+def articles_sql(
+    params: db.QueryParams,
+    conditions: str,
+    sort: str = "-published",
+    cursor: Optional[str] = None,
+    since: bool = False,
+    limit: int = 100,
+    offset: int = 0,
+) -> str:
+    """
+    The query for one /articles page.
+
+    conditions are the filters as WHERE clauses starting with AND, using params;
+    cursor is the `after` cursor, or with since=True the `since` one, which walks
+    forward from it oldest first whatever the sort and never returns undated
+    articles. Raises a 400 for a malformed cursor.
+    """
+    descending = sort.startswith("-")
+    group = sort_group(sort)
+    # Within a group rows are always newest first; since walks forward, oldest first
+    published_descending = False if since else descending or group is not None
+    order = published_order(published_descending)
+    if group:
+        order = f"{group} {'DESC' if descending else 'ASC'}, {order}"
+
+    if not cursor:
+        branches = [""]
+    elif since:
+        cursor_published, cursor_id = decode_cursor(cursor)
+        if cursor_published is None:
+            # Undated rows sort after every dated one, so polling from one would never see new articles
+            raise HTTPException(status_code=400, detail="Invalid 'since' cursor; take a new one from X-Since-Cursor")
+        # Only the dated branch of after_published: the row comparison is never true for a NULL published
+        branches = after_published(params, cursor_published, cursor_id, False)[:1]
+    elif group is None:
+        cursor_published, cursor_id = decode_cursor(cursor)
+        branches = after_published(params, cursor_published, cursor_id, published_descending)
+    else:
+        # A row comparison cannot mix directions, so the page continues in the rest of the
+        # cursor's group and then in the groups after it
+        cursor_published, cursor_id, cursor_group = decode_group_cursor(cursor)
+        in_group = f"{group} IS NULL" if cursor_group is None else f"{group} = {params.add(cursor_group)}"
+        branches = [f"{in_group} AND {condition}" for condition in after_published(params, cursor_published, cursor_id, published_descending)]
+        branches += after_group(params, group, cursor_group, descending)
+
+    if len(branches) == 1:
+        query = SELECT_ARTICLES + conditions
+        if branches[0]:
+            query += f" AND {branches[0]}"
+        return query + f" ORDER BY {order} LIMIT {params.add(limit)} OFFSET {params.add(offset)}"
+    # One bounded index range per branch; the outer sort only sees (limit + offset) rows of each
+    branch_limit = params.add(limit + offset)
+    query = " UNION ALL ".join(
+        f"({SELECT_ARTICLES}{conditions} AND {condition} ORDER BY {order} LIMIT {branch_limit})" for condition in branches
+    )
+    return query + f" ORDER BY {order} LIMIT {params.add(limit)} OFFSET {params.add(offset)}"
@@ -0,0 +1,79 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Tuple
+from src.config import API_CACHE_TTL, API_CACHE_MAX_ENTRIES
+
+# In-memory cache for aggregate responses.
+# The data behind them only changes when a scrape or analysis run commits, so
+# entries are dropped explicitly at that point. Callers also put the data
+# watermark in the key, so runs started outside this process (e.g. the external
+# scheduler) retire entries as soon as the watermark moves; the TTL bounds the rest.
+
+_MISSING = object()
+
+def cache_key(endpoint: str, **params: Any) -> Tuple[Hashable, ...]:
+    """Key for an endpoint and its query parameters; parameter order does not matter."""
+    return (endpoint,) + tuple(sorted(params.items()))
+
+class ResponseCache:
+    """Size-bounded LRU whose entries also expire after ttl seconds."""
+
+    def __init__(self, ttl: float = API_CACHE_TTL, max_entries: int = API_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        # Invalidation runs on the background task's thread, lookups on the event loop
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if time.monotonic() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry; called once new data has been committed."""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+response_cache = ResponseCache()
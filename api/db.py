@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, List, Any
+import asyncpg
+from src.config import DATABASE_URL, API_DB_POOL_MIN_SIZE, API_DB_POOL_MAX_SIZE, API_DB_POOL_TIMEOUT, API_DB_STATEMENT_CACHE_SIZE
+from src.metrics import StatementTimers
+
+# Async data access for the API.
+# Request handlers run on the event loop and wait on asyncpg instead of holding a
+# threadpool worker through connect, query and close.
+
+_pool: Optional[asyncpg.Pool] = None
+_stats = {"acquires": 0, "timeouts": 0, "wait_seconds_total": 0.0, "wait_seconds_max": 0.0}
+
+_statement_timer = StatementTimers("api")
+
+def _record_query(record: asyncpg.connection.LoggedQuery) -> None:
+    _statement_timer(record.query).observe(record.elapsed)
+
+async def _init_connection(conn: asyncpg.Connection) -> None:
+    conn.add_query_logger(_record_query)
+
+async def init_pool() -> None:
+    """Create the asyncpg pool; called once on application startup."""
+    global _pool
+    if not DATABASE_URL:
+        logging.error("DATABASE_URL is not configured.")
+        return
+    try:
+        _pool = await asyncpg.create_pool(
+            DATABASE_URL,
+            min_size=API_DB_POOL_MIN_SIZE,
+            max_size=API_DB_POOL_MAX_SIZE,
+            statement_cache_size=API_DB_STATEMENT_CACHE_SIZE,
+            init=_init_connection,
+        )
+    except (asyncpg.PostgresError, OSError) as e:
+        logging.error(f"Error creating the async database pool: {e}")
+
+async def close_pool() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+@asynccontextmanager
+async def acquire() -> AsyncIterator[Optional[asyncpg.Connection]]:
+    """Check out a connection, or yield None if the database is unavailable."""
+    if _pool is None:
+        yield None
+        return
+    started = time.monotonic()
+    try:
+        conn = await _pool.acquire(timeout=API_DB_POOL_TIMEOUT)
+    except (asyncpg.PostgresError, OSError, asyncio.TimeoutError) as e:
+        _stats["timeouts"] += 1
+        logging.error(f"Error acquiring an async database connection: {e}")
+        yield None
+        return
+    waited = time.monotonic() - started
+    _stats["acquires"] += 1
+    _stats["wait_seconds_total"] += waited
+    _stats["wait_seconds_max"] = max(_stats["wait_seconds_max"], waited)
+    try:
+        yield conn
+    finally:
+        await _pool.release(conn)
+
+def pool_stats() -> Optional[dict]:
+    if _pool is None:
+        return None
+    size, idle = _pool.get_size(), _pool.get_idle_size()
+    acquires = _stats["acquires"]
+    return {
+        "size": size,
+        "in_use": size - idle,
+        "idle": idle,
+        "max_size": _pool.get_max_size(),
+        "utilization": (size - idle) / _pool.get_max_size(),
+        **_stats,
+        "wait_seconds_avg": _stats["wait_seconds_total"] / acquires if acquires else 0.0,
+    }
+
+class QueryParams:
+    """Collects bind values for asyncpg's numbered $1, $2, ... placeholders."""
+
+    def __init__(self):
+        self.values: List[Any] = []
+
+    def add(self, value: Any) -> str:
+        self.values.append(value)
+        return f"${len(self.values)}"
@@ -0,0 +1,82 @@
+import hashlib
+import logging
+import time
+from typing import Optional, Tuple
+import asyncpg
+from fastapi import Request, Response
+from src.config import API_WATERMARK_TTL
+from . import db
+
+# Conditional GETs for the read endpoints.
+# Responses only change when articles are inserted or labelled, and the writers
+# record both in stage.data_watermark in the same transaction, so an ETag derived
+# from it plus the request's query identifies a response without running it. The
+# aggregate response cache keys include the watermark too, so a new ETag is never
+# served with a body cached before the change. Endpoints that read only the
+# rollups use analyzed_at alone, which every writer of the rollups stamps, so
+# inserting articles that are not labelled yet leaves their ETags alone.
+
+WATERMARK_SQL = "SELECT insert_version, analyzed_at FROM stage.data_watermark"
+
+_watermark: Optional[Tuple[float, str, str]] = None # (fetched_at, value, rollup value)
+
+async def current_watermark(rollup: bool = False) -> Optional[str]:
+    """
+    The data watermark, re-read from the database at most every API_WATERMARK_TTL seconds.
+
+    With rollup=True, only the part that moves when stage.sentiment_daily or
+    stage.word_daily change.
+    """
+    global _watermark
+    now = time.monotonic()
+    if _watermark is not None and now - _watermark[0] < API_WATERMARK_TTL:
+        return _watermark[2] if rollup else _watermark[1]
+    async with db.acquire() as conn:
+        if not conn:
+            return None
+        try:
+            insert_version, analyzed_at = await conn.fetchrow(WATERMARK_SQL)
+        except asyncpg.PostgresError as e:
+            logging.error(f"Error reading the data watermark: {e}")
+            return None
+    rollup_value = analyzed_at.isoformat() if analyzed_at else ""
+    value = f"{insert_version}|{rollup_value}"
+    _watermark = (now, value, rollup_value)
+    return rollup_value if rollup else value
+
+def invalidate_watermark() -> None:
+    """Force the next request to re-read the watermark; called after a run in this process commits."""
+    global _watermark
+    _watermark = None
+
+async def etag_for(request: Request, variant: str = "", rollup: bool = False) -> Optional[str]:
+    """
+    Strong ETag for this request's path, query parameters and representation variant, or None without a watermark.
+
+    Pass rollup=True for endpoints that read only the rollups (see current_watermark).
+    """
+    watermark = await current_watermark(rollup)
+    if watermark is None:
+        return None
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    digest = hashlib.sha256(f"{watermark}|{request.url.path}|{query}|{variant}".encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+def not_modified(request: Request, etag: Optional[str]) -> Optional[Response]:
+    """A 304 response if If-None-Match matches etag, else None."""
+    if etag is None:
+        return None
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    if "*" in candidates or etag in candidates:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    return None
+
+def set_etag(response: Response, etag: Optional[str]) -> None:
+    if etag is not None:
+        response.headers["ETag"] = etag
+        # Let clients store the response but revalidate it on every use
+        response.headers["Cache-Control"] = "no-cache"
@@ -0,0 +1,67 @@
+import json
+from typing import List, Optional
+import asyncpg
+from fastapi import HTTPException
+
+try:
+    import pyarrow as pa
+except ImportError: # Optional; only needed for format=arrow
+    pa = None
+
+# Columnar encodings for /articles.
+# Both are built straight from the asyncpg records, one list per column, without
+# constructing a model per row. Columnar JSON loads with pd.DataFrame(response.json()).
+
+COLUMNAR_MEDIA_TYPE = "application/vnd.dhanvani.columnar+json"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# Response column -> database column
+ARTICLE_COLUMNS = {
+    "id": "id",
+    "title": "title",
+    "url": "link",
+    "published": "published",
+    "source": "source",
+    "sentiment_label": "sentiment_label",
+}
+
+def negotiate_format(format: Optional[str], accept: Optional[str]) -> str:
+    """Pick "json", "columnar" or "arrow"; an explicit format= wins over the Accept header."""
+    if format:
+        chosen = format
+    elif accept and ARROW_MEDIA_TYPE in accept:
+        chosen = "arrow"
+    elif accept and COLUMNAR_MEDIA_TYPE in accept:
+        chosen = "columnar"
+    else:
+        chosen = "json"
+    if chosen == "arrow" and pa is None:
+        raise HTTPException(status_code=406, detail="Arrow output requires pyarrow on the server")
+    return chosen
+
+def _columns(records: List[asyncpg.Record]) -> dict:
+    values = list(zip(*records)) if records else [()] * len(ARTICLE_COLUMNS)
+    # Records come back in SELECT order, which matches ARTICLE_COLUMNS
+    return dict(zip(ARTICLE_COLUMNS, values))
+
+def columnar_json(records: List[asyncpg.Record]) -> bytes:
+    """{"id": [...], "title": [...], ...}; published as ISO 8601 strings."""
+    columns = _columns(records)
+    columns["published"] = [p.isoformat() if p else None for p in columns["published"]]
+    return json.dumps({name: list(values) for name, values in columns.items()}, ensure_ascii=False).encode("utf-8")
+
+def arrow_ipc(records: List[asyncpg.Record]) -> bytes:
+    """The same columns as an Arrow IPC stream, with published as a UTC timestamp."""
+    schema = pa.schema([
+        ("id", pa.int64()),
+        ("title", pa.string()),
+        ("url", pa.string()),
+        ("published", pa.timestamp("us", tz="UTC")),
+        ("source", pa.string()),
+        ("sentiment_label", pa.string()),
+    ])
+    table = pa.Table.from_pydict({name: list(values) for name, values in _columns(records).items()}, schema=schema)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
@@ -0,0 +1,53 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple
+from fastapi import HTTPException
+
+# Opaque keyset cursors for paginated endpoints.
+# A cursor is the (published, id) of the last row a client has seen, as url-safe base64 JSON.
+# Orders that group by another column first (e.g. sort=source) add that row's value of it.
+# Search results are ordered by rank instead, so their cursors are (rank, id).
+
+def encode_cursor(published: Optional[datetime], article_id: int, *group: Any) -> str:
+    return _encode([published.isoformat() if published else None, article_id, *group])
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """Decode a cursor from encode_cursor, raising a 400 if it is malformed."""
+    published, article_id, _ = _decode(cursor, 2)
+    return published, article_id
+
+def decode_group_cursor(cursor: str) -> Tuple[Optional[datetime], int, Any]:
+    """Decode a cursor from encode_cursor(published, id, group), raising a 400 if it is malformed."""
+    return _decode(cursor, 3)
+
+def encode_rank_cursor(rank: float, article_id: int) -> str:
+    return _encode([rank, article_id])
+
+def decode_rank_cursor(cursor: str) -> Tuple[float, int]:
+    """Decode a cursor from encode_rank_cursor, raising a 400 if it is malformed."""
+    try:
+        rank, article_id = _load(cursor, 2)
+        return float(rank), int(article_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+def _encode(payload: list) -> str:
+    data = json.dumps(payload, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii").rstrip("=")
+
+def _load(cursor: str, length: int) -> list:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    if not isinstance(payload, list) or len(payload) != length:
+        raise ValueError("unexpected cursor shape")
+    return payload
+
+def _decode(cursor: str, length: int) -> Tuple[Optional[datetime], int, Any]:
+    try:
+        payload = _load(cursor, length)
+        published, article_id = payload[0], payload[1]
+        group = payload[2] if length == 3 else None
+        return (datetime.fromisoformat(published) if published else None), int(article_id), group
+    except (ValueError, TypeError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
@@ -0,0 +1,75 @@
+import re
+from typing import List, Optional, Tuple
+from . import db
+
+# Full-text search over stage.raw_articles.search_vector (title weighted above
+# summary, GIN indexed). Queries use web search syntax: "quoted phrases", OR and
+# -excluded words, parsed by websearch_to_tsquery. A word ending in * (e.g. reli*)
+# is a prefix match, which that syntax lacks, so those become to_tsquery('word:*')
+# terms. The query is split on OR first and each alternative ANDs its prefix terms
+# with the websearch text of its other words, so `reli* OR bank` stays an OR.
+
+SEARCH_CONFIG = "english" # Must match the configuration in sql/migrations/005_search_vector.sql
+
+# A quoted phrase (possibly excluded, possibly unterminated) or a word
+_TOKEN = re.compile(r'-?"[^"]*"?|\S+')
+_PREFIX = re.compile(r"^(-?)(\w+)\*+$")
+
+def split_query(q: str) -> List[Tuple[str, List[Tuple[str, bool]]]]:
+    """
+    Split q into its OR alternatives, each as its websearch_to_tsquery text and
+    its prefix words as (word, excluded) pairs. Empty alternatives (a leading,
+    trailing or repeated OR) are dropped, as websearch_to_tsquery does.
+    """
+    alternatives, text, prefixes = [], [], []
+    for token in _TOKEN.findall(q) + ["OR"]:
+        if token.upper() == "OR":
+            if text or prefixes:
+                alternatives.append((" ".join(text), prefixes))
+            text, prefixes = [], []
+            continue
+        match = _PREFIX.match(token)
+        if match:
+            prefixes.append((match.group(2), match.group(1) == "-"))
+        else:
+            text.append(token)
+    return alternatives
+
+def tsquery_sql(params: db.QueryParams, q: str) -> Optional[str]:
+    """SQL expression for q's tsquery, or None if it has no terms."""
+    alternatives = []
+    for text, prefixes in split_query(q):
+        parts = []
+        if text.strip():
+            parts.append(f"websearch_to_tsquery('{SEARCH_CONFIG}', {params.add(text)})")
+        for word, excluded in prefixes:
+            parts.append(f"to_tsquery('{SEARCH_CONFIG}', {params.add(('!' if excluded else '') + word + ':*')})")
+        if parts:
+            alternatives.append("(" + " && ".join(parts) + ")")
+    if not alternatives:
+        return None
+    # && and || have the same precedence in SQL, so each alternative is parenthesised
+    return alternatives[0] if len(alternatives) == 1 else "(" + " || ".join(alternatives) + ")"
+
+def search_sql(params: db.QueryParams, tsquery: str, conditions: str, after: Optional[Tuple[float, int]], limit: int) -> str:
+    """
+    Matching articles, best first, ordered by (rank, id) descending.
+
+    conditions are extra WHERE clauses starting with AND, using params;
+    after is the (rank, id) of the last row of the previous page.
+    """
+    # The tsquery is built once up front; inlined, a generic plan would parse it again for every match
+    query = f"""
+        WITH q AS MATERIALIZED (SELECT {tsquery} AS query)
+        SELECT id, title, link, published, source, sentiment_label, rank FROM (
+            SELECT id, title, link, published, source, sentiment_label,
+                   ts_rank_cd(search_vector, q.query) AS rank
+            FROM stage.raw_articles, q
+            WHERE search_vector @@ q.query{conditions}
+        ) ranked
+    """
+    if after:
+        # rank is a real; the cursor holds it exactly, so cast back before comparing
+        query += f" WHERE (rank, id) < ({params.add(after[0])}::real, {params.add(after[1])})"
+    query += f" ORDER BY rank DESC, id DESC LIMIT {params.add(limit)}"
+    return query
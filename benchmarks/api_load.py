@@ -0,0 +1,76 @@
+"""
+Concurrent load test for the read API.
+
+    python -m benchmarks.api_load [--base-url URL] [--concurrency N] [--duration S] [--endpoint PATH ...]
+
+Runs N concurrent clients against the endpoints (round robin) for S seconds
+and reports throughput, error count and p50/p95/p99 latency per endpoint.
+Start the API first, e.g. `uvicorn api.app:app --workers 1`, and watch
+/pool-stats while it runs to see how busy the connection pool gets.
+"""
+import argparse
+import asyncio
+import time
+from collections import defaultdict
+from typing import Dict, List
+import httpx
+
+DEFAULT_ENDPOINTS = ["/articles?limit=100", "/sentiment-summary", "/sources"]
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+async def client(http: httpx.AsyncClient, endpoints: List[str], offset: int, deadline: float,
+                 latencies: Dict[str, List[float]], errors: Dict[str, int]) -> None:
+    i = offset
+    while time.monotonic() < deadline:
+        endpoint = endpoints[i % len(endpoints)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            response = await http.get(endpoint)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        if ok:
+            latencies[endpoint].append(time.perf_counter() - started)
+        else:
+            errors[endpoint] += 1
+
+async def run(base_url: str, concurrency: int, duration: float, endpoints: List[str]) -> None:
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as http:
+        started = time.monotonic()
+        deadline = started + duration
+        await asyncio.gather(*(client(http, endpoints, n, deadline, latencies, errors) for n in range(concurrency)))
+        elapsed = time.monotonic() - started
+        pool = (await http.get("/pool-stats")).json()
+
+    total = sum(len(v) for v in latencies.values())
+    print(f"{concurrency} clients, {elapsed:.1f}s: {total} requests ({total / elapsed:.1f} req/s), "
+          f"{sum(errors.values())} errors")
+    print(f"{'endpoint':<32} {'requests':>9} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for endpoint in endpoints:
+        samples = latencies[endpoint]
+        print(f"{endpoint:<32} {len(samples):>9} {errors[endpoint]:>7} "
+              f"{percentile(samples, 50) * 1000:>8.1f} {percentile(samples, 95) * 1000:>8.1f} "
+              f"{percentile(samples, 99) * 1000:>8.1f}")
+    print(f"Pool stats after run: {pool}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--endpoint", action="append", dest="endpoints",
+                        help=f"Path to request; repeatable (default: {' '.join(DEFAULT_ENDPOINTS)})")
+    args = parser.parse_args()
+    asyncio.run(run(args.base_url, args.concurrency, args.duration, args.endpoints or DEFAULT_ENDPOINTS))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Payload size and serialization time of the /articles output formats.
+
+    python -m benchmarks.articles_formats [--rows N] [--from-db]
+
+Encodes one page of N articles as the default JSON array of objects (a
+Pydantic Article per row, validated and dumped the way FastAPI does for
+response_model), as columnar JSON and as Arrow IPC (if pyarrow is installed).
+Reports the payload size, the server-side encoding time and the client-side
+time to load the payload into a pandas DataFrame. The default page is
+synthetic; --from-db fetches the newest N rows from stage.raw_articles.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List
+import pandas as pd
+from pydantic import TypeAdapter
+from api.app import Article
+from api.formats import arrow_ipc, columnar_json, pa
+
+def synthetic_page(rows: int, seed: int = 42) -> List[tuple]:
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    words = ["Sensex", "Nifty", "rallies", "slips", "RBI", "holds", "rates", "as", "inflation", "eases", "banks", "gain"]
+    return [
+        (i, " ".join(rng.choices(words, k=rng.randint(6, 14))), f"https://news.example.com/markets/{i}",
+         start + timedelta(minutes=i), rng.choice(["Moneycontrol", "Economic Times", "Livemint", "Business Standard"]),
+         rng.choice(["positive", "neutral", "negative"]))
+        for i in range(rows)
+    ]
+
+async def page_from_db(rows: int) -> list:
+    import asyncpg
+    from src.config import DATABASE_URL
+    conn = await asyncpg.connect(DATABASE_URL)
+    try:
+        return await conn.fetch(
+            "SELECT id, title, link, published, source, sentiment_label FROM stage.raw_articles "
+            "ORDER BY published DESC, id DESC LIMIT $1", rows,
+        )
+    finally:
+        await conn.close()
+
+_articles = TypeAdapter(List[Article])
+
+def objects_json(records: list) -> bytes:
+    """The default /articles path: one Article per row, then response_model validation and dump."""
+    articles = [
+        Article(id=r[0], title=r[1], url=r[2], published=str(r[3]), source=r[4], sentiment_label=r[5])
+        for r in records
+    ]
+    return _articles.dump_json(_articles.validate_python(articles))
+
+def timed(fn: Callable, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--from-db", action="store_true")
+    args = parser.parse_args()
+
+    records = asyncio.run(page_from_db(args.rows)) if args.from_db else synthetic_page(args.rows)
+    formats = [
+        ("json (objects)", objects_json, lambda b: pd.DataFrame(json.loads(b))),
+        ("columnar json", columnar_json, lambda b: pd.DataFrame(json.loads(b))),
+    ]
+    if pa is not None:
+        formats.append(("arrow ipc", arrow_ipc, lambda b: pa.ipc.open_stream(b).read_pandas()))
+    else:
+        print("pyarrow is not installed; skipping Arrow IPC.")
+
+    print(f"{len(records)} rows, best of {args.repeat}")
+    print(f"{'format':<16} {'bytes':>11} {'encode ms':>10} {'load ms':>9}")
+    baseline = None
+    for name, encode, load in formats:
+        payload = encode(records)
+        encode_s = timed(lambda: encode(records), args.repeat)
+        load_s = timed(lambda: load(payload), args.repeat)
+        baseline = baseline or (len(payload), encode_s)
+        print(f"{name:<16} {len(payload):>11,} {encode_s * 1000:>10.1f} {load_s * 1000:>9.1f}   "
+              f"({len(payload) / baseline[0]:.0%} size, {baseline[1] / encode_s:.1f}x encode speed)")
+
+if __name__ == "__main__":
+    main()
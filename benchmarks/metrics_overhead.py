@@ -0,0 +1,63 @@
+"""
+Cost of the metrics instrumentation on the hot paths.
+
+    python -m benchmarks.metrics_overhead [--iterations N]
+
+Times the raw recording calls (counter increment, labelled histogram
+observation, statement labelling, and the cached statement timer the
+database clients use). If DATABASE_URL is set, it also runs
+`SELECT 1` round trips through a plain psycopg2 cursor and through
+TimedCursor (the cheapest statement the instrumentation ever wraps) and a
+typical /articles page query, and reports the relative overhead of each.
+"""
+import argparse
+import time
+import psycopg2
+import psycopg2.extensions
+from src.config import DATABASE_URL
+from src.database import TimedCursor
+from src.metrics import Registry, StatementTimers, statement_label
+
+SAMPLE_SQL = b"INSERT INTO stage.raw_articles (title, link, published, summary, source, type, created_at) VALUES ('a', 'b', now(), 'c', 'd', 'e', 'f') ON CONFLICT (link) DO NOTHING RETURNING id, source"
+
+PAGE_SQL = ("SELECT id, title, link, published, source, sentiment_label FROM stage.raw_articles "
+            "ORDER BY published DESC, id DESC LIMIT 100")
+
+def per_call(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200000)
+    parser.add_argument("--queries", type=int, default=5000)
+    args = parser.parse_args()
+
+    registry = Registry()
+    counter = registry.counter("bench_total", "Benchmark counter.", ["source"])
+    histogram = registry.histogram("bench_seconds", "Benchmark histogram.", ["client", "statement"])
+    print(f"counter.labels().inc()       {per_call(lambda: counter.labels('Moneycontrol').inc(), args.iterations) * 1e9:8.0f} ns")
+    print(f"histogram.labels().observe() {per_call(lambda: histogram.labels('worker', 'insert stage.raw_articles').observe(0.0042), args.iterations) * 1e9:8.0f} ns")
+    print(f"statement_label()            {per_call(lambda: statement_label(SAMPLE_SQL), args.iterations) * 1e9:8.0f} ns")
+    timer = StatementTimers("bench")
+    print(f"StatementTimers().observe()  {per_call(lambda: timer(PAGE_SQL).observe(0.0042), args.iterations) * 1e9:8.0f} ns")
+
+    if not DATABASE_URL:
+        print("DATABASE_URL is not set; skipping the database round-trip comparison.")
+        return
+    for label, query in (("SELECT 1", "SELECT 1"), ("/articles page", PAGE_SQL)):
+        results = {}
+        for name, factory in (("plain cursor", psycopg2.extensions.cursor), ("TimedCursor", TimedCursor)):
+            conn = psycopg2.connect(DATABASE_URL, cursor_factory=factory)
+            with conn.cursor() as cursor:
+                per_call(lambda: cursor.execute(query), 200) # Warm up
+                results[name] = min(per_call(lambda: cursor.execute(query), args.queries) for _ in range(3))
+            conn.close()
+        for name, seconds in results.items():
+            print(f"{label} via {name:<14} {seconds * 1e6:8.1f} us")
+        print(f"{label}: instrumentation overhead {results['TimedCursor'] / results['plain cursor'] - 1:.1%}")
+
+if __name__ == "__main__":
+    main()
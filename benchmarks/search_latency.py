@@ -0,0 +1,127 @@
+"""
+Latency of /search queries over a large corpus.
+
+    python -m benchmarks.search_latency [--rows N] [--repeat N]
+
+Seeds stage.raw_articles with N synthetic articles (default one million, inside
+a transaction that is rolled back at the end, so the database is left as it
+was), then runs the SQL /search builds for a mix of queries: common and rare
+words, a phrase, prefixes, exclusions, filters, and a page deep into the
+results via its cursor. Reports the median and p95 time per query and the
+plan's index. Point DATABASE_URL at a local Postgres; migrations are applied first.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+import asyncpg
+from api import db
+from api.search import search_sql, tsquery_sql
+from src.config import DATABASE_URL
+from src.database import db_connection
+from src.migrations import apply_migrations
+
+# Titles and summaries drawn from small vocabularies; a few companies and rare words
+# give the mix of very common and very selective terms real queries have
+SEED_SQL = """
+    INSERT INTO stage.raw_articles (title, summary, link, published, source, type, created_at, sentiment_score, sentiment_label)
+    SELECT c.company || ' ' || v1.word || ' ' || n.word || ' as ' || v2.word || ' ' || n2.word
+               || CASE WHEN g % 5000 = 0 THEN ' amid monsoon shortfall' ELSE '' END,
+           'Shares of ' || c.company || ' ' || v2.word || ' while ' || n.word || ' ' || v1.word || ' across the sector',
+           'search-seed/' || g,
+           timestamptz '2020-01-01 00:00+00' + (g % 2000) * interval '1 day' + (g % 1440) * interval '1 minute',
+           'Source ' || (g % 20), 'news', '', 0.1,
+           (ARRAY['positive', 'negative', 'neutral'])[1 + g % 3]
+    FROM generate_series(1, $1) AS g
+    CROSS JOIN LATERAL (SELECT (ARRAY['Tata Motors', 'Reliance Industries', 'Infosys', 'HDFC Bank', 'ICICI Bank',
+        'Adani Ports', 'Bharti Airtel', 'Larsen and Toubro', 'Maruti Suzuki', 'Sun Pharma', 'Wipro', 'ITC'])[1 + g % 12] AS company) c
+    CROSS JOIN LATERAL (SELECT (ARRAY['rallies', 'slips', 'surges', 'falls', 'gains', 'drops', 'climbs', 'tumbles'])[1 + (g / 12) % 8] AS word) v1
+    CROSS JOIN LATERAL (SELECT (ARRAY['rises', 'eases', 'jumps', 'cools', 'steadies', 'widens'])[1 + (g / 7) % 6] AS word) v2
+    CROSS JOIN LATERAL (SELECT (ARRAY['profit', 'revenue', 'margins', 'inflation', 'exports', 'demand', 'guidance',
+        'dividend', 'orders', 'valuation'])[1 + (g / 96) % 10] AS word) n
+    CROSS JOIN LATERAL (SELECT (ARRAY['outlook', 'rates', 'earnings', 'capex', 'debt', 'volumes', 'pricing'])[1 + (g / 31) % 7] AS word) n2
+"""
+
+# (description, q, extra filters as (SQL, values))
+QUERIES = [
+    ("common word", "profit", None),
+    ("rare words", "monsoon shortfall", None),
+    ("phrase", '"tata motors"', None),
+    ("phrase + word", '"hdfc bank" dividend', None),
+    ("prefix", "infos*", None),
+    ("prefix + exclusion", "bank* -icici", None),
+    ("OR", "wipro or infosys", None),
+    ("word + source filter", "dividend", ("source = {}", ["Source 3"])),
+    ("word + sentiment + month", "exports",
+     ("sentiment_label = {} AND published >= {} AND published < {}",
+      ["negative", datetime(2023, 6, 1, tzinfo=timezone.utc), datetime(2023, 7, 1, tzinfo=timezone.utc)])),
+]
+
+def build(q: str, filters, after=None, limit: int = 20):
+    params = db.QueryParams()
+    tsquery = tsquery_sql(params, q)
+    conditions = ""
+    if filters:
+        template, values = filters
+        conditions = " AND " + template.format(*(params.add(value) for value in values))
+    return search_sql(params, tsquery, conditions, after, limit), params.values
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+async def run(rows: int, repeat: int) -> int:
+    conn = await asyncpg.connect(DATABASE_URL)
+    transaction = conn.transaction()
+    await transaction.start()
+    try:
+        started = time.perf_counter()
+        await conn.execute(SEED_SQL, rows)
+        await conn.execute("ANALYZE stage.raw_articles")
+        print(f"Seeded {rows} rows in {time.perf_counter() - started:.1f}s")
+        print(f"{'query':<28} {'matches':>8} {'p50 ms':>8} {'p95 ms':>8}  index")
+
+        cases = []
+        for description, q, filters in QUERIES:
+            cases.append((description, *build(q, filters), q, filters))
+        # Page 50 of a common word, reached through the cursor of page 49
+        query, values = build("profit", None, limit=20 * 49)
+        last = (await conn.fetch(query, *values))[-1]
+        cases.append(("common word, page 50", *build("profit", None, after=(last["rank"], last["id"])), "profit", None))
+
+        failures = 0
+        for description, query, values, q, filters in cases:
+            count_query, count_values = build(q, filters, limit=rows)
+            matches = await conn.fetchval(f"SELECT count(*) FROM ({count_query}) m", *count_values)
+            plan = json.loads(await conn.fetchval("EXPLAIN (FORMAT JSON) " + query, *values))
+            uses_index = "raw_articles_search_idx" in json.dumps(plan)
+            failures += not uses_index
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                await conn.fetch(query, *values)
+                samples.append((time.perf_counter() - started) * 1000)
+            print(f"{description:<28} {matches:>8} {statistics.median(samples):>8.2f} {percentile(samples, 0.95):>8.2f}  "
+                  f"{'raw_articles_search_idx' if uses_index else 'NO GIN INDEX'}")
+    finally:
+        await transaction.rollback() # Drop the seed rows
+        await conn.close()
+    return 1 if failures else 0
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    with db_connection() as conn:
+        if conn is None:
+            print("Database connection could not be established.")
+            return 1
+        apply_migrations(conn)
+    return asyncio.run(run(args.rows, args.repeat))
+
+if __name__ == "__main__":
+    sys.exit(main())
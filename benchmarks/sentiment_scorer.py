@@ -0,0 +1,88 @@
+"""
+Speed of the fast VADER scorer against NLTK.
+
+    python -m benchmarks.sentiment_scorer [--articles N] [--from-db]
+
+Scores a corpus with NLTK's SentimentIntensityAnalyzer and with
+FastVaderScorer and reports per-article latency and throughput for both. The
+default corpus is synthetic and built to hit every VADER rule (boosters,
+negations, ALL CAPS, "but", "least", idioms, punctuation emphasis); --from-db
+scores the most recent articles in stage.raw_articles instead. Equivalence
+with NLTK is checked by tests/test_fast_vader.py.
+"""
+import argparse
+import random
+import sys
+import time
+from typing import List
+from nltk.sentiment.vader import SentimentIntensityAnalyzer, VaderConstants
+from src.sentiment.fast_vader import FastVaderScorer
+
+FILLER = ["the", "market", "shares", "of", "at", "very", "so", "this", "never", "least", "kind", "sort",
+          "Sensex", "Nifty", "RBI", "rate", "Q3", "U.S.", "FY25", "it's", "isn't", "on", "in", "a", "I"]
+PUNCTUATION = ["", "", "", ",", ".", "!", "?", "!!", "??", "?!?", ":", "'", '"', "...", "-", "!!!!"]
+
+def synthetic_corpus(size: int, seed: int = 42) -> List[str]:
+    rng = random.Random(seed)
+    lexicon = list(SentimentIntensityAnalyzer().lexicon)
+    special = (list(VaderConstants.NEGATE) + list(VaderConstants.BOOSTER_DICT) + ["but", "BUT", "least"]
+               + [w for idiom in VaderConstants.SPECIAL_CASE_IDIOMS for w in idiom.split()])
+    corpus = []
+    for _ in range(size):
+        words = []
+        for _ in range(rng.randint(0, 40)):
+            pool = rng.choices([lexicon, special, FILLER], weights=[3, 2, 4])[0]
+            word = rng.choice(pool)
+            if rng.random() < 0.1:
+                word = word.upper()
+            elif rng.random() < 0.1:
+                word = word.capitalize()
+            if rng.random() < 0.2:
+                word = rng.choice(PUNCTUATION) + word
+            if rng.random() < 0.3:
+                word = word + rng.choice(PUNCTUATION)
+            words.append(word)
+        if words and rng.random() < 0.2:
+            words.extend(rng.sample(words, k=min(len(words), 3))) # repeated tokens
+        if rng.random() < 0.1:
+            idiom = rng.choice(list(VaderConstants.SPECIAL_CASE_IDIOMS)).split()
+            pos = rng.randint(0, len(words))
+            words[pos:pos] = ["really", "very"][: rng.randint(0, 2)] + idiom
+        corpus.append(" ".join(words))
+    return corpus
+
+def db_corpus(size: int) -> List[str]:
+    from src.database import db_connection
+    with db_connection() as conn:
+        if conn is None:
+            sys.exit("Database is not available.")
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT title, summary FROM stage.raw_articles ORDER BY id DESC LIMIT %s", (size,))
+            return [f"{title or ''} {summary or ''}".strip() for title, summary in cursor.fetchall()]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=100000)
+    parser.add_argument("--from-db", action="store_true")
+    args = parser.parse_args()
+
+    corpus = db_corpus(args.articles) if args.from_db else synthetic_corpus(args.articles)
+    sid = SentimentIntensityAnalyzer()
+    fast = FastVaderScorer(sid.lexicon)
+
+    started = time.perf_counter()
+    for text in corpus:
+        sid.polarity_scores(text)
+    nltk_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    fast.compound_scores(corpus)
+    fast_seconds = time.perf_counter() - started
+
+    count = len(corpus)
+    for name, seconds in (("nltk", nltk_seconds), ("fast", fast_seconds)):
+        print(f"{name:>5}: {seconds:8.3f}s  {seconds / count * 1e6:8.1f} us/article  {count / seconds:10.0f} articles/s")
+    print(f"speedup: {nltk_seconds / fast_seconds:.2f}x over {count} articles")
+
+if __name__ == "__main__":
+    main()
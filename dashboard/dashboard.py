@@ -1,12 +1,17 @@
 import os
 import dash
-from dash import dcc, html, Input, Output, dash_table
+from dash import dcc, html, Input, Output, State, dash_table
 import dash_bootstrap_components as dbc
 import pandas as pd
 import requests
 import plotly.express as px
 from wordcloud import WordCloud
 import base64
+import json
+import re
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
 from io import BytesIO
 # import sqlite3 # No longer needed for direct DB access
 pd.set_option('display.max_columns', None)
@@ -17,10 +22,23 @@ app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
 API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000") # Assuming API runs on port 8000 locally
 ARTICLES_API_URL = f"{API_BASE_URL}/articles"
 SOURCES_API_URL = f"{API_BASE_URL}/sources"
+TIMESERIES_API_URL = f"{API_BASE_URL}/sentiment-timeseries"
+WORD_FREQUENCIES_API_URL = f"{API_BASE_URL}/word-frequencies"
+
+PAGE_SIZE = 10 # Rows per table page; only the visible page is requested
+WORDCLOUD_WORDS = 200 # Most frequent words drawn in the word cloud
+WORDCLOUD_CACHE_SIZE = int(os.getenv("WORDCLOUD_CACHE_SIZE", "64")) # Rendered word clouds kept in memory
+REFRESH_INTERVAL = int(os.getenv("DASHBOARD_REFRESH_SECONDS", "60")) # How often the browser polls for new articles
+RESYNC_CYCLES = 30 # Refresh cycles between full reloads of the counts, which pick up late-dated articles
+DELTA_PAGE_SIZE = 1000 # Rows per delta request
+DELTA_MAX_PAGES = 10 # A bigger backlog is cheaper to reload from the aggregates
+
+# One keep-alive connection for all API calls instead of a new one per request
+session = requests.Session()
 
 def get_sources_from_api():
     try:
-        response = requests.get(SOURCES_API_URL, timeout=10)
+        response = session.get(SOURCES_API_URL, timeout=10)
         response.raise_for_status()
         sources = response.json()
         return [s for s in sources if s] # Filter out empty or None sources
@@ -28,31 +46,253 @@ def get_sources_from_api():
         print(f"Error fetching sources from API: {e}")
         return []
 
-source_list = get_sources_from_api()
-source_options = [{"label": source, "value": source} for source in source_list]
-source_options.append({"label": "All", "value": ""})
+def date_range(text):
+    """
+    (start, end) UTC days for a "YYYY", "YYYY-MM" or "YYYY-MM-DD" filter, both inclusive.
+
+    Returns (None, None) for an empty or unparseable value, which means no date filter.
+    """
+    text = (text or "").strip()
+    try:
+        if len(text) == 4:
+            return date(int(text), 1, 1), date(int(text), 12, 31)
+        if len(text) == 7:
+            first = date.fromisoformat(f"{text}-01")
+            following = (first.replace(day=28) + timedelta(days=4)).replace(day=1)
+            return first, following - timedelta(days=1)
+        day = date.fromisoformat(text)
+        return day, day
+    except ValueError:
+        return None, None
+
+def article_filters(sentiment=None, source=None, published=None):
+    """The dashboard filters as /articles query parameters."""
+    params = {}
+    if sentiment:
+        params["sentiment_label"] = sentiment
+    if source:
+        params["source"] = source
+    start, end = date_range(published)
+    if start:
+        params["published_from"] = start.isoformat()
+        params["published_to"] = (end + timedelta(days=1)).isoformat()
+    return params
 
-def fetch_data(sentiment=None, source=None, published=None):
-    # Default limit for fetching data, can be adjusted or made configurable
-    params = {"limit": 10000, "offset": 0}
+def day_params(sentiment=None, source=None, published=None):
+    """The dashboard filters as query parameters of the day-bucketed aggregate endpoints."""
+    params = {}
     if sentiment:
         params["sentiment_label"] = sentiment
     if source:
         params["source"] = source
-    if published:
-        params["published"] = published
+    start, end = date_range(published)
+    if start:
+        params["start"] = start.isoformat()
+        params["end"] = end.isoformat()
+    return params
+
+def fetch_timeseries(sentiment=None, source=None, published=None):
+    """Daily counts per sentiment label from the rollup: O(days) rows whatever the archive size."""
+    try:
+        response = session.get(TIMESERIES_API_URL, params=day_params(sentiment, source, published), timeout=10)
+        response.raise_for_status()
+        return pd.DataFrame(response.json(), columns=["day", "sentiment_label", "article_count", "average_score"])
+    except Exception as e:
+        print("API error:", e)
+        return pd.DataFrame(columns=["day", "sentiment_label", "article_count", "average_score"])
+
+# Rendered word clouds, least recently used first: filters -> (ETag, data URI).
+# /word-frequencies' ETag only changes when the rollups do (articles labelled or
+# the rollups rebuilt), so a hit is reused while the API answers 304 Not Modified
+# for it, however many unlabelled articles arrive in between.
+_wordcloud_cache = OrderedDict()
+_wordcloud_lock = threading.Lock()
+
+def render_wordcloud(frequencies):
+    wordcloud = WordCloud(
+        width=800,
+        height=400,
+        background_color="white",
+        colormap="viridis"  # Soothing color map
+    ).generate_from_frequencies(frequencies)
+
+    img = BytesIO()
+    wordcloud.to_image().save(img, format='PNG')
+    img.seek(0)
+    encoded_img = base64.b64encode(img.read()).decode()
+    return f"data:image/png;base64,{encoded_img}"
+
+def wordcloud_src(sentiment=None, source=None, published=None):
+    """The word cloud for these filters as a PNG data URI, or None when no words match."""
+    key = (sentiment or "", source or "", published or "")
+    with _wordcloud_lock:
+        cached = _wordcloud_cache.get(key)
+    headers = {"If-None-Match": cached[0]} if cached else {}
+    params = {"limit": WORDCLOUD_WORDS, **day_params(sentiment, source, published)}
+    try:
+        response = session.get(WORD_FREQUENCIES_API_URL, params=params, headers=headers, timeout=10)
+        if response.status_code == 304 and cached:
+            with _wordcloud_lock:
+                _wordcloud_cache.move_to_end(key)
+            return cached[1]
+        response.raise_for_status()
+        frequencies = response.json()
+    except Exception as e:
+        print("API error:", e)
+        return cached[1] if cached else None
+    if not frequencies:
+        return None
+
+    src = render_wordcloud(frequencies)
+    etag = response.headers.get("ETag")
+    if etag:
+        with _wordcloud_lock:
+            _wordcloud_cache[key] = (etag, src)
+            _wordcloud_cache.move_to_end(key)
+            while len(_wordcloud_cache) > WORDCLOUD_CACHE_SIZE:
+                _wordcloud_cache.popitem(last=False)
+    return src
+
+def newest_cursor(source=None, published=None):
+    """Cursor of the newest article matching the filters, to poll for newer ones from; None if there are none."""
+    params = {"limit": 1, "format": "columnar", **article_filters(None, source, published)}
+    try:
+        response = session.get(ARTICLES_API_URL, params=params, timeout=10)
+        response.raise_for_status()
+        return response.headers.get("X-Since-Cursor")
+    except Exception as e:
+        print("API error:", e)
+        return None
+
+def fetch_delta(since, source=None, published=None):
+    """
+    Articles newer than the `since` cursor, oldest first, as columns.
+
+    Returns (columns, next_since, complete). complete is False when the API
+    could not be reached or the backlog is over DELTA_MAX_PAGES pages.
+    """
+    columns = {"published": [], "sentiment_label": []}
+    for _ in range(DELTA_MAX_PAGES):
+        params = {"since": since, "limit": DELTA_PAGE_SIZE, "format": "columnar", **article_filters(None, source, published)}
+        try:
+            response = session.get(ARTICLES_API_URL, params=params, timeout=10)
+            response.raise_for_status()
+        except Exception as e:
+            print("API error:", e)
+            return columns, since, False
+        page = response.json()
+        for name in columns:
+            columns[name].extend(page[name])
+        since = response.headers.get("X-Since-Cursor", since)
+        if len(page["published"]) < DELTA_PAGE_SIZE:
+            return columns, since, True
+    return columns, since, False
+
+def load_store(filters, version=0):
+    """Everything the charts need for these filters, from the aggregate endpoints."""
+    sentiment, source, published = filters
+    # The cursor is taken first, so an article landing in between is counted twice rather than missed
+    since = newest_cursor(source, published)
+    counts = fetch_timeseries(sentiment, source, published)
+    return {
+        "filters": filters,
+        "since": since,
+        "counts": {f"{day}|{label}": int(n) for day, label, n in counts[["day", "sentiment_label", "article_count"]].itertuples(index=False)},
+        "version": version + 1,
+    }
+
+# Table columns the API can sort and filter on, each backed by an index
+TABLE_SORT_COLUMNS = ("published", "source", "sentiment_label")
+TABLE_FILTER = re.compile(r"^\{(\w+)\}\s+(\S+)\s+(.*)$")
+# Column filter operators the API can express, by their Dash spellings. The
+# table prefixes relational operators with "s" (case-sensitive), which is how
+# the API compares anyway; anything else (!=, contains, is blank, ...) is ignored.
+TABLE_OPERATORS = {
+    "=": "=", "eq": "=", "datestartswith": "=",
+    ">": ">", "gt": ">", ">=": ">=", "ge": ">=",
+    "<": "<", "lt": "<", "<=": "<=", "le": "<=",
+}
+
+def table_operator(operator):
+    """The comparison a Dash filter operator stands for, or None if the API cannot express it."""
+    operator = operator.lower()
+    if operator not in TABLE_OPERATORS and operator.startswith("s"):
+        operator = operator[1:]
+    return TABLE_OPERATORS.get(operator)
+
+def table_params(filters, sort_by=None, filter_query=""):
+    """
+    /articles query parameters for the table: the dashboard filters, the column
+    filters typed into the table header and its sort order.
+
+    Source and sentiment column filters must be equalities (e.g. "= Reuters"),
+    and published accepts a date prefix or a comparison (e.g. ">= 2025-01-01").
+    Other operators and filters on other columns are ignored. Returns None when
+    the filters contradict each other.
+    """
+    params = article_filters(*filters)
+    for term in (filter_query or "").split(" && "):
+        match = TABLE_FILTER.match(term.strip())
+        if not match:
+            continue
+        column, operator, value = match.groups()
+        operator = table_operator(operator)
+        if operator is None:
+            continue
+        value = value.strip().strip("\"'`")
+        if column in ("source", "sentiment_label"):
+            if operator != "=":
+                continue
+            value = value.lower() if column == "sentiment_label" else value
+            if params.get(column, value) != value:
+                return None
+            params[column] = value
+        elif column == "published":
+            start, end = date_range(value)
+            if start is None:
+                continue
+            low, high = start.isoformat(), (end + timedelta(days=1)).isoformat()
+            if operator == ">":
+                low, high = high, None
+            elif operator == ">=":
+                high = None
+            elif operator == "<":
+                low, high = None, low
+            elif operator == "<=":
+                low = None
+            # Narrow any range the date dropdown already set; ISO dates compare as strings
+            if low and low > params.get("published_from", ""):
+                params["published_from"] = low
+            if high and high < params.get("published_to", "9999-12-31"):
+                params["published_to"] = high
+    if params.get("published_from") and params.get("published_to") and params["published_from"] >= params["published_to"]:
+        return None
+    for sort in sort_by or []:
+        if sort["column_id"] in TABLE_SORT_COLUMNS:
+            params["sort"] = ("-" if sort["direction"] == "desc" else "") + sort["column_id"]
+    return params
 
+def fetch_page(params, after=None, offset=0):
+    """One table page as records, and the cursor of the page after it (None on the last page)."""
+    # Columnar response: one array per field, loaded without per-row parsing
+    params = {**params, "limit": PAGE_SIZE, "offset": offset, "format": "columnar", **({"after": after} if after else {})}
     try:
-        response = requests.get(ARTICLES_API_URL, params=params, timeout=10)
+        response = session.get(ARTICLES_API_URL, params=params, timeout=10)
         response.raise_for_status()
-        return pd.DataFrame(response.json())
+        return pd.DataFrame(response.json()).to_dict("records"), response.headers.get("X-Next-Cursor")
     except Exception as e:
         print("API error:", e)
-        return pd.DataFrame()
+        return [], None
 
 app.layout = dbc.Container([
     dbc.NavbarSimple(brand="DhanVani - Financial News Sentiment Engine", color="primary", dark=True),
 
+    # Daily counts for the current filters, kept in the browser and topped up with deltas
+    dcc.Store(id="data-store"),
+    # Keyset cursor of every table page visited so far, so turning a page is one indexed query
+    dcc.Store(id="table-cursors"),
+    dcc.Interval(id="refresh-interval", interval=REFRESH_INTERVAL * 1000),
+
     dbc.Card([
         dbc.CardHeader("Filters"),
         dbc.CardBody([
@@ -77,7 +317,7 @@ app.layout = dbc.Container([
                     html.Label("Source"),
                     dcc.Dropdown(
                         id="source-filter",
-                        options=source_options,
+                        options=[{"label": "All", "value": ""}], # Filled in by update_sources
                         value="",
                         placeholder="Select Source",
                         clearable=False,
@@ -109,13 +349,24 @@ app.layout = dbc.Container([
             dash_table.DataTable(
                 id='news-table',
                 columns=[
-                    {"name": "published", "id": "published"},
-                    {"name": "source", "id": "source"},
-                    {"name": "sentiment", "id": "sentiment_label"},
+                    # A bare value typed into a datetime column filters with datestartswith
+                    {"name": "published", "id": "published", "type": "datetime",
+                     "filter_options": {"placeholder_text": "2025-01 or >= 2025-01-01"}},
+                    {"name": "source", "id": "source", "filter_options": {"placeholder_text": "= source"}},
+                    {"name": "sentiment", "id": "sentiment_label", "filter_options": {"placeholder_text": "= positive"}},
                     {"name": "title", "id": "title"},
                     {"name": "url", "id": "url"},
                 ],
-                page_size=10,
+                page_size=PAGE_SIZE,
+                page_current=0,
+                page_action="custom",
+                # Sorted and filtered by the API; only published, source and sentiment are indexed for it
+                sort_action="custom",
+                sort_mode="single",
+                sort_by=[],
+                filter_action="custom",
+                filter_query="",
+                filter_options={"placeholder_text": "filter (source, sentiment, date)"},
                 style_cell={"textAlign": "left", "whiteSpace": "normal", "height": "auto"},
                 style_table={"overflowX": "auto"},
                 style_header={"fontWeight": "bold"},
@@ -134,35 +385,56 @@ app.layout = dbc.Container([
 
 
 @app.callback(
-    [Output("sentiment-pie-chart", "figure"),
-     Output("articles-bar-chart", "figure"),
-     Output("news-table", "data"),
-     Output("wordcloud-image", "src")],
+    Output("data-store", "data"),
     [
         Input("sentiment-filter", "value"),
         Input("source-filter", "value"),
         Input("date-filter", "value"),
+        Input("refresh-interval", "n_intervals"),
     ],
+    State("data-store", "data"),
 )
-def update_charts(sentiment, source, date):
-    df = fetch_data()
+def refresh_store(sentiment, source, date, n_intervals, store):
+    filters = [sentiment or "", source or "", date or ""]
+    if store is None or store["filters"] != filters:
+        return load_store(filters, store["version"] if store else 0)
+    if store["since"] is None or (n_intervals or 0) % RESYNC_CYCLES == 0:
+        return load_store(filters, store["version"])
+
+    columns, since, complete = fetch_delta(store["since"], source, date)
+    if not complete:
+        return load_store(filters, store["version"])
+    if not columns["published"]:
+        return dash.no_update
+    # Unlabelled articles are scored moments after they land, so wait and fetch the same delta again
+    if any(label is None for label in columns["sentiment_label"]):
+        return dash.no_update
 
-    if sentiment and sentiment != "":
-        df = df[df["sentiment_label"] == sentiment]
-    if source and source != "":
-        df = df[df["source"] == source]
-    if date:
-        df = df[df["published"].str.startswith(date)]
+    counts = dict(store["counts"])
+    for published, label in zip(columns["published"], columns["sentiment_label"]):
+        if published and (not sentiment or label == sentiment):
+            key = f"{published[:10]}|{label}" # published is ISO 8601 in UTC
+            counts[key] = counts.get(key, 0) + 1
+    return {**store, "since": since, "counts": counts, "version": store["version"] + 1}
 
+@app.callback(
+    [Output("sentiment-pie-chart", "figure"),
+     Output("articles-bar-chart", "figure"),
+     Output("wordcloud-image", "src")],
+    Input("data-store", "data"),
+)
+def update_charts(store):
+    rows = [key.split("|") + [n] for key, n in (store or {}).get("counts", {}).items()]
+    counts = pd.DataFrame(rows, columns=["day", "sentiment_label", "article_count"])
 
-    if df.empty:
+    if counts.empty:
         pie = px.pie(title="No Data Available")
         bar = px.bar(title="No Data Available")
-        return pie, bar, [], None
+        return pie, bar, None
 
     # Pie Chart: Sentiment Distribution
     all_sentiments = ["positive", "neutral", "negative"]
-    sentiment_counts = df["sentiment_label"].value_counts().reindex(all_sentiments, fill_value=0).reset_index()
+    sentiment_counts = counts.groupby("sentiment_label")["article_count"].sum().reindex(all_sentiments, fill_value=0).reset_index()
     sentiment_counts.columns = ["sentiment", "count"]
     # Pie chart with soothing colors
     color_map = {
@@ -180,44 +452,67 @@ def update_charts(sentiment, source, date):
     )
 
     # Bar Chart: Articles per Day
-    # df["published"] = pd.to_datetime(df["published"], errors="coerce")
-    # articles_per_day = df.groupby(df["published"].dt.date).size().reset_index(name="count")
-    print(df)
-    df["published"] = pd.to_datetime(df["published"].astype(str), errors="coerce")
-    df_valid = df.dropna(subset=["published"])
-
-    if not df_valid.empty and pd.api.types.is_datetime64_any_dtype(df_valid["published"]):
-        articles_per_day = (
-            df_valid.groupby(df_valid["published"].dt.date)
-            .size()
-            .reset_index(name="count")
-        )
-        bar = px.bar(
-            articles_per_day,
-            x="published",
-            y="count",
-            title="Number of Articles per Day"
-        )
-    else:
-        bar = px.bar(title="No Data Available")
+    articles_per_day = counts.groupby("day")["article_count"].sum().reset_index(name="count")
+    articles_per_day.columns = ["published", "count"]
+    bar = px.bar(
+        articles_per_day,
+        x="published",
+        y="count",
+        title="Number of Articles per Day"
+    )
 
     # Word Cloud
-    text = " ".join(df["title"].dropna().tolist())
-    wordcloud = WordCloud(
-        width=800,
-        height=400,
-        background_color="white",
-        colormap="viridis"  # Soothing color map
-    ).generate(text)
+    return pie, bar, wordcloud_src(*store["filters"])
 
-    img = BytesIO()
-    wordcloud.to_image().save(img, format='PNG')
-    img.seek(0)
-    encoded_img = base64.b64encode(img.read()).decode()
-    wordcloud_src = f"data:image/png;base64,{encoded_img}"
+@app.callback(
+    Output("source-filter", "options"),
+    Input("data-store", "data"),
+)
+def update_sources(store):
+    # Runs whenever new articles arrive, so sources added since the page loaded show up
+    options = [{"label": source, "value": source} for source in get_sources_from_api()]
+    options.append({"label": "All", "value": ""})
+    return options
 
+@app.callback(
+    [Output("news-table", "data"),
+     Output("news-table", "page_current"),
+     Output("news-table", "page_count"),
+     Output("table-cursors", "data")],
+    [
+        Input("data-store", "data"),
+        Input("news-table", "page_current"),
+        Input("news-table", "sort_by"),
+        Input("news-table", "filter_query"),
+    ],
+    State("table-cursors", "data"),
+)
+def update_table(store, page_current, sort_by, filter_query, cursors):
+    if not store:
+        return [], 0, None, None
+    params = table_params(store["filters"], sort_by, filter_query)
+    # New filters or a new order start again from the first page; new articles keep the page
+    key = json.dumps(params, sort_keys=True)
+    if cursors is None or cursors["key"] != key:
+        cursors = {"key": key, "pages": [None]}
+        page_current = 0
+    if params is None:
+        return [], 0, 1, cursors
 
-    return pie, bar, df.to_dict("records"), wordcloud_src
+    pages = cursors["pages"]
+    page = page_current or 0
+    # Jumping past the pages visited so far skips forward from the furthest one
+    known = min(page, len(pages) - 1)
+    records, next_cursor = fetch_page(params, pages[known], (page - known) * PAGE_SIZE)
+    if not records and page > known:
+        # Jumped past the end: show the furthest page visited instead
+        page = known
+        records, next_cursor = fetch_page(params, pages[known])
+    if next_cursor and page + 1 == len(pages):
+        pages.append(next_cursor)
+    # The total is only known once the last page has been reached
+    page_count = None if next_cursor else page + 1
+    return records, page, page_count, cursors
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8050))
@@ -0,0 +1,37 @@
+-- Tables previously created by init_db(); safe to apply to a database that already has them.
+
+CREATE SCHEMA IF NOT EXISTS stage;
+
+CREATE TABLE IF NOT EXISTS stage.raw_articles (
+                id SERIAL PRIMARY KEY,
+                title TEXT,
+                link TEXT UNIQUE,
+                published TIMESTAMP WITH TIME ZONE, -- More appropriate for PostgreSQL
+                summary TEXT,
+                source TEXT,
+                type TEXT,          -- Retained from original scraper schema
+                created_at TEXT,    -- Retained from original scraper schema
+                sentiment_score REAL,
+                sentiment_label TEXT
+            );
+
+-- Serves /articles keyset pagination (ORDER BY published DESC, id DESC)
+CREATE INDEX IF NOT EXISTS raw_articles_published_id_idx
+    ON stage.raw_articles (published DESC, id DESC);
+
+CREATE TABLE IF NOT EXISTS stage.sentiment_cache (
+                text_hash TEXT PRIMARY KEY, -- SHA-256 of the normalized title + summary
+                version TEXT NOT NULL,      -- Scorer version the score was computed with
+                sentiment_score REAL,
+                sentiment_label TEXT
+            );
+
+-- Daily rollup maintained by src.sentiment.rollup; serves /sentiment-timeseries
+CREATE TABLE IF NOT EXISTS stage.sentiment_daily (
+                day DATE NOT NULL,          -- UTC day of published
+                source TEXT NOT NULL,
+                sentiment_label TEXT NOT NULL,
+                article_count BIGINT NOT NULL,
+                score_sum DOUBLE PRECISION NOT NULL,
+                PRIMARY KEY (day, source, sentiment_label)
+            );
@@ -0,0 +1,17 @@
+-- Indexes for the filters /articles actually receives. Each one ends in the
+-- (published DESC, id DESC) keyset order, so a filtered page is an index range
+-- scan that stops after LIMIT rows.
+
+-- /articles?source=...
+CREATE INDEX IF NOT EXISTS raw_articles_source_published_idx
+    ON stage.raw_articles (source, published DESC, id DESC);
+
+-- /articles?sentiment_label=...
+CREATE INDEX IF NOT EXISTS raw_articles_label_published_idx
+    ON stage.raw_articles (sentiment_label, published DESC, id DESC);
+
+-- The analyzer's keyset scan over unscored rows (WHERE sentiment_label IS NULL AND id > ? ORDER BY id).
+-- Stays as small as the backlog.
+CREATE INDEX IF NOT EXISTS raw_articles_unscored_idx
+    ON stage.raw_articles (id)
+    WHERE sentiment_label IS NULL;
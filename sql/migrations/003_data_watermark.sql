@@ -0,0 +1,9 @@
+-- Single-row table the analyzer stamps on every commit. Together with max(id) of
+-- stage.raw_articles it forms the API's data watermark, which its ETags are derived from.
+
+CREATE TABLE IF NOT EXISTS stage.data_watermark (
+                id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id), -- Only one row
+                analyzed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+            );
+
+INSERT INTO stage.data_watermark (id) VALUES (TRUE) ON CONFLICT (id) DO NOTHING;
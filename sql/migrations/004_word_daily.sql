@@ -0,0 +1,44 @@
+-- Title word frequencies per (UTC day, source, label) bucket, maintained next to
+-- stage.sentiment_daily by src.sentiment.rollup; serves /word-frequencies, which the
+-- dashboard's word cloud is drawn from.
+
+-- Words never counted. Edit, then rebuild with: python -m src.sentiment.rollup --rebuild
+CREATE TABLE IF NOT EXISTS stage.stopwords (
+                word TEXT PRIMARY KEY
+            );
+
+INSERT INTO stage.stopwords (word)
+SELECT unnest(ARRAY[
+    'about', 'above', 'after', 'again', 'against', 'all', 'also', 'and', 'any', 'are',
+    'around', 'because', 'been', 'before', 'being', 'below', 'between', 'both', 'but',
+    'can', 'could', 'did', 'does', 'doing', 'down', 'during', 'each', 'few', 'for',
+    'from', 'further', 'get', 'gets', 'had', 'has', 'have', 'having', 'her', 'here',
+    'hers', 'him', 'his', 'how', 'into', 'its', 'itself', 'just', 'more', 'most', 'new',
+    'not', 'now', 'off', 'once', 'only', 'other', 'our', 'ours', 'out', 'over', 'own',
+    'per', 'says', 'same', 'she', 'should', 'some', 'such', 'than', 'that', 'the',
+    'their', 'theirs', 'them', 'then', 'there', 'these', 'they', 'this', 'those',
+    'through', 'too', 'under', 'until', 'upon', 'very', 'via', 'was', 'were', 'what',
+    'when', 'where', 'which', 'while', 'who', 'whom', 'why', 'will', 'with', 'would',
+    'you', 'your', 'yours'
+])
+ON CONFLICT (word) DO NOTHING;
+
+CREATE TABLE IF NOT EXISTS stage.word_daily (
+                day DATE NOT NULL,          -- UTC day of published
+                source TEXT NOT NULL,
+                sentiment_label TEXT NOT NULL,
+                word TEXT NOT NULL,         -- Lower-cased, at least three letters
+                occurrences BIGINT NOT NULL,
+                PRIMARY KEY (day, source, sentiment_label, word)
+            );
+
+-- Backfill from the articles labelled so far
+INSERT INTO stage.word_daily (day, source, sentiment_label, word, occurrences)
+SELECT (a.published AT TIME ZONE 'UTC')::date, COALESCE(a.source, ''), a.sentiment_label, w.word, COUNT(*)
+FROM stage.raw_articles a
+CROSS JOIN LATERAL regexp_split_to_table(lower(COALESCE(a.title, '')), '[^[:alpha:]]+') AS w(word)
+WHERE a.sentiment_label IS NOT NULL AND a.published IS NOT NULL
+  AND length(w.word) >= 3
+  AND NOT EXISTS (SELECT 1 FROM stage.stopwords s WHERE s.word = w.word)
+GROUP BY 1, 2, 3, 4
+ON CONFLICT (day, source, sentiment_label, word) DO NOTHING;
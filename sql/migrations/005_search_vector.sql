@@ -0,0 +1,16 @@
+-- Full-text search for /search. The vector is a stored generated column, so every
+-- insert or update of title/summary keeps it current without touching the writers;
+-- titles are weighted above summaries for ranking.
+
+ALTER TABLE stage.raw_articles
+    ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', COALESCE(title, '')), 'A') ||
+        setweight(to_tsvector('english', COALESCE(summary, '')), 'B')
+    ) STORED;
+
+-- fastupdate off: rows arrive in small scraper batches, so they go straight into the
+-- index instead of a pending list that every search would have to scan until the
+-- next vacuum (and that makes the planner shy away from the index meanwhile)
+CREATE INDEX IF NOT EXISTS raw_articles_search_idx
+    ON stage.raw_articles USING GIN (search_vector) WITH (fastupdate = off);
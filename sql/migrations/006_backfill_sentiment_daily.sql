@@ -0,0 +1,16 @@
+-- Recompute stage.sentiment_daily from the articles labelled so far. Databases that
+-- predate the rollup only hold what was labelled after the upgrade, and the
+-- dashboard's charts read nothing else. Same query as src.sentiment.rollup's
+-- --rebuild; TRUNCATE makes writers adding to the rollup wait for this commit.
+
+TRUNCATE stage.sentiment_daily;
+
+INSERT INTO stage.sentiment_daily (day, source, sentiment_label, article_count, score_sum)
+SELECT (published AT TIME ZONE 'UTC')::date, COALESCE(source, ''), sentiment_label,
+       COUNT(*), COALESCE(SUM(sentiment_score), 0)
+FROM stage.raw_articles
+WHERE sentiment_label IS NOT NULL AND published IS NOT NULL
+GROUP BY 1, 2, 3;
+
+-- Cached aggregates were built from the partial rollup
+UPDATE stage.data_watermark SET analyzed_at = now();
@@ -0,0 +1,9 @@
+-- sort=-source and sort=-sentiment_label keep each group newest first:
+-- ORDER BY <column> DESC, published DESC, id DESC. The indexes from 002 only serve
+-- that with published reversed, so these ascending ones are read backwards instead.
+
+CREATE INDEX IF NOT EXISTS raw_articles_source_published_asc_idx
+    ON stage.raw_articles (source, published, id);
+
+CREATE INDEX IF NOT EXISTS raw_articles_label_published_asc_idx
+    ON stage.raw_articles (sentiment_label, published, id);
@@ -0,0 +1,5 @@
+-- The scrapers bump insert_version in the same transaction as every insert that adds
+-- rows, so the data watermark moves on each commit. max(id) of stage.raw_articles
+-- did not: a transaction holding a lower id can commit after one holding a higher id.
+
+ALTER TABLE stage.data_watermark ADD COLUMN IF NOT EXISTS insert_version BIGINT NOT NULL DEFAULT 0;
@@ -1,16 +1,15 @@
 create database dhanvani;
 
-CREATE SCHEMA stage;
+-- The schema is defined by the versioned migrations in sql/migrations.
+-- init_db() applies them and records each one in stage.schema_migrations;
+-- to run them by hand instead:  python -m src.migrations
+-- or, from psql in this directory:
 
-CREATE TABLE IF NOT EXISTS stage.raw_articles (
-                id SERIAL PRIMARY KEY,
-                title TEXT,
-                link TEXT UNIQUE,
-                published TIMESTAMP WITH TIME ZONE, -- More appropriate for PostgreSQL
-                summary TEXT,
-                source TEXT,
-                type TEXT,          -- Retained from original scraper schema
-                created_at TEXT,    -- Retained from original scraper schema
-                sentiment_score REAL,
-                sentiment_label TEXT
-            );
+\ir migrations/001_initial_schema.sql
+\ir migrations/002_hot_path_indexes.sql
+\ir migrations/003_data_watermark.sql
+\ir migrations/004_word_daily.sql
+\ir migrations/005_search_vector.sql
+\ir migrations/006_backfill_sentiment_daily.sql
+\ir migrations/007_group_desc_indexes.sql
+\ir migrations/008_insert_watermark.sql
@@ -4,8 +4,49 @@ import os
 # DB_PATH = os.getenv("DB_PATH", "data/db.sqlite") # No longer primary DB path
 DATABASE_URL = os.getenv("DATABASE_URL") # For Supabase PostgreSQL
 
+# Connection pool settings
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))                     # Connections kept open when idle
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))                    # Upper bound on open connections
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))                    # Seconds to wait for a free connection
+DB_POOL_MAX_AGE = float(os.getenv("DB_POOL_MAX_AGE", "1800"))                  # Seconds before a connection is recycled
+DB_POOL_HEALTH_CHECK_IDLE = float(os.getenv("DB_POOL_HEALTH_CHECK_IDLE", "60")) # Ping connections idle longer than this
+DB_POOL_MAX_IDLE = float(os.getenv("DB_POOL_MAX_IDLE", "300"))                # Close idle connections above the minimum after this
+
+# Async pool used by the API (asyncpg)
+API_DB_POOL_MIN_SIZE = int(os.getenv("API_DB_POOL_MIN_SIZE", "2"))
+API_DB_POOL_MAX_SIZE = int(os.getenv("API_DB_POOL_MAX_SIZE", "20"))
+API_DB_POOL_TIMEOUT = float(os.getenv("API_DB_POOL_TIMEOUT", "10"))
+API_DB_STATEMENT_CACHE_SIZE = int(os.getenv("API_DB_STATEMENT_CACHE_SIZE", "100")) # Set to 0 behind a transaction-mode pgbouncer
+
+# Response cache for the API's aggregate endpoints
+API_CACHE_TTL = float(os.getenv("API_CACHE_TTL", "300")) # Seconds; 0 disables caching
+API_CACHE_MAX_ENTRIES = int(os.getenv("API_CACHE_MAX_ENTRIES", "256"))
+API_WATERMARK_TTL = float(os.getenv("API_WATERMARK_TTL", "5")) # Seconds an ETag watermark is reused before re-reading it
+API_EXPORT_CHUNK_SIZE = int(os.getenv("API_EXPORT_CHUNK_SIZE", "1000")) # Rows per fetch when streaming /articles/export
+
+# Scraper fetch settings
+FETCH_MAX_WORKERS = int(os.getenv("FETCH_MAX_WORKERS", "16"))          # Total concurrent feed downloads
+FETCH_PER_HOST_LIMIT = int(os.getenv("FETCH_PER_HOST_LIMIT", "4"))     # Concurrent downloads against a single host
+FETCH_FEED_TIMEOUT = float(os.getenv("FETCH_FEED_TIMEOUT", "10"))      # Seconds allowed for a single feed, end to end
+FETCH_RUN_DEADLINE = float(os.getenv("FETCH_RUN_DEADLINE", "120"))     # Seconds allowed for fetching all feeds in a run
+FEED_CACHE_PATH = os.getenv("FEED_CACHE_PATH", "data/feed_cache.json")  # ETag / Last-Modified validators per feed URL
+SEEN_INDEX_PATH = os.getenv("SEEN_INDEX_PATH", "data/seen_links.bloom")  # Bloom filter of links already saved
+SEEN_INDEX_CAPACITY = int(os.getenv("SEEN_INDEX_CAPACITY", "200000"))    # Links the filter is sized for (~480 KB at 1e-4)
+SEEN_INDEX_FP_RATE = float(os.getenv("SEEN_INDEX_FP_RATE", "0.0001"))    # Chance a new link is wrongly treated as seen
+
+# Sentiment settings
+SCORE_AT_INGEST = os.getenv("SCORE_AT_INGEST", "false").lower() == "true" # Score articles as they are scraped instead of afterwards
+SENTIMENT_CHUNK_SIZE = int(os.getenv("SENTIMENT_CHUNK_SIZE", "1000"))     # Articles read, scored and committed per chunk
+SENTIMENT_WORKERS = int(os.getenv("SENTIMENT_WORKERS", "0"))              # Scoring processes; 0 means one per CPU
+SENTIMENT_BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", "100"))      # Articles sent to a worker at a time
+SENTIMENT_PARALLEL_MIN_ROWS = int(os.getenv("SENTIMENT_PARALLEL_MIN_ROWS", "500")) # Smaller backlogs are scored serially
+SENTIMENT_CACHE_SIZE = int(os.getenv("SENTIMENT_CACHE_SIZE", "50000"))    # Scores kept in the in-memory LRU
+
+# Metrics settings
+METRICS_PROFILE_DIR = os.getenv("METRICS_PROFILE_DIR", "") # Write a JSON metrics profile per scrape run here; empty disables
+
 # Ensure data folder exists - can be called by main application entry points
 def init_app_config():
     # os.makedirs(os.path.dirname(DB_PATH), exist_ok=True) # Not needed for remote DB
     if not DATABASE_URL:
-        print("WARNING: DATABASE_URL environment variable is not set.")
\ No newline at end of file
+        print("WARNING: DATABASE_URL environment variable is not set.")
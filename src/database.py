@@ -1,55 +1,281 @@
 # import sqlite3 # No longer using SQLite as the primary DB
 import psycopg2
+import psycopg2.extensions
+import psycopg2.pool # For PoolError
 import psycopg2.extras # For dictionary cursor
 import logging
-from typing import Optional
-from .config import DATABASE_URL
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional, Iterator
+from .config import DATABASE_URL, DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_TIMEOUT, DB_POOL_MAX_AGE, DB_POOL_HEALTH_CHECK_IDLE, DB_POOL_MAX_IDLE
+from .metrics import StatementTimers
+
+_statement_timer = StatementTimers("worker")
+_execute = psycopg2.extensions.cursor.execute
+
+class TimedCursor(psycopg2.extensions.cursor):
+    """Cursor that records every statement's latency in dhanvani_db_query_seconds."""
+
+    def execute(self, query, vars=None):
+        started = time.perf_counter()
+        try:
+            return _execute(self, query, vars)
+        finally:
+            _statement_timer(query).observe(time.perf_counter() - started)
 
 def get_db_connection() -> Optional[psycopg2.extensions.connection]:
-    """Helper to get a database connection."""
+    """Helper to get a new, unpooled database connection. Prefer db_connection()."""
     if not DATABASE_URL:
         logging.error("DATABASE_URL is not configured.")
         return None
     try:
-        conn = psycopg2.connect(DATABASE_URL)
+        conn = psycopg2.connect(DATABASE_URL, cursor_factory=TimedCursor)
         return conn
     except psycopg2.Error as e:
         logging.error(f"Error connecting to PostgreSQL database: {e}")
         return None
 
+class _PooledConnection:
+    __slots__ = ("conn", "created_at", "last_used")
+
+    def __init__(self, conn: psycopg2.extensions.connection):
+        self.conn = conn
+        self.created_at = self.last_used = time.monotonic()
+
+class ConnectionPool:
+    """
+    Thread-safe pool of PostgreSQL connections.
+
+    Checkouts block for up to `timeout` seconds when all `max_size` connections
+    are in use. Connections older than `max_age` are recycled, and connections
+    idle for longer than `health_check_idle` are pinged before being handed out.
+    Idle connections above `min_size` are closed once unused for `max_idle` seconds.
+    """
+
+    def __init__(self, dsn: str, min_size: int = 1, max_size: int = 10, timeout: float = 30.0,
+                 max_age: float = 1800.0, health_check_idle: float = 60.0, max_idle: float = 300.0):
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_age = max_age
+        self.health_check_idle = health_check_idle
+        self.max_idle = max_idle
+        self._idle: deque = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._in_use = {}
+        # Stats
+        self._checkouts = 0
+        self._timeouts = 0
+        self._created = 0
+        self._recycled = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _connect(self) -> _PooledConnection:
+        conn = psycopg2.connect(self.dsn, cursor_factory=TimedCursor)
+        with self._lock:
+            self._created += 1
+        return _PooledConnection(conn)
+
+    def fill(self) -> None:
+        """Open connections until min_size are idle."""
+        while True:
+            with self._lock:
+                if len(self._idle) + len(self._in_use) >= self.min_size:
+                    return
+            pooled = self._connect()
+            with self._lock:
+                self._idle.append(pooled)
+
+    def _is_usable(self, pooled: _PooledConnection) -> bool:
+        now = time.monotonic()
+        if pooled.conn.closed or now - pooled.created_at > self.max_age:
+            return False
+        if now - pooled.last_used > self.health_check_idle:
+            try:
+                with pooled.conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                pooled.conn.rollback()
+            except psycopg2.Error:
+                return False
+        return True
+
+    def _discard(self, pooled: _PooledConnection) -> None:
+        with self._lock:
+            self._recycled += 1
+        try:
+            pooled.conn.close()
+        except psycopg2.Error:
+            pass
+
+    def getconn(self, timeout: Optional[float] = None) -> psycopg2.extensions.connection:
+        """Check out a healthy connection, raising psycopg2.pool.PoolError on timeout."""
+        started = time.monotonic()
+        if not self._slots.acquire(timeout=self.timeout if timeout is None else timeout):
+            with self._lock:
+                self._timeouts += 1
+            raise psycopg2.pool.PoolError(f"Timed out waiting for a database connection ({self.max_size} in use)")
+        try:
+            while True:
+                with self._lock:
+                    pooled = self._idle.pop() if self._idle else None
+                if pooled is None:
+                    pooled = self._connect()
+                    break
+                if self._is_usable(pooled):
+                    break
+                self._discard(pooled)
+        except Exception:
+            self._slots.release()
+            raise
+        waited = time.monotonic() - started
+        with self._lock:
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+            self._in_use[id(pooled.conn)] = pooled
+        return pooled.conn
+
+    def putconn(self, conn: psycopg2.extensions.connection) -> None:
+        """Return a connection, rolling back any open transaction first."""
+        with self._lock:
+            pooled = self._in_use.pop(id(conn), None)
+        if pooled is None:
+            return
+        reusable = not conn.closed
+        try:
+            if reusable and conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            reusable = reusable and conn.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_IDLE
+        except psycopg2.Error:
+            reusable = False
+        if not reusable:
+            self._discard(pooled)
+        else:
+            pooled.last_used = time.monotonic()
+            with self._lock:
+                self._idle.append(pooled)
+        for stale in self._trim():
+            self._discard(stale)
+        self._slots.release()
+
+    def _trim(self) -> list:
+        """Take idle connections above min_size that went unused for max_idle seconds out of the pool."""
+        # getconn takes from the right, so the least recently used connections sit on the left
+        cutoff = time.monotonic() - self.max_idle
+        stale = []
+        with self._lock:
+            while (self._idle and self._idle[0].last_used < cutoff
+                   and len(self._idle) + len(self._in_use) > self.min_size):
+                stale.append(self._idle.popleft())
+        return stale
+
+    def closeall(self) -> None:
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for pooled in idle:
+            pooled.conn.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_use = len(self._in_use)
+            return {
+                "size": in_use + len(self._idle),
+                "in_use": in_use,
+                "idle": len(self._idle),
+                "max_size": self.max_size,
+                "utilization": in_use / self.max_size,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "connections_created": self._created,
+                "connections_recycled": self._recycled,
+                "wait_seconds_total": self._wait_total,
+                "wait_seconds_avg": self._wait_total / self._checkouts if self._checkouts else 0.0,
+                "wait_seconds_max": self._wait_max,
+            }
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> Optional[ConnectionPool]:
+    """Return the process-wide connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        if not DATABASE_URL:
+            logging.error("DATABASE_URL is not configured.")
+            return None
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    DATABASE_URL,
+                    min_size=DB_POOL_MIN_SIZE,
+                    max_size=DB_POOL_MAX_SIZE,
+                    timeout=DB_POOL_TIMEOUT,
+                    max_age=DB_POOL_MAX_AGE,
+                    health_check_idle=DB_POOL_HEALTH_CHECK_IDLE,
+                    max_idle=DB_POOL_MAX_IDLE,
+                )
+                try:
+                    _pool.fill()
+                except psycopg2.Error as e:
+                    # Checkouts still connect on demand once the database is reachable
+                    logging.error(f"Error opening the initial pooled database connections: {e}")
+    return _pool
+
+@contextmanager
+def db_connection() -> Iterator[Optional[psycopg2.extensions.connection]]:
+    """
+    Check out a pooled connection for the duration of a with-block.
+
+    Yields None if the database is not configured or no connection could be
+    obtained, mirroring get_db_connection(). Uncommitted work is rolled back
+    when the connection goes back to the pool.
+    """
+    pool = get_pool()
+    conn = None
+    if pool is not None:
+        try:
+            conn = pool.getconn()
+        except psycopg2.Error as e:
+            logging.error(f"Error getting a pooled database connection: {e}")
+    if conn is None:
+        yield None
+        return
+    try:
+        yield conn
+    finally:
+        pool.putconn(conn)
+
 def init_db() -> None:
     """
-    Initialize the raw_articles table in the PostgreSQL database.
+    Bring the database schema up to date by applying pending migrations
+    from sql/migrations (see src.migrations).
     Note: For Supabase, you typically create tables via their UI or SQL editor.
     This function can be used for initial setup or ensuring schema.
     """
-    conn: Optional[psycopg2.extensions.connection] = None
+    from .migrations import apply_migrations
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS stage.raw_articles (
-                id SERIAL PRIMARY KEY,
-                title TEXT,
-                link TEXT UNIQUE,
-                published TIMESTAMP WITH TIME ZONE, -- More appropriate for PostgreSQL
-                summary TEXT,
-                source TEXT,
-                type TEXT,          -- Retained from original scraper schema
-                created_at TEXT,    -- Retained from original scraper schema
-                sentiment_score REAL,
-                sentiment_label TEXT
-            )
-        """)
-        conn.commit()
-        logging.info("Database table 'stage.raw_articles' checked/initialized successfully.")
+        with db_connection() as conn:
+            apply_migrations(conn)
+        logging.info("Database tables in schema 'stage' checked/initialized successfully.")
     except psycopg2.Error as e:
         logging.error(f"Error initializing database: {e}")
     except AttributeError: # If conn is None
         logging.error("Database connection could not be established for init_db.")
-    finally:
-        if conn is not None:
-            conn.close()
+
+def stamp_watermark(conn) -> None:
+    """Record, in the caller's transaction, that labels and the rollups changed (see sql/migrations/003_data_watermark.sql)."""
+    with conn.cursor() as cursor:
+        cursor.execute("UPDATE stage.data_watermark SET analyzed_at = now()")
+
+def stamp_inserted(conn) -> None:
+    """Record, in the caller's transaction, that articles were inserted (see sql/migrations/008_insert_watermark.sql)."""
+    with conn.cursor() as cursor:
+        cursor.execute("UPDATE stage.data_watermark SET insert_version = insert_version + 1")
 
 # Example of how you might alter the table if needed, e.g., after initial creation
 # def alter_table_example():
@@ -0,0 +1,138 @@
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+# Single-flight background jobs.
+# One worker thread runs jobs off the request event loop. While a job is queued or
+# running, further submissions are coalesced into it instead of starting a second
+# run. Jobs report progress and are cancelled cooperatively: long-running code
+# calls the job's reporters, which raise JobCancelled once a cancel was requested.
+
+HISTORY_SIZE = 50 # Finished jobs kept for /jobs/{id}
+
+class JobCancelled(Exception):
+    """Raised inside a job at its next progress report after cancellation was requested."""
+
+class Job:
+    def __init__(self, name: str):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.status = "queued" # queued -> running -> succeeded | failed | cancelled
+        self.error: Optional[str] = None
+        self.coalesced = 0     # Submissions folded into this job
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.progress: dict = {}
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed", "cancelled")
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def check_cancelled(self) -> None:
+        if self._cancel.is_set():
+            raise JobCancelled(f"Job {self.id} was cancelled")
+
+    def update(self, **progress: Any) -> None:
+        """Record progress fields (e.g. phase="scoring") and stop here if the job was cancelled."""
+        with self._lock:
+            self.progress.update(progress)
+        self.check_cancelled()
+
+    def reporter(self, field: str) -> Callable[[int], None]:
+        """Callback setting one progress counter, for code that knows nothing about jobs."""
+        return lambda value: self.update(**{field: value})
+
+    def track(self, items: Iterable, field: str) -> Iterator:
+        """Pass items through, counting them in progress[field] and stopping early on cancellation."""
+        count = 0
+        self.update(**{field: count})
+        for item in items:
+            yield item
+            count += 1
+            self.update(**{field: count})
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            progress = dict(self.progress)
+        return {
+            "id": self.id,
+            "name": self.name,
+            "status": self.status,
+            "error": self.error,
+            "coalesced": self.coalesced,
+            "cancel_requested": self._cancel.is_set(),
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "progress": progress,
+        }
+
+class JobRunner:
+    def __init__(self, history_size: int = HISTORY_SIZE):
+        self.history_size = history_size
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._active: Optional[Job] = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-runner")
+
+    def submit(self, name: str, fn: Callable[[Job], Any]) -> Tuple[Job, bool]:
+        """
+        Run fn(job) on the worker thread unless a job is already queued or running.
+
+        Returns (job, started): the new job and True, or the job in flight and False.
+        """
+        with self._lock:
+            if self._active is not None and not self._active.done:
+                self._active.coalesced += 1
+                return self._active, False
+            job = Job(name)
+            self._active = job
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.history_size:
+                self._jobs.popitem(last=False)
+        self._executor.submit(self._run, job, fn)
+        return job, True
+
+    def _run(self, job: Job, fn: Callable[[Job], Any]) -> None:
+        job.started_at = datetime.now(timezone.utc)
+        job.status = "running"
+        try:
+            job.check_cancelled()
+            fn(job)
+            job.status = "succeeded"
+        except JobCancelled:
+            logging.info(f"Job {job.name} ({job.id}) cancelled.")
+            job.status = "cancelled"
+        except Exception as e:
+            logging.error(f"Job {job.name} ({job.id}) failed: {e}")
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self.get(job_id)
+        if job is not None and not job.done:
+            job.cancel()
+        return job
+
+    def shutdown(self) -> None:
+        """Ask the job in flight to stop, without waiting for it."""
+        with self._lock:
+            if self._active is not None and not self._active.done:
+                self._active.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
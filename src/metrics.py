@@ -0,0 +1,309 @@
+import bisect
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# In-process metrics with Prometheus text exposition.
+# Counters and histograms are registered once at import time by the modules that
+# record them; recording is a dict lookup plus a locked add for counters and an
+# append for histograms, well under a microsecond, which is negligible next to
+# the network and database work being measured.
+
+# Observations a histogram child holds before folding them into its buckets
+_FOLD_AFTER = 1024
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def samples(self) -> List[Tuple[Dict[str, str], object]]:
+        with self._lock:
+            items = list(self._children.items())
+        return [(dict(zip(self.labelnames, key)), child) for key, child in items]
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+class _HistogramChild:
+    __slots__ = ("buckets", "_counts", "_count", "_sum", "_pending", "_lock")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self._counts = [0] * (len(buckets) + 1) # Last slot is +Inf
+        self._count = 0
+        self._sum = 0.0
+        # deque.append is atomic, so observing takes no lock; values are folded
+        # into the buckets when read, or once enough of them have piled up
+        self._pending = deque()
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        self._pending.append(value)
+        if len(self._pending) >= _FOLD_AFTER:
+            self._fold()
+
+    def _fold(self) -> None:
+        with self._lock:
+            pending = self._pending
+            while pending:
+                value = pending.popleft()
+                self._counts[bisect.bisect_left(self.buckets, value)] += 1
+                self._count += 1
+                self._sum += value
+
+    def totals(self) -> Tuple[List[int], int, float]:
+        """(per-bucket counts, count, sum) of everything observed so far."""
+        self._fold()
+        with self._lock:
+            return list(self._counts), self._count, self._sum
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing # Re-imported module; keep the live series
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for labels, child in metric.samples():
+                if metric.kind == "histogram":
+                    counts, total_count, total_sum = child.totals()
+                    cumulative = 0
+                    for bound, count in zip(list(metric.buckets) + ["+Inf"], counts):
+                        cumulative += count
+                        lines.append(f"{metric.name}_bucket{_labels(labels, le=_number(bound))} {cumulative}")
+                    lines.append(f"{metric.name}_count{_labels(labels)} {total_count}")
+                    lines.append(f"{metric.name}_sum{_labels(labels)} {_number(total_sum)}")
+                else:
+                    lines.append(f"{metric.name}{_labels(labels)} {_number(child.value)}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict:
+        """Current values as plain data: {name: {"type", "samples": [{"labels", ...values}]}}."""
+        result = {}
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            samples = []
+            for labels, child in metric.samples():
+                if metric.kind == "histogram":
+                    counts, total_count, total_sum = child.totals()
+                    samples.append({"labels": labels, "count": total_count, "sum": total_sum, "buckets": counts})
+                else:
+                    samples.append({"labels": labels, "value": child.value})
+            result[metric.name] = {"type": metric.kind, "samples": samples}
+        return result
+
+def _number(value) -> str:
+    if isinstance(value, str):
+        return value
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(labels: Dict[str, str], **extra: str) -> str:
+    items = {**labels, **extra}
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items.items()) + "}"
+
+REGISTRY = Registry()
+
+def profile_since(before: dict, after: Optional[dict] = None) -> dict:
+    """What changed between two snapshots: counter deltas, histogram count/sum deltas, gauges as they are now."""
+    after = after if after is not None else REGISTRY.snapshot()
+    profile = {}
+    for name, metric in after.items():
+        previous = {json.dumps(s["labels"], sort_keys=True): s for s in before.get(name, {}).get("samples", [])}
+        samples = []
+        for sample in metric["samples"]:
+            old = previous.get(json.dumps(sample["labels"], sort_keys=True))
+            if metric["type"] == "histogram":
+                count = sample["count"] - (old["count"] if old else 0)
+                if count:
+                    total = sample["sum"] - (old["sum"] if old else 0.0)
+                    samples.append({"labels": sample["labels"], "count": count, "sum": total, "avg": total / count})
+            elif metric["type"] == "counter":
+                value = sample["value"] - (old["value"] if old else 0.0)
+                if value:
+                    samples.append({"labels": sample["labels"], "value": value})
+            else:
+                samples.append({"labels": sample["labels"], "value": sample["value"]})
+        if samples:
+            profile[name] = samples
+    return profile
+
+def write_profile(directory: str, name: str, before: dict, started_at: datetime) -> Optional[str]:
+    """Write the metrics recorded since `before` to <directory>/<name>-<timestamp>.json and return its path."""
+    finished_at = datetime.now(timezone.utc)
+    path = os.path.join(directory, f"{name}-{started_at.strftime('%Y%m%dT%H%M%SZ')}.json")
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "run": name,
+                "started_at": started_at.isoformat(),
+                "finished_at": finished_at.isoformat(),
+                "duration_seconds": (finished_at - started_at).total_seconds(),
+                "metrics": profile_since(before),
+            }, f, indent=2)
+    except OSError as e:
+        logging.error(f"Error writing metrics profile {path}: {e}")
+        return None
+    logging.info(f"Wrote metrics profile to {path}.")
+    return path
+
+# Database statements are labelled by verb and table, e.g. "insert stage.raw_articles"
+_STATEMENT_VERB = re.compile(r"^\s*(\w+)")
+_STATEMENT_TABLE = re.compile(r"\b(stage\.\w+)", re.IGNORECASE)
+
+_statement_labels: Dict[object, str] = {}
+
+def statement_label(query) -> str:
+    # The verb and table sit at the start of every statement; execute_values inlines
+    # its VALUES further on, so keying by a prefix keeps the cache small
+    prefix = query[:160] if isinstance(query, (str, bytes)) else str(query)[:160]
+    label = _statement_labels.get(prefix)
+    if label is None:
+        text = prefix.decode("utf-8", "replace") if isinstance(prefix, bytes) else prefix
+        verb = _STATEMENT_VERB.match(text)
+        table = _STATEMENT_TABLE.search(text)
+        label = f"{verb.group(1).lower() if verb else 'unknown'} {table.group(1).lower() if table else '-'}"
+        if len(_statement_labels) >= 1024:
+            _statement_labels.clear()
+        _statement_labels[prefix] = label
+    return label
+
+DB_QUERY_SECONDS = REGISTRY.histogram(
+    "dhanvani_db_query_seconds", "Database statement latency by statement kind.", ["client", "statement"]
+)
+
+# Longer statements are execute_values batches with their rows inlined, each sent once
+_TIMER_CACHE_MAX_QUERY = 2048
+
+class StatementTimers:
+    """
+    DB_QUERY_SECONDS children for one client, cached by statement text.
+
+    A repeated statement then costs one dict lookup (str and bytes cache their
+    hash) instead of slicing its prefix for statement_label and resolving the
+    labels on every execution.
+    """
+
+    def __init__(self, client: str):
+        self.client = client
+        self._children: Dict[object, _HistogramChild] = {}
+
+    def __call__(self, query) -> _HistogramChild:
+        child = self._children.get(query)
+        if child is None:
+            child = DB_QUERY_SECONDS.labels(self.client, statement_label(query))
+            if isinstance(query, (str, bytes)) and len(query) <= _TIMER_CACHE_MAX_QUERY:
+                if len(self._children) >= 1024:
+                    self._children.clear()
+                self._children[query] = child
+        return child
@@ -0,0 +1,76 @@
+import logging
+import os
+import re
+from typing import List, Tuple
+import psycopg2
+
+# Versioned schema migrations.
+# Each sql/migrations/NNN_name.sql file is applied once, in version order, in its
+# own transaction, and recorded in stage.schema_migrations. Never edit a migration
+# that has shipped; add a new file instead.
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sql", "migrations")
+_MIGRATION_FILE = re.compile(r"^(\d+)_(\w+)\.sql$")
+# Arbitrary key for pg_advisory_xact_lock, so two processes starting together don't both migrate
+_MIGRATION_LOCK_KEY = 4221807
+
+def available_migrations(directory: str = MIGRATIONS_DIR) -> List[Tuple[int, str, str]]:
+    """(version, name, path) for every migration file, in version order."""
+    migrations = []
+    for filename in os.listdir(directory):
+        match = _MIGRATION_FILE.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(directory, filename)))
+    return sorted(migrations)
+
+def applied_versions(conn) -> set:
+    with conn.cursor() as cursor:
+        cursor.execute("CREATE SCHEMA IF NOT EXISTS stage")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS stage.schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+            )
+        """)
+        cursor.execute("SELECT version FROM stage.schema_migrations")
+        versions = {row[0] for row in cursor.fetchall()}
+    conn.commit()
+    return versions
+
+def apply_migrations(conn, directory: str = MIGRATIONS_DIR) -> List[str]:
+    """Apply every pending migration and return the names of those applied."""
+    applied = []
+    done = applied_versions(conn)
+    for version, name, path in available_migrations(directory):
+        if version in done:
+            continue
+        with open(path, encoding="utf-8") as f:
+            sql = f.read()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(%s)", (_MIGRATION_LOCK_KEY,))
+                # Another process may have applied it while we waited for the lock
+                cursor.execute("SELECT 1 FROM stage.schema_migrations WHERE version = %s", (version,))
+                if cursor.fetchone():
+                    conn.rollback()
+                    continue
+                cursor.execute(sql)
+                cursor.execute("INSERT INTO stage.schema_migrations (version, name) VALUES (%s, %s)", (version, name))
+            conn.commit()
+        except psycopg2.Error:
+            conn.rollback()
+            logging.error(f"Migration {version:03d}_{name} failed; later migrations were not applied.")
+            raise
+        logging.info(f"Applied migration {version:03d}_{name}.")
+        applied.append(f"{version:03d}_{name}")
+    return applied
+
+if __name__ == '__main__':
+    from .database import db_connection
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    with db_connection() as conn:
+        if conn is None:
+            raise SystemExit("Database connection could not be established.")
+        applied = apply_migrations(conn)
+    logging.info(f"Schema is up to date ({len(applied)} migrations applied).")
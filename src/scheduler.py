@@ -3,27 +3,50 @@
 import subprocess
 import warnings
 import logging
+from datetime import datetime, timezone
+from typing import Optional
 
 # Import the main functions from your modules
 from src.scrapers.__main__ import main as run_scraper_main
 from src.sentiment.analyzer import run_sentiment_analysis
+from src.jobs import Job, JobCancelled
+from src.config import METRICS_PROFILE_DIR
+from src.metrics import REGISTRY, write_profile
 
 warnings.filterwarnings("ignore")
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
-def perform_scraping_and_analysis():
-    """Performs the scraping and sentiment analysis tasks."""
+def perform_scraping_and_analysis(job: Optional[Job] = None):
+    """
+    Performs the scraping and sentiment analysis tasks.
+
+    When run as a job (see src.jobs), progress is reported to it and errors
+    and cancellation are re-raised so the job records them.
+    """
     logging.info("Starting task: Scraping and Sentiment Analysis")
+    metrics_before = REGISTRY.snapshot() if METRICS_PROFILE_DIR else None
+    started_at = datetime.now(timezone.utc)
     try:
         logging.info("Running scraper...")
-        run_scraper_main() # Call the scraper's main function
+        run_scraper_main(job=job) # Call the scraper's main function
         logging.info("Scraping finished.")
 
+        # Catches up on any rows the scraper left unscored (all of them unless SCORE_AT_INGEST is set)
         logging.info("Running sentiment analysis...")
-        run_sentiment_analysis() # Call the sentiment analysis function
+        if job is not None:
+            job.update(phase="scoring", rows_scored=0)
+        run_sentiment_analysis(progress=job.reporter("rows_scored") if job else None) # Call the sentiment analysis function
         logging.info("Sentiment analysis finished.")
+    except JobCancelled:
+        logging.info("Task: Scraping and Sentiment Analysis cancelled.")
+        raise
     except Exception as e:
         logging.error(f"Error during scheduled task: {e}")
+        if job is not None:
+            raise
+    finally:
+        if metrics_before is not None:
+            write_profile(METRICS_PROFILE_DIR, "scrape", metrics_before, started_at)
     logging.info("Task: Scraping and Sentiment Analysis completed.")
 
 # The following block is removed as scheduling will be external
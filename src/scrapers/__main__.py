@@ -1,23 +1,65 @@
 import logging
-from src.config import init_app_config # Updated import
-from src.database import init_db      # Updated import
-from .fetcher import fetch_articles   # Relative import within the package
-from .saver import save_articles      # Relative import
+from typing import Optional
+from src.config import init_app_config, FEED_CACHE_PATH, SEEN_INDEX_PATH, SEEN_INDEX_CAPACITY, SEEN_INDEX_FP_RATE, SCORE_AT_INGEST # Updated import
+from src.database import init_db, db_connection # Updated import
+from .feed_cache import FeedCache     # Relative import within the package
+from .fetcher import fetch_all_sources # Relative import within the package
+from .pipeline import run_pipeline   # Relative import
+from .saver import save_articles, SaveResult # Relative import
+from .seen_index import load_seen_index # Relative import
 from .sources import SOURCES          # Relative import
+from src.jobs import Job
 
-def main():
+def main(score_at_ingest: bool = SCORE_AT_INGEST, job: Optional[Job] = None):
+    """Scrape every source and save new articles; a job, if given, gets progress reports and can cancel the run."""
     logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s")
     init_app_config() # Call the centralized config initialization
     init_db()
 
-    for source in SOURCES:
-        for url in source["urls"]:
-            logging.info(f"Scraping from {source['name']} - {url}")
-            articles = fetch_articles({"url": url, "headers": source.get("headers")})
-            if articles is not None:
-                save_articles(articles, source["name"])
+    cache = FeedCache(FEED_CACHE_PATH)
+    cache.load()
 
-    logging.info("News scraping completed.")
+    # One pooled connection is shared by every save in the run
+    with db_connection() as conn:
+        if conn is None:
+            logging.error("Database connection could not be established; skipping scrape.")
+            return
+        seen = load_seen_index(SEEN_INDEX_PATH, SEEN_INDEX_CAPACITY, SEEN_INDEX_FP_RATE, conn)
+
+        totals = SaveResult()
+        try:
+            # Feeds are downloaded concurrently; each result is saved as soon as it arrives
+            feeds = fetch_all_sources(SOURCES, cache=cache)
+            if job is not None:
+                job.update(phase="scraping", feeds_total=sum(len(source["urls"]) for source in SOURCES), rows_inserted=0)
+                feeds = job.track(feeds, "feeds_fetched")
+            if score_at_ingest:
+                totals = run_pipeline(
+                    feeds, conn, seen=seen, progress=job.reporter("rows_inserted") if job else None, feed_saved=cache.commit
+                )
+            else:
+                for source_name, url, articles in feeds:
+                    logging.info(f"Scraped {source_name} - {url}")
+                    if articles: # Empty when the feed is unchanged since the last run
+                        result = save_articles(articles, source_name, conn=conn, seen=seen)
+                        totals += result
+                        if job is not None:
+                            job.update(rows_inserted=totals.inserted)
+                        if result.failed:
+                            continue # Keep the old validators so the feed is fetched again next run
+                    cache.commit(url)
+        finally:
+            # Also after a cancellation: what was committed so far need not be fetched or sent again
+            cache.save()
+            cache.log_stats()
+            seen.save(SEEN_INDEX_PATH)
+            logging.info(
+                f"Seen-link index filtered {seen.links_filtered} known links, saving {seen.round_trips_saved} database round trips."
+            )
+
+    logging.info(
+        f"News scraping completed. Inserted {totals.inserted}, skipped {totals.skipped}, failed {totals.failed}."
+    )
 
 if __name__ == "__main__":
     main()
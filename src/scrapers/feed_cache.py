@@ -0,0 +1,102 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, Optional
+
+class FeedCache:
+    """
+    Persistent per-URL cache of HTTP validators for RSS feeds.
+
+    Stores the ETag, Last-Modified and a SHA-256 of the last body seen for each
+    feed URL so unchanged feeds can be skipped without re-parsing them. Hit and
+    miss counts are tracked per source for the current run.
+
+    Validators of a new download are only staged; the caller commits them once
+    the feed's articles are saved, so a feed whose rows failed is fetched and
+    parsed again on the next run instead of being answered with a 304.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: Dict[str, dict] = {}
+        self._pending: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self.hits: Dict[str, int] = defaultdict(int)
+        self.misses: Dict[str, int] = defaultdict(int)
+
+    def load(self) -> None:
+        """Load validators saved by a previous run, if any."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+            logging.info(f"Loaded feed cache with {len(self._entries)} entries from {self.path}.")
+        except FileNotFoundError:
+            self._entries = {}
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable feed cache {self.path}: {e}")
+            self._entries = {}
+
+    def save(self) -> None:
+        """Write validators to disk atomically."""
+        with self._lock:
+            data = dict(self._entries)
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.error(f"Error saving feed cache to {self.path}: {e}")
+
+    def conditional_headers(self, url: str) -> dict:
+        """Return If-None-Match / If-Modified-Since headers for a URL."""
+        with self._lock:
+            entry = self._entries.get(url) or {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def is_unchanged(self, url: str, content: bytes) -> bool:
+        """True if the body is byte-identical to the last one seen for this URL."""
+        with self._lock:
+            entry = self._entries.get(url) or {}
+        return entry.get("content_hash") == hashlib.sha256(content).hexdigest()
+
+    def stage(self, url: str, etag: Optional[str], last_modified: Optional[str], content: bytes) -> None:
+        """Hold the validators and body hash of a freshly downloaded feed until commit(url)."""
+        with self._lock:
+            self._pending[url] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "content_hash": hashlib.sha256(content).hexdigest(),
+            }
+
+    def commit(self, url: str) -> None:
+        """Keep the staged validators of a feed whose articles were saved; a no-op if none are staged."""
+        with self._lock:
+            entry = self._pending.pop(url, None)
+            if entry is not None:
+                self._entries[url] = entry
+
+    def record(self, source_name: str, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits[source_name] += 1
+            else:
+                self.misses[source_name] += 1
+
+    def log_stats(self) -> None:
+        """Log the hit/miss counts of this run, per source."""
+        for source_name in sorted(set(self.hits) | set(self.misses)):
+            logging.info(
+                f"Feed cache {source_name}: {self.hits[source_name]} hits, {self.misses[source_name]} misses."
+            )
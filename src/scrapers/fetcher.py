@@ -1,18 +1,177 @@
 import requests
 import feedparser
 import logging
-from typing import List, Any, Optional
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import List, Any, Optional, Dict, Iterator, Tuple
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from src.config import FETCH_MAX_WORKERS, FETCH_PER_HOST_LIMIT, FETCH_FEED_TIMEOUT, FETCH_RUN_DEADLINE
+from .feed_cache import FeedCache
+from src.metrics import REGISTRY
 import warnings
 warnings.filterwarnings("ignore")
 
-def fetch_articles(source: dict) -> Optional[List[Any]]:
-    """Fetch articles from the RSS feed."""
+CHUNK_SIZE = 64 * 1024
+
+FEED_FETCH_SECONDS = REGISTRY.histogram("dhanvani_feed_fetch_seconds", "Time to download one feed, including 304s.", ["source"])
+FEED_BYTES = REGISTRY.counter("dhanvani_feed_bytes_total", "Feed body bytes downloaded.", ["source"])
+FEED_PARSE_SECONDS = REGISTRY.histogram("dhanvani_feed_parse_seconds", "feedparser.parse time per feed.", ["source"])
+FEED_ERRORS = REGISTRY.counter("dhanvani_feed_errors_total", "Feeds that failed to download or parse.", ["source"])
+
+class FeedDeadlineExceeded(Exception):
+    """Raised when a single feed takes longer than its deadline to download."""
+
+def _read_body(response: requests.Response, deadline: float) -> bytes:
+    """Read a streamed response body, giving up once the deadline has passed."""
+    chunks = []
+    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+        chunks.append(chunk)
+        if time.monotonic() > deadline:
+            raise FeedDeadlineExceeded(f"Feed exceeded its deadline after {len(chunks)} chunks")
+    return b"".join(chunks)
+
+def fetch_articles(
+    source: dict,
+    session: Optional[requests.Session] = None,
+    cache: Optional[FeedCache] = None,
+) -> Optional[List[Any]]:
+    """
+    Fetch articles from the RSS feed.
+
+    When a cache is given, the request is made conditional on the validators
+    of the previous download; a 304 or a byte-identical body returns an empty
+    list without parsing the feed. The new validators are only staged in the
+    cache; the caller commits them once the entries are saved.
+    """
+    url = source['url']
+    source_name = source.get('name', url)
+    timeout = source.get('timeout', FETCH_FEED_TIMEOUT)
+    deadline = time.monotonic() + timeout
+    started = time.perf_counter()
     try:
-        logging.info(f"Fetching RSS feed from {source['url']} ...")
-        response = requests.get(source['url'], timeout=10, headers=source.get('headers'), verify=False)
-        response.raise_for_status()
-        feed = feedparser.parse(response.content)
+        logging.info(f"Fetching RSS feed from {url} ...")
+        headers = dict(source.get('headers') or {})
+        if cache is not None:
+            headers.update(cache.conditional_headers(url))
+        http = session or requests
+        response = http.get(url, timeout=timeout, headers=headers or None, verify=False, stream=True)
+        try:
+            if response.status_code == 304:
+                content = None
+            else:
+                response.raise_for_status()
+                content = _read_body(response, deadline)
+        finally:
+            response.close()
+        FEED_FETCH_SECONDS.labels(source_name).observe(time.perf_counter() - started)
+        if content:
+            FEED_BYTES.labels(source_name).inc(len(content))
+
+        if cache is not None:
+            unchanged = content is None or cache.is_unchanged(url, content)
+            cache.record(source_name, hit=unchanged)
+            if unchanged:
+                logging.info(f"Feed unchanged since last run: {url}")
+                return []
+            cache.stage(url, response.headers.get('ETag'), response.headers.get('Last-Modified'), content)
+        elif content is None:
+            return []
+
+        with FEED_PARSE_SECONDS.labels(source_name).time():
+            feed = feedparser.parse(content)
         return feed.entries
     except Exception as e:
-        logging.error(f"Error fetching RSS feed: {e}")
+        FEED_ERRORS.labels(source_name).inc()
+        logging.error(f"Error fetching RSS feed {url}: {e}")
         return None
+
+def _build_session(headers: Optional[dict], pool_size: int) -> requests.Session:
+    """Create a keep-alive session shared by every feed of one source."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+def fetch_all_sources(
+    sources: List[dict],
+    max_workers: int = FETCH_MAX_WORKERS,
+    per_host_limit: int = FETCH_PER_HOST_LIMIT,
+    feed_timeout: float = FETCH_FEED_TIMEOUT,
+    run_deadline: float = FETCH_RUN_DEADLINE,
+    cache: Optional[FeedCache] = None,
+) -> Iterator[Tuple[str, str, Optional[List[Any]]]]:
+    """
+    Fetch every feed of every source concurrently.
+
+    Yields (source_name, url, entries) as each feed completes, so callers can
+    save results while slower feeds are still downloading. Downloads against
+    the same host are capped at per_host_limit, each source shares one
+    keep-alive session, and feeds still pending when run_deadline expires
+    are abandoned. A FeedCache, if given, makes every request conditional.
+    """
+    run_ends_at = time.monotonic() + run_deadline
+    host_limits: Dict[str, threading.BoundedSemaphore] = {}
+    sessions: List[requests.Session] = []
+
+    def fetch_one(source_name: str, url: str, session: requests.Session) -> Optional[List[Any]]:
+        limit = host_limits[urlparse(url).netloc]
+        if not limit.acquire(timeout=max(run_ends_at - time.monotonic(), 0)):
+            logging.error(f"Run deadline reached before {url} could be fetched.")
+            return None
+        try:
+            return fetch_articles({"name": source_name, "url": url, "timeout": feed_timeout}, session=session, cache=cache)
+        finally:
+            limit.release()
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="feed-fetch")
+    futures = {}
+    try:
+        for source in sources:
+            session = _build_session(source.get("headers"), per_host_limit)
+            sessions.append(session)
+            for url in source["urls"]:
+                host = urlparse(url).netloc
+                if host not in host_limits:
+                    host_limits[host] = threading.BoundedSemaphore(per_host_limit)
+                futures[executor.submit(fetch_one, source["name"], url, session)] = (source["name"], url)
+
+        # The deadline only applies to downloads still running: feeds that finished while
+        # the caller was busy with earlier results are always handed over
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=max(run_ends_at - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+            if not done:
+                logging.error(f"Fetch run deadline of {run_deadline}s reached; abandoning {len(pending)} feeds.")
+                break
+            for future in done:
+                source_name, url = futures[future]
+                yield source_name, url, future.result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        _close_when_finished(sessions, list(futures))
+
+def _close_when_finished(sessions: List[requests.Session], futures: List[Future]) -> None:
+    """Close the sessions once every future is done; abandoned downloads may still be using them."""
+    running = [future for future in futures if not future.done()]
+    if not running:
+        for session in sessions:
+            session.close()
+        return
+    remaining = [len(running)]
+    lock = threading.Lock()
+
+    def finished(_future: Future) -> None:
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            for session in sessions:
+                session.close()
+
+    for future in running:
+        future.add_done_callback(finished)
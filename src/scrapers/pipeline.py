@@ -0,0 +1,112 @@
+import logging
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import psycopg2
+from src.sentiment.analyzer import score_text
+from src.sentiment.fast_vader import FastVaderScorer
+from src.sentiment.cache import SentimentCache, get_sentiment_cache, text_key
+from .saver import entry_to_row, filter_seen, save_rows, SaveResult, INSERT_PAGE_SIZE, ENTRIES_SEEN
+from .seen_index import SeenLinkIndex
+
+# Streaming scrape -> analyze pipeline.
+# Each stage is a generator, so entries flow from the fetcher into the database
+# one batch at a time and every article is inserted with its sentiment already set.
+
+def parse(feeds: Iterable[Tuple[str, str, Optional[List[Any]]]], urls: List[str]) -> Iterator[Tuple[str, str, Any]]:
+    """Flatten fetched feeds into (source_name, url, entry) triples, appending each feed's URL to urls."""
+    for source_name, url, entries in feeds:
+        logging.info(f"Scraped {source_name} - {url}")
+        urls.append(url)
+        ENTRIES_SEEN.labels(source_name).inc(len(entries or []))
+        for entry in entries or []:
+            yield source_name, url, entry
+
+def normalize(entries: Iterable[Tuple[str, str, Any]], stats: dict, feed_of: Dict[str, str]) -> Iterator[tuple]:
+    """
+    Turn entries into insert rows, dropping incomplete entries and links repeated within the run.
+
+    feed_of maps the link of every row yielded to the URL of the feed it came from.
+    """
+    created_at = datetime.now(timezone.utc).isoformat()
+    for source_name, url, entry in entries:
+        row = entry_to_row(entry, source_name, created_at)
+        if row is None or row[1] in feed_of:
+            stats["skipped"] += 1
+            continue
+        feed_of[row[1]] = url
+        yield row
+
+def batched(rows: Iterable[tuple], size: int) -> Iterator[List[tuple]]:
+    iterator = iter(rows)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def score(rows: List[tuple], scorer: FastVaderScorer, cache: SentimentCache, conn) -> Iterator[tuple]:
+    """
+    Fill in sentiment_score and sentiment_label, reusing cached scores for texts seen before.
+
+    Rows without text are left for the catch-up analyzer.
+    """
+    keys = [text_key(row[0], row[3]) for row in rows]
+    cached = cache.get_many(conn, keys)
+    fresh = {}
+    for row, key in zip(rows, keys):
+        scored = cached.get(key) or fresh.get(key) or score_text(scorer, row[0], row[3])
+        if scored is None:
+            yield row
+            continue
+        if key not in cached:
+            fresh[key] = scored
+        yield row[:7] + tuple(scored)
+    cache.put_many(conn, fresh)
+
+def run_pipeline(
+    feeds: Iterable[Tuple[str, str, Optional[List[Any]]]],
+    conn: psycopg2.extensions.connection,
+    seen: Optional[SeenLinkIndex] = None,
+    batch_size: int = INSERT_PAGE_SIZE,
+    progress: Optional[Callable[[int], None]] = None,
+    feed_saved: Optional[Callable[[str], None]] = None,
+) -> SaveResult:
+    """
+    Parse, normalize, score and write fetched feeds, committing one batch at a time.
+
+    progress, if given, is called with the running count of inserted rows after each batch.
+    feed_saved, if given, is called at the end with the URL of every feed none of whose
+    rows failed to save.
+    """
+    scorer = FastVaderScorer()
+    cache = get_sentiment_cache()
+    cache.reset_stats()
+    stats = {"skipped": 0}
+    urls: List[str] = []
+    feed_of: Dict[str, str] = {}
+    failed_feeds = set()
+    totals = SaveResult()
+    for batch in batched(normalize(parse(feeds, urls), stats, feed_of), batch_size):
+        unseen = filter_seen(batch, seen) # Known links are dropped before spending time scoring them
+        totals += SaveResult(skipped=len(batch) - len(unseen))
+        if not unseen:
+            continue
+        try:
+            result = save_rows(list(score(unseen, scorer, cache, conn)), conn, seen)
+        except psycopg2.Error as e:
+            logging.error(f"Error writing pipeline batch: {e}")
+            conn.rollback()
+            result = SaveResult(failed=len(unseen))
+        if result.failed:
+            # Rows of a batch are not told apart; every feed in it is fetched again next run
+            failed_feeds.update(feed_of[row[1]] for row in unseen)
+        totals += result
+        if progress is not None:
+            progress(totals.inserted)
+    cache.log_stats()
+    if feed_saved is not None:
+        for url in urls:
+            if url not in failed_feeds:
+                feed_saved(url)
+    return totals + SaveResult(skipped=stats["skipped"])
@@ -1,54 +1,172 @@
 # import sqlite3 # No longer using SQLite
 import psycopg2
+import psycopg2.extras # For execute_values
 import logging
+import math
+from collections import Counter
 from datetime import datetime, timezone
-from typing import List, Any, Optional
-from ..database import get_db_connection # Use the centralized connection getter
+from typing import List, Any, Optional, NamedTuple
+from ..database import db_connection, stamp_inserted, stamp_watermark # Use the centralized connection pool
+from .seen_index import SeenLinkIndex
+from src.sentiment.rollup import add_to_rollup
+from src.metrics import REGISTRY
 
-def save_articles(articles: List[Any], source_name: str) -> None:
-    """Save articles to the PostgreSQL database."""
+INSERT_PAGE_SIZE = 500
+
+ENTRIES_SEEN = REGISTRY.counter("dhanvani_entries_seen_total", "Feed entries handed to the saver.", ["source"])
+ARTICLES_INSERTED = REGISTRY.counter("dhanvani_articles_inserted_total", "New articles written to stage.raw_articles.", ["source"])
+
+INSERT_ARTICLES_SQL = """
+    INSERT INTO stage.raw_articles
+    (title, link, published, summary, source, type, created_at, sentiment_score, sentiment_label)
+    VALUES %s
+    ON CONFLICT (link) DO NOTHING
+    RETURNING id, source
+"""
+
+class SaveResult(NamedTuple):
+    inserted: int = 0  # New rows written
+    skipped: int = 0   # Incomplete entries and links already in the database
+    failed: int = 0    # Rows the database rejected
+
+    def __add__(self, other: "SaveResult") -> "SaveResult":
+        return SaveResult(*(a + b for a, b in zip(self, other)))
+
+def entry_to_row(entry: Any, source_name: str, created_at: str) -> Optional[tuple]:
+    """
+    Turn a feed entry into an insert row, or None if it is incomplete.
+
+    Rows are (title, link, published, summary, source, type, created_at,
+    sentiment_score, sentiment_label); the sentiment columns start out empty.
+    """
+    title = getattr(entry, "title", None)
+    link = getattr(entry, "link", None)
+    published = getattr(entry, "published", None)
+    summary = getattr(entry, "summary", None) or getattr(entry, "description", None) or getattr(entry, "title", None)
+    if not (title and link and published):
+        logging.warning(f"Skipping incomplete entry: {entry}")
+        return None
+    return (title, link, published, summary, source_name, "news", created_at, None, None)
+
+def _entries_to_rows(articles: List[Any], source_name: str) -> tuple:
+    """Turn feed entries into insert rows, dropping incomplete entries and repeated links."""
+    created_at = datetime.now(timezone.utc).isoformat()
+    rows = {}
+    for entry in articles:
+        row = entry_to_row(entry, source_name, created_at)
+        if row is not None:
+            rows.setdefault(row[1], row)
+    return list(rows.values()), len(articles) - len(rows)
+
+def _round_trips(row_count: int) -> int:
+    """Statements save_articles sends for a batch: SAVEPOINT, INSERT pages, RELEASE, COMMIT."""
+    return math.ceil(row_count / INSERT_PAGE_SIZE) + 3 if row_count else 0
+
+def _insert_rows_one_by_one(cursor, rows: List[tuple]) -> tuple:
+    """Insert rows individually behind savepoints so one bad row only drops itself. Returns (inserted (id, source) rows, failed links)."""
+    inserted = []
+    failed = set()
+    for row in rows:
+        cursor.execute("SAVEPOINT save_row")
+        try:
+            inserted += psycopg2.extras.execute_values(cursor, INSERT_ARTICLES_SQL, [row], fetch=True)
+            cursor.execute("RELEASE SAVEPOINT save_row")
+        except psycopg2.Error as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT save_row")
+            logging.error(f"Error inserting article {row[1]}: {e}")
+            failed.add(row[1])
+    return inserted, failed
+
+def filter_seen(rows: List[tuple], seen: Optional[SeenLinkIndex]) -> List[tuple]:
+    """Drop rows whose link is already in the seen index, recording what that saved."""
+    if seen is None or not rows:
+        return rows
+    unseen = [row for row in rows if row[1] not in seen]
+    seen.links_filtered += len(rows) - len(unseen)
+    seen.round_trips_saved += _round_trips(len(rows)) - _round_trips(len(unseen))
+    return unseen
+
+def save_rows(
+    rows: List[tuple],
+    conn: psycopg2.extensions.connection,
+    seen: Optional[SeenLinkIndex] = None,
+    label: str = "batch",
+) -> SaveResult:
+    """
+    Insert prepared rows in one transaction and commit.
+
+    The rows go out as multi-row INSERTs. If the batch is rejected, it is
+    retried row by row so only the offending rows are dropped. Rows inserted
+    with a sentiment label are added to the daily rollup in the same
+    transaction, which also bumps the data watermark the API derives its
+    ETags from. Links that were saved, or already present, are added to the
+    seen index after the commit.
+    """
+    if not rows:
+        return SaveResult()
+    cursor = conn.cursor()
+    failed = set()
+
+    cursor.execute("SAVEPOINT save_batch")
+    try:
+        inserted = psycopg2.extras.execute_values(
+            cursor, INSERT_ARTICLES_SQL, rows, page_size=INSERT_PAGE_SIZE, fetch=True
+        )
+        cursor.execute("RELEASE SAVEPOINT save_batch")
+    except psycopg2.Error as e:
+        logging.warning(f"Batch insert for {label} failed, retrying row by row: {e}")
+        cursor.execute("ROLLBACK TO SAVEPOINT save_batch")
+        inserted, failed = _insert_rows_one_by_one(cursor, rows)
+
+    if inserted:
+        if any(row[8] for row in rows): # Scored at ingest
+            add_to_rollup(conn, [article_id for article_id, _ in inserted])
+            stamp_watermark(conn)
+        stamp_inserted(conn)
+    conn.commit()
+    for source, count in Counter(source for _, source in inserted).items():
+        ARTICLES_INSERTED.labels(source).inc(count)
+    if seen is not None:
+        for row in rows:
+            if row[1] not in failed:
+                seen.add(row[1])
+    return SaveResult(inserted=len(inserted), skipped=len(rows) - len(inserted) - len(failed), failed=len(failed))
+
+def save_articles(
+    articles: List[Any],
+    source_name: str,
+    conn: Optional[psycopg2.extensions.connection] = None,
+    seen: Optional[SeenLinkIndex] = None,
+) -> SaveResult:
+    """
+    Save articles to the PostgreSQL database.
+
+    Pass conn to reuse one connection across a whole scraper run; otherwise a
+    connection is checked out of the pool for this call. Links found in the seen index are
+    counted as skipped without being sent to the database at all.
+    """
     if not articles:
         logging.warning("No articles to save.")
-        return
-    conn: Optional[psycopg2.extensions.connection] = None
+        return SaveResult()
+    ENTRIES_SEEN.labels(source_name).inc(len(articles))
+    rows, skipped = _entries_to_rows(articles, source_name)
+    unseen = filter_seen(rows, seen)
+    skipped += len(rows) - len(unseen)
+    rows = unseen
+    if not rows:
+        return SaveResult(skipped=skipped)
+
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        count_inserted = 0
-
-        for entry in articles:
-            try:
-                title = getattr(entry, "title", None)
-                link = getattr(entry, "link", None)
-                published = getattr(entry, "published", None)
-                summary = getattr(entry, "summary", None) or getattr(entry, "description", None) or getattr(entry, "title", None)
-                if not (title and link and published):
-                    logging.warning(f"Skipping incomplete entry: {entry}")
-                    continue
-
-                cursor.execute("""
-                    INSERT INTO stage.raw_articles
-                    (title, link, published, summary, source, type, created_at)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (link) DO NOTHING
-                """, (
-                    title,
-                    link,
-                    published,
-                    summary,
-                    source_name,
-                    "news",
-                    datetime.now(timezone.utc).isoformat()
-                ))
-                count_inserted += cursor.rowcount
-            except Exception as e:
-                logging.error(f"Error inserting article: {e}")
-                conn.rollback()
-
-        conn.commit()
-        logging.info(f"Saved {count_inserted} new articles.")
+        if conn is not None:
+            result = save_rows(rows, conn, seen, label=source_name)
+        else:
+            with db_connection() as pooled_conn:
+                result = save_rows(rows, pooled_conn, seen, label=source_name)
+        result += SaveResult(skipped=skipped)
+        logging.info(f"Saved {result.inserted} new articles ({result.skipped} skipped, {result.failed} failed).")
+        return result
     except Exception as e:
         logging.error(f"Error saving articles to database: {e}")
-    finally:
-        if conn is not None:
-            conn.close()
+        if conn is not None and not conn.closed:
+            conn.rollback()
+        return SaveResult(failed=len(rows), skipped=skipped)
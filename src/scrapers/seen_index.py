@@ -0,0 +1,122 @@
+import hashlib
+import logging
+import math
+import os
+import struct
+from typing import Optional
+
+_MAGIC = b"DVBF"
+_HEADER = struct.Struct("<4sQQQ") # magic, bit count, hash count, links added
+
+# Warming fills only this share of the capacity. The rest is headroom for links saved by
+# later runs; warming to full capacity would overflow on the first new link and force a
+# rebuild from the database at every start.
+WARM_FRACTION = 0.5
+
+class SeenLinkIndex:
+    """
+    Bloom filter over article links that were already saved.
+
+    Sized for `capacity` links at a target false-positive rate, so memory stays
+    fixed at roughly capacity * -ln(fp_rate) / ln(2)^2 bits no matter how many
+    articles the database holds. A false positive means a new article is
+    treated as already saved, so keep fp_rate small.
+    """
+
+    def __init__(self, capacity: int, fp_rate: float):
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.num_bits = max(8, math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+        # Per-run metrics
+        self.links_filtered = 0
+        self.round_trips_saved = 0
+
+    def _positions(self, link: str):
+        digest = hashlib.blake2b(link.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def __contains__(self, link: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(link))
+
+    def add(self, link: str) -> None:
+        for pos in self._positions(link):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    @property
+    def is_full(self) -> bool:
+        """True once more links were added than the filter was sized for."""
+        return self.count > self.capacity
+
+    def warm(self, conn, limit: Optional[int] = None) -> None:
+        """Add the most recent links in stage.raw_articles, streamed through a server-side cursor."""
+        limit = limit or max(1, int(self.capacity * WARM_FRACTION))
+        with conn.cursor(name="seen_index_warm") as cursor:
+            cursor.itersize = 10000
+            cursor.execute("SELECT link FROM stage.raw_articles WHERE link IS NOT NULL ORDER BY id DESC LIMIT %s", (limit,))
+            for (link,) in cursor:
+                self.add(link)
+        conn.commit()
+        logging.info(f"Warmed seen-link index with {self.count} links from the database.")
+
+    def save(self, path: str) -> None:
+        """Persist the filter atomically so the next run can skip warming."""
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, self.num_bits, self.num_hashes, self.count))
+                f.write(self._bits)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.error(f"Error saving seen-link index to {path}: {e}")
+
+    @classmethod
+    def load(cls, path: str, capacity: int, fp_rate: float) -> Optional["SeenLinkIndex"]:
+        """
+        Load a filter saved by a previous run.
+
+        Returns None if the file is missing, unreadable, sized for different
+        settings, or already over capacity, in which case it should be rebuilt.
+        """
+        index = cls(capacity, fp_rate)
+        try:
+            with open(path, "rb") as f:
+                magic, num_bits, num_hashes, count = _HEADER.unpack(f.read(_HEADER.size))
+                bits = f.read()
+        except FileNotFoundError:
+            return None
+        except (OSError, struct.error) as e:
+            logging.warning(f"Ignoring unreadable seen-link index {path}: {e}")
+            return None
+        if magic != _MAGIC or (num_bits, num_hashes) != (index.num_bits, index.num_hashes) or len(bits) != len(index._bits):
+            logging.info("Seen-link index settings changed; rebuilding.")
+            return None
+        index._bits = bytearray(bits)
+        index.count = count
+        if index.is_full:
+            logging.info("Seen-link index is over capacity; rebuilding.")
+            return None
+        return index
+
+def load_seen_index(path: str, capacity: int, fp_rate: float, conn) -> SeenLinkIndex:
+    """Load the persisted filter, or build a fresh one from recent database links."""
+    index = SeenLinkIndex.load(path, capacity, fp_rate)
+    if index is None:
+        index = SeenLinkIndex(capacity, fp_rate)
+        try:
+            index.warm(conn)
+        except Exception as e:
+            # An empty filter is always safe; it only filters less
+            logging.error(f"Error warming seen-link index: {e}")
+            conn.rollback()
+            index = SeenLinkIndex(capacity, fp_rate)
+    return index
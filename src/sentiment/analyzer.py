@@ -1,9 +1,15 @@
 import pandas as pd
 import psycopg2
 import psycopg2.extras
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
+from .fast_vader import FastVaderScorer
 import nltk
 import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
 
 # Download the VADER lexicon (only needs to be done once)
 # try:
@@ -11,68 +17,216 @@ import logging
 # except nltk.downloader.DownloadError:
 #     nltk.download('vader_lexicon')
 
-from src.database import get_db_connection # Import from centralized location
+from typing import Callable, Optional, Tuple, List, Iterator
+from src.config import SENTIMENT_CHUNK_SIZE, SENTIMENT_WORKERS, SENTIMENT_BATCH_SIZE, SENTIMENT_PARALLEL_MIN_ROWS
+from src.database import db_connection, stamp_watermark # Import from centralized location
+from .cache import SentimentCache, get_sentiment_cache, text_key
+from .rollup import add_to_rollup
+from src.metrics import REGISTRY
 
-def run_sentiment_analysis():
-    """Fetches articles, analyzes sentiment, and updates the database."""
-    logging.info("Starting sentiment analysis...")
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor) # Use DictCursor for dictionary-like rows
-        logging.info("Connected to the SQLite database for sentiment analysis.")
-    except Exception as e: # Catch generic Exception from get_db_connection
-        logging.error(f"Database connection failed during sentiment analysis: {e}")
-        return # Exit if DB connection fails
-
-    # Ensure columns exist (idempotent operation, can be part of init_db or here)
-    # For simplicity, assuming init_db in src.database.py now creates these columns.
-    # If not, you can add the ensure_columns_exist logic here, using the 'cursor'.
-
-    # Initialize the VADER sentiment analyzer
-    sid = SentimentIntensityAnalyzer()
-
-    # Fetch articles that haven't been analyzed or need re-analysis
-    # For simplicity, fetching all. Could be optimized to fetch only where sentiment_label IS NULL.
-    cursor.execute("SELECT id, title, summary FROM stage.raw_articles WHERE sentiment_label IS NULL") # More efficient
-    articles = cursor.fetchall()
-    logging.info(f"Fetched {len(articles)} articles for sentiment analysis.")
-
-    updated_count = 0
-    for article_row in articles:
-        article_id, title, summary = article_row['id'], article_row['title'], article_row['summary']
-        text_to_analyze = f"{title or ''} {summary or ''}".strip()
+ARTICLES_SCORED = REGISTRY.counter("dhanvani_articles_scored_total", "Articles labelled by the analyzer.", ["via"])
+SCORING_RATE = REGISTRY.gauge("dhanvani_sentiment_articles_per_second", "Throughput of the last run_sentiment_analysis call.")
+
+POSITIVE_THRESHOLD = 0.05
+NEGATIVE_THRESHOLD = -0.05
+
+def label_for_score(compound_score: float) -> str:
+    """Map a VADER compound score to a sentiment label."""
+    if compound_score >= POSITIVE_THRESHOLD:
+        return 'positive'
+    elif compound_score <= NEGATIVE_THRESHOLD:
+        return 'negative'
+    return 'neutral'
+
+def article_text(title: Optional[str], summary: Optional[str]) -> str:
+    """The text an article is scored on."""
+    return f"{title or ''} {summary or ''}".strip()
 
+def score_text(scorer: FastVaderScorer, title: Optional[str], summary: Optional[str]) -> Optional[Tuple[float, str]]:
+    """Score an article's title and summary. Returns (compound_score, label), or None if there is no text."""
+    text_to_analyze = article_text(title, summary)
+    if not text_to_analyze:
+        return None
+    compound_score = scorer.compound(text_to_analyze)
+    return compound_score, label_for_score(compound_score)
+
+def _score_rows(scorer: FastVaderScorer, rows: List[tuple]) -> List[Tuple[int, float, str]]:
+    """Score (id, title, summary) rows into (id, compound_score, label) triples, as one batch."""
+    ids, texts = [], []
+    for article_id, title, summary in rows:
+        text_to_analyze = article_text(title, summary)
         if not text_to_analyze:
             logging.warning(f"Skipping article ID {article_id} due to empty title and summary.")
             continue
-            
-        sentiment_scores = sid.polarity_scores(text_to_analyze)
-        compound_score = sentiment_scores['compound']
-
-        # Determine sentiment label
-        if compound_score >= 0.05:
-            sentiment_label = 'positive'
-        elif compound_score <= -0.05:
-            sentiment_label = 'negative'
-        else:
-            sentiment_label = 'neutral'
-
-        # Update the article with sentiment score and label
-        cursor.execute("""
-            UPDATE stage.raw_articles
-            SET sentiment_score = %s, sentiment_label = %s
-            WHERE id = %s
-        """, (compound_score, sentiment_label, article_id)) # Using %s
-        updated_count += cursor.rowcount
+        ids.append(article_id)
+        texts.append(text_to_analyze)
+    return [
+        (article_id, compound_score, label_for_score(compound_score))
+        for article_id, compound_score in zip(ids, scorer.compound_scores(texts))
+    ]
+
+# Each worker process builds its scorer once, in the pool initializer
+_worker_scorer: Optional[FastVaderScorer] = None
+
+def _init_worker() -> None:
+    global _worker_scorer
+    _worker_scorer = FastVaderScorer()
+
+def _score_rows_in_worker(rows: List[tuple]) -> List[Tuple[int, float, str]]:
+    return _score_rows(_worker_scorer, rows)
+
+def score_chunks(
+    chunks: Iterator[List[tuple]],
+    workers: int = SENTIMENT_WORKERS,
+    batch_size: int = SENTIMENT_BATCH_SIZE,
+    min_parallel_rows: int = SENTIMENT_PARALLEL_MIN_ROWS,
+) -> Iterator[Tuple[List[tuple], List[Tuple[int, float, str]]]]:
+    """
+    Score chunks of (id, title, summary) rows, yielding (chunk, scores) in order.
+
+    Each chunk is split into batches of batch_size and spread across a pool of
+    worker processes. The next chunk is already being scored while the caller
+    writes the previous one. If workers is 1 or less, or the first chunk has
+    fewer than min_parallel_rows rows, everything is scored serially in this
+    process instead.
+    """
+    chunks = iter(chunks)
+    first = next(chunks, None)
+    if first is None:
+        return
+    chunks = chain([first], chunks)
+
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(first) < min_parallel_rows:
+        scorer = FastVaderScorer()
+        for chunk in chunks:
+            yield chunk, _score_rows(scorer, chunk)
+        return
+
+    logging.info(f"Scoring sentiment with {workers} worker processes.")
+    # spawn rather than fork: the API process that triggers runs is multi-threaded
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker) as executor:
+        pending = deque()
+        for chunk in chunks:
+            futures = [
+                executor.submit(_score_rows_in_worker, chunk[i:i + batch_size])
+                for i in range(0, len(chunk), batch_size)
+            ]
+            pending.append((chunk, futures))
+            if len(pending) > 1:
+                done_chunk, done_futures = pending.popleft()
+                yield done_chunk, [score for future in done_futures for score in future.result()]
+        while pending:
+            done_chunk, done_futures = pending.popleft()
+            yield done_chunk, [score for future in done_futures for score in future.result()]
+
+SELECT_UNSCORED_SQL = """
+    SELECT id, title, summary FROM stage.raw_articles
+    WHERE sentiment_label IS NULL AND id > %s
+    ORDER BY id
+    LIMIT %s
+"""
 
+UPDATE_SCORES_SQL = """
+    UPDATE stage.raw_articles AS a
+    SET sentiment_score = v.sentiment_score, sentiment_label = v.sentiment_label
+    FROM (VALUES %s) AS v(id, sentiment_score, sentiment_label)
+    WHERE a.id = v.id AND a.sentiment_label IS NULL
+    RETURNING a.id
+"""
+
+def iter_unscored_chunks(conn, chunk_size: int, start_after_id: int = 0) -> Iterator[List[tuple]]:
+    """
+    Yield unscored (id, title, summary) rows in id order, chunk_size at a time.
+
+    Each chunk is a separate keyset query, so only one chunk is ever held in
+    memory and the caller can commit between chunks.
+    """
+    last_id = start_after_id
+    while True:
+        with conn.cursor() as cursor:
+            cursor.execute(SELECT_UNSCORED_SQL, (last_id, chunk_size))
+            rows = cursor.fetchall()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+def write_scores(conn, scores: List[Tuple[int, float, str]]) -> int:
+    """
+    Write (id, compound_score, label) triples with one UPDATE ... FROM (VALUES ...) and commit.
+
+    Only rows that are still unlabelled are updated, and those are added to
+    the daily rollup in the same transaction, which also stamps the data
+    watermark the API derives its ETags from.
+    """
+    if not scores:
+        return 0
+    with conn.cursor() as cursor:
+        updated_ids = [row[0] for row in psycopg2.extras.execute_values(
+            cursor, UPDATE_SCORES_SQL, scores, template="(%s, %s::real, %s)", page_size=len(scores), fetch=True
+        )]
+    if updated_ids:
+        add_to_rollup(conn, updated_ids)
+        stamp_watermark(conn)
     conn.commit()
-    logging.info(f"Sentiment analysis completed. Updated {updated_count} articles.")
-    
-    # Optional: Load data into a DataFrame for logging or further processing if needed
-    # df = pd.read_sql_query("SELECT id, title, sentiment_label, sentiment_score FROM raw_articles", conn)
-    # logging.info(f"Sample of analyzed data:\n{df.head()}")
+    return len(updated_ids)
+
+def _split_cached(conn, chunks: Iterator[List[tuple]], cache: SentimentCache, hits: deque) -> Iterator[List[tuple]]:
+    """Resolve each chunk against the cache, queueing the hits and yielding only the rows still to score."""
+    for chunk in chunks:
+        keys = {row[0]: text_key(row[1], row[2]) for row in chunk}
+        cached = cache.get_many(conn, keys.values())
+        hits.append([(row[0], *cached[keys[row[0]]]) for row in chunk if keys[row[0]] in cached])
+        yield [row for row in chunk if keys[row[0]] not in cached]
 
-    conn.close()
+def run_sentiment_analysis(
+    chunk_size: int = SENTIMENT_CHUNK_SIZE,
+    start_after_id: int = 0,
+    progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """
+    Score every unscored article and store the results, one committed chunk at a time.
+
+    Memory stays bounded by chunk_size whatever the size of the backlog. A run
+    that fails partway keeps the chunks it already committed, and the next run
+    picks up from the remaining unscored rows; start_after_id skips ahead
+    explicitly. Texts already in the sentiment cache are not re-scored, and
+    the rest are scored on a process pool for large backlogs (see
+    score_chunks). progress, if given, is called with the running count after
+    each committed chunk. Returns the number of articles updated.
+    """
+    logging.info("Starting sentiment analysis...")
+    with db_connection() as conn:
+        if conn is None:
+            logging.error("Database connection failed during sentiment analysis.")
+            return 0 # Exit if DB connection fails
+
+        cache = get_sentiment_cache()
+        cache.reset_stats()
+        cache_hits = deque()
+        chunks = _split_cached(conn, iter_unscored_chunks(conn, chunk_size, start_after_id), cache, cache_hits)
+
+        updated_count = 0
+        started = time.perf_counter()
+        for misses, scores in score_chunks(chunks):
+            texts = {row[0]: text_key(row[1], row[2]) for row in misses}
+            cache.put_many(conn, {texts[article_id]: (score, label) for article_id, score, label in scores})
+            hits = cache_hits.popleft()
+            updated_count += write_scores(conn, hits + scores)
+            ARTICLES_SCORED.labels("cache").inc(len(hits))
+            ARTICLES_SCORED.labels("scorer").inc(len(scores))
+            logging.info(f"Scored a chunk; {updated_count} articles updated so far.")
+            if progress is not None:
+                progress(updated_count)
+
+        elapsed = time.perf_counter() - started
+        if updated_count:
+            SCORING_RATE.set(updated_count / elapsed)
+        cache.log_stats()
+    logging.info(f"Sentiment analysis completed. Updated {updated_count} articles.")
+    return updated_count
 
 if __name__ == '__main__':
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
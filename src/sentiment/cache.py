@@ -0,0 +1,126 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+import nltk
+import psycopg2.extras
+from .fast_vader import FastVaderScorer
+from src.config import SENTIMENT_CACHE_SIZE
+
+UPSERT_CACHE_SQL = """
+    INSERT INTO stage.sentiment_cache (text_hash, version, sentiment_score, sentiment_label)
+    VALUES %s
+    ON CONFLICT (text_hash) DO UPDATE
+    SET version = EXCLUDED.version,
+        sentiment_score = EXCLUDED.sentiment_score,
+        sentiment_label = EXCLUDED.sentiment_label
+"""
+
+def text_key(title: Optional[str], summary: Optional[str]) -> str:
+    """
+    Hash of an article's text as the analyzer sees it.
+
+    Runs of whitespace are collapsed first; VADER splits on whitespace, so
+    this never changes the score. Case and punctuation are kept because they do.
+    """
+    normalized = " ".join(f"{title or ''} {summary or ''}".split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+def scorer_version(scorer: FastVaderScorer) -> str:
+    """Fingerprint of everything a cached score depends on: lexicon, labelling thresholds and NLTK release."""
+    from .analyzer import POSITIVE_THRESHOLD, NEGATIVE_THRESHOLD
+    digest = hashlib.sha256()
+    digest.update(f"{nltk.__version__}|{POSITIVE_THRESHOLD}|{NEGATIVE_THRESHOLD}".encode("utf-8"))
+    for word, valence in sorted(scorer.lexicon.items()):
+        digest.update(f"{word}\t{valence}\n".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+class SentimentCache:
+    """
+    Sentiment scores memoized by text hash.
+
+    An in-memory LRU of up to max_entries sits in front of the
+    stage.sentiment_cache table. Entries written under a different scorer
+    version are treated as misses and overwritten, so changing the lexicon or
+    the thresholds invalidates the whole cache.
+    """
+
+    def __init__(self, version: str, max_entries: int = SENTIMENT_CACHE_SIZE):
+        self.version = version
+        self.max_entries = max_entries
+        self._lru: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def _remember(self, key: str, value: Tuple[float, str]) -> None:
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def get_many(self, conn, keys: Iterable[str]) -> Dict[str, Tuple[float, str]]:
+        """Look keys up in memory, then in the database; returns {key: (compound_score, label)} for hits."""
+        found = {}
+        missing = []
+        with self._lock:
+            for key in set(keys):
+                value = self._lru.get(key)
+                if value is None:
+                    missing.append(key)
+                else:
+                    self._lru.move_to_end(key)
+                    found[key] = value
+            self.memory_hits += len(found)
+        if missing:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT text_hash, sentiment_score, sentiment_label FROM stage.sentiment_cache "
+                    "WHERE text_hash = ANY(%s) AND version = %s",
+                    (missing, self.version),
+                )
+                rows = cursor.fetchall()
+            with self._lock:
+                for key, score, label in rows:
+                    found[key] = (score, label)
+                    self._remember(key, (score, label))
+                self.db_hits += len(rows)
+                self.misses += len(missing) - len(rows)
+        return found
+
+    def put_many(self, conn, entries: Dict[str, Tuple[float, str]]) -> None:
+        """Store freshly computed scores; written in the caller's transaction."""
+        if not entries:
+            return
+        with self._lock:
+            for key, value in entries.items():
+                self._remember(key, value)
+        with conn.cursor() as cursor:
+            psycopg2.extras.execute_values(
+                cursor, UPSERT_CACHE_SQL,
+                [(key, self.version, score, label) for key, (score, label) in entries.items()],
+            )
+
+    def log_stats(self) -> None:
+        lookups = self.memory_hits + self.db_hits + self.misses
+        hit_rate = (self.memory_hits + self.db_hits) / lookups if lookups else 0.0
+        logging.info(
+            f"Sentiment cache: {self.memory_hits} memory hits, {self.db_hits} database hits, "
+            f"{self.misses} misses ({hit_rate:.1%} hit rate)."
+        )
+
+_cache: Optional[SentimentCache] = None
+_cache_lock = threading.Lock()
+
+def get_sentiment_cache() -> SentimentCache:
+    """Return the process-wide cache, so the LRU survives across runs in a long-lived process."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SentimentCache(scorer_version(FastVaderScorer()))
+        return _cache
@@ -0,0 +1,216 @@
+import math
+import string
+from typing import Dict, List, Optional, Sequence
+from nltk.sentiment.vader import SentimentIntensityAnalyzer, VaderConstants
+
+# Batch scorer that reproduces NLTK's VADER compound score.
+#
+# It follows SentimentIntensityAnalyzer.polarity_scores step for step, doing the
+# same floating point operations in the same order, but looks every token up once
+# per batch instead of re-lowercasing and re-probing dicts at every rule.
+# tests/test_fast_vader.py checks the scores against NLTK; run
+# `python -m benchmarks.sentiment_scorer` for the speedup.
+
+_C = VaderConstants
+_PUNCTUATION = string.punctuation
+_DELETE_PUNCTUATION = str.maketrans("", "", _PUNCTUATION)
+_PUNC_SET = frozenset(_C.PUNC_LIST)
+_TOKEN_CACHE_LIMIT = 200000
+
+class _Token:
+    """Everything the VADER rules ask about one token, computed once."""
+    __slots__ = ("text", "lower", "isupper", "valence", "booster", "negated")
+
+    def __init__(self, text: str, lexicon: Dict[str, float]):
+        lower = text.lower()
+        self.text = text
+        self.lower = lower
+        self.isupper = text.isupper()
+        self.valence = lexicon.get(lower)            # None when not in the lexicon
+        self.booster = _C.BOOSTER_DICT.get(lower)    # None when not a booster/dampener
+        self.negated = lower in _C.NEGATE or "n't" in lower
+
+class FastVaderScorer:
+    """
+    VADER compound scorer for batches of texts.
+
+    compound_scores(texts) returns the same values as
+    SentimentIntensityAnalyzer().polarity_scores(text)["compound"].
+    """
+
+    def __init__(self, lexicon: Optional[Dict[str, float]] = None):
+        self.lexicon = lexicon if lexicon is not None else SentimentIntensityAnalyzer().lexicon
+        self._tokens: Dict[str, _Token] = {}
+
+    def _token(self, text: str) -> _Token:
+        token = self._tokens.get(text)
+        if token is None:
+            if len(self._tokens) >= _TOKEN_CACHE_LIMIT:
+                self._tokens.clear()
+            token = self._tokens[text] = _Token(text, self.lexicon)
+        return token
+
+    def _tokenize(self, text: str) -> List[str]:
+        """SentiText._words_and_emoticons: split, drop 1-char tokens, strip punctuation off known words."""
+        words = [w for w in text.split() if len(w) > 1]
+        words_only = None
+        for idx, word in enumerate(words):
+            if word[0] not in _PUNCTUATION and word[-1] not in _PUNCTUATION:
+                continue
+            if words_only is None:
+                words_only = {w for w in text.translate(_DELETE_PUNCTUATION).split() if len(w) > 1}
+            # A match needs the whole leading (or trailing) punctuation run to be one PUNC_LIST entry,
+            # because the remaining word can contain no punctuation at all
+            core = word.lstrip(_PUNCTUATION)
+            if core != word and word[:len(word) - len(core)] in _PUNC_SET and core in words_only:
+                words[idx] = core
+                continue
+            core = word.rstrip(_PUNCTUATION)
+            if core != word and word[len(core):] in _PUNC_SET and core in words_only:
+                words[idx] = core
+        return words
+
+    def compound(self, text: str) -> float:
+        return self.compound_scores([text])[0]
+
+    def compound_scores(self, texts: Sequence[str]) -> List[float]:
+        """Compound scores for a batch; repeated texts are scored once."""
+        memo: Dict[str, float] = {}
+        scores = []
+        for text in texts:
+            score = memo.get(text)
+            if score is None:
+                score = memo[text] = self._score(text)
+            scores.append(score)
+        return scores
+
+    def _score(self, text: str) -> float:
+        words = self._tokenize(text)
+        tokens = [self._token(w) for w in words]
+        n = len(tokens)
+        allcaps = sum(1 for t in tokens if t.isupper)
+        is_cap_diff = 0 < n - allcaps < n
+
+        first_index: Dict[str, int] = {}
+        for idx, word in enumerate(words):
+            if word not in first_index:
+                first_index[word] = idx
+
+        sentiments = []
+        for word in words:
+            # NLTK locates each token by its first occurrence, so repeats share its context
+            i = first_index[word]
+            token = tokens[i]
+            if token.booster is not None or (i < n - 1 and token.lower == "kind" and tokens[i + 1].lower == "of"):
+                sentiments.append(0)
+                continue
+            if token.valence is None:
+                sentiments.append(0)
+                continue
+            sentiments.append(self._valence(token, tokens, words, i, is_cap_diff))
+
+        if not sentiments:
+            return 0.0
+
+        if "but" in {t.lower for t in tokens}:
+            bi = next(idx for idx, t in enumerate(tokens) if t.lower == "but")
+            for sidx, sentiment in enumerate(sentiments):
+                if sidx < bi:
+                    sentiments[sidx] = sentiment * 0.5
+                elif sidx > bi:
+                    sentiments[sidx] = sentiment * 1.5
+
+        sum_s = float(sum(sentiments))
+        ep_count = min(text.count("!"), 4)
+        qm_count = text.count("?")
+        qm_amplifier = 0
+        if qm_count > 1:
+            qm_amplifier = qm_count * 0.18 if qm_count <= 3 else 0.96
+        punct_emph_amplifier = ep_count * 0.292 + qm_amplifier
+        if sum_s > 0:
+            sum_s += punct_emph_amplifier
+        elif sum_s < 0:
+            sum_s -= punct_emph_amplifier
+        return round(sum_s / math.sqrt((sum_s * sum_s) + 15), 4)
+
+    def _valence(self, token: _Token, tokens: List[_Token], words: List[str], i: int, is_cap_diff: bool) -> float:
+        """SentimentIntensityAnalyzer.sentiment_valence for a token known to be in the lexicon."""
+        valence = token.valence
+        if token.isupper and is_cap_diff:
+            if valence > 0:
+                valence += _C.C_INCR
+            else:
+                valence -= _C.C_INCR
+
+        for start_i in range(0, 3):
+            if i > start_i and tokens[i - (start_i + 1)].valence is None:
+                prev = tokens[i - (start_i + 1)]
+                # VaderConstants.scalar_inc_dec
+                s = 0.0
+                if prev.booster is not None:
+                    s = prev.booster
+                    if valence < 0:
+                        s *= -1
+                    if prev.isupper and is_cap_diff:
+                        if valence > 0:
+                            s += _C.C_INCR
+                        else:
+                            s -= _C.C_INCR
+                if start_i == 1 and s != 0:
+                    s = s * 0.95
+                if start_i == 2 and s != 0:
+                    s = s * 0.9
+                valence = valence + s
+                valence = self._never_check(valence, tokens, words, start_i, i)
+                if start_i == 2:
+                    valence = self._idioms_check(valence, words, i)
+
+        # _least_check
+        if i > 1 and tokens[i - 1].valence is None and tokens[i - 1].lower == "least":
+            if tokens[i - 2].lower != "at" and tokens[i - 2].lower != "very":
+                valence = valence * _C.N_SCALAR
+        elif i > 0 and tokens[i - 1].valence is None and tokens[i - 1].lower == "least":
+            valence = valence * _C.N_SCALAR
+        return valence
+
+    @staticmethod
+    def _never_check(valence: float, tokens: List[_Token], words: List[str], start_i: int, i: int) -> float:
+        if start_i == 0:
+            if tokens[i - 1].negated:
+                valence = valence * _C.N_SCALAR
+        if start_i == 1:
+            if words[i - 2] == "never" and (words[i - 1] == "so" or words[i - 1] == "this"):
+                valence = valence * 1.5
+            elif tokens[i - 2].negated:
+                valence = valence * _C.N_SCALAR
+        if start_i == 2:
+            if (words[i - 3] == "never" and (words[i - 2] == "so" or words[i - 2] == "this")
+                    or (words[i - 1] == "so" or words[i - 1] == "this")):
+                valence = valence * 1.25
+            elif tokens[i - 3].negated:
+                valence = valence * _C.N_SCALAR
+        return valence
+
+    @staticmethod
+    def _idioms_check(valence: float, words: List[str], i: int) -> float:
+        idioms = _C.SPECIAL_CASE_IDIOMS
+        onezero = f"{words[i - 1]} {words[i]}"
+        twoonezero = f"{words[i - 2]} {words[i - 1]} {words[i]}"
+        twoone = f"{words[i - 2]} {words[i - 1]}"
+        threetwoone = f"{words[i - 3]} {words[i - 2]} {words[i - 1]}"
+        threetwo = f"{words[i - 3]} {words[i - 2]}"
+        for seq in (onezero, twoonezero, twoone, threetwoone, threetwo):
+            if seq in idioms:
+                valence = idioms[seq]
+                break
+        if len(words) - 1 > i:
+            zeroone = f"{words[i]} {words[i + 1]}"
+            if zeroone in idioms:
+                valence = idioms[zeroone]
+        if len(words) - 1 > i + 1:
+            zeroonetwo = f"{words[i]} {words[i + 1]} {words[i + 2]}"
+            if zeroonetwo in idioms:
+                valence = idioms[zeroonetwo]
+        if threetwo in _C.BOOSTER_DICT or twoone in _C.BOOSTER_DICT:
+            valence = valence + _C.B_DECR
+        return valence
@@ -0,0 +1,97 @@
+import argparse
+import logging
+from typing import Iterable
+import psycopg2
+from src.database import db_connection, stamp_watermark
+
+# Daily sentiment rollup: one stage.sentiment_daily row per (UTC day, source, label)
+# holding the article count and the sum of their scores. Writers add the rows they
+# label in the same transaction, so trend queries read O(days x sources) rows
+# instead of scanning stage.raw_articles. Alongside it, stage.word_daily counts the
+# title words of each (day, source, label) bucket for the dashboard's word cloud.
+
+ROLLUP_SELECT = """
+    SELECT (published AT TIME ZONE 'UTC')::date, COALESCE(source, ''), sentiment_label,
+           COUNT(*), COALESCE(SUM(sentiment_score), 0)
+    FROM stage.raw_articles
+    WHERE sentiment_label IS NOT NULL AND published IS NOT NULL
+"""
+
+ADD_TO_ROLLUP_SQL = f"""
+    INSERT INTO stage.sentiment_daily (day, source, sentiment_label, article_count, score_sum)
+    {ROLLUP_SELECT} AND id = ANY(%s)
+    GROUP BY 1, 2, 3
+    ON CONFLICT (day, source, sentiment_label) DO UPDATE
+    SET article_count = stage.sentiment_daily.article_count + EXCLUDED.article_count,
+        score_sum = stage.sentiment_daily.score_sum + EXCLUDED.score_sum
+"""
+
+# Title words of at least three letters, lower-cased, minus stage.stopwords
+WORD_SELECT = """
+    SELECT (a.published AT TIME ZONE 'UTC')::date, COALESCE(a.source, ''), a.sentiment_label, w.word, COUNT(*)
+    FROM stage.raw_articles a
+    CROSS JOIN LATERAL regexp_split_to_table(lower(COALESCE(a.title, '')), '[^[:alpha:]]+') AS w(word)
+    WHERE a.sentiment_label IS NOT NULL AND a.published IS NOT NULL
+      AND length(w.word) >= 3
+      AND NOT EXISTS (SELECT 1 FROM stage.stopwords s WHERE s.word = w.word)
+"""
+
+ADD_WORDS_SQL = f"""
+    INSERT INTO stage.word_daily (day, source, sentiment_label, word, occurrences)
+    {WORD_SELECT} AND a.id = ANY(%s)
+    GROUP BY 1, 2, 3, 4
+    ON CONFLICT (day, source, sentiment_label, word) DO UPDATE
+    SET occurrences = stage.word_daily.occurrences + EXCLUDED.occurrences
+"""
+
+def add_to_rollup(conn, article_ids: Iterable[int]) -> None:
+    """
+    Add newly labelled articles to the rollup and word counts, in the caller's transaction.
+
+    Each article must be passed exactly once, when it first gets a label.
+    Articles without a published date are left out of the rollup.
+    """
+    article_ids = list(article_ids)
+    if not article_ids:
+        return
+    with conn.cursor() as cursor:
+        cursor.execute(ADD_TO_ROLLUP_SQL, (article_ids,))
+        cursor.execute(ADD_WORDS_SQL, (article_ids,))
+
+def rebuild_rollup() -> int:
+    """Recompute the rollup and word counts from stage.raw_articles in one transaction. Returns the number of rollup rows."""
+    with db_connection() as conn:
+        if conn is None:
+            logging.error("Database connection failed while rebuilding the sentiment rollup.")
+            return 0
+        try:
+            with conn.cursor() as cursor:
+                # TRUNCATE locks the table, so writers adding to it wait until the rebuild commits
+                cursor.execute("TRUNCATE stage.sentiment_daily, stage.word_daily")
+                cursor.execute(
+                    f"INSERT INTO stage.sentiment_daily (day, source, sentiment_label, article_count, score_sum) "
+                    f"{ROLLUP_SELECT} GROUP BY 1, 2, 3"
+                )
+                rows = cursor.rowcount
+                cursor.execute(
+                    f"INSERT INTO stage.word_daily (day, source, sentiment_label, word, occurrences) "
+                    f"{WORD_SELECT} GROUP BY 1, 2, 3, 4"
+                )
+            stamp_watermark(conn)
+            conn.commit()
+        except psycopg2.Error as e:
+            logging.error(f"Error rebuilding the sentiment rollup: {e}")
+            conn.rollback()
+            return 0
+    logging.info(f"Rebuilt stage.sentiment_daily with {rows} rows.")
+    return rows
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Maintain the daily sentiment rollup table.")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute stage.sentiment_daily and stage.word_daily from stage.raw_articles (for backfills)")
+    args = parser.parse_args()
+    if args.rebuild:
+        rebuild_rollup()
+    else:
+        parser.print_help()
@@ -0,0 +1,63 @@
+import pytest
+from api import cache
+from api.cache import ResponseCache, cache_key
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    return now
+
+def test_cache_key_ignores_parameter_order():
+    assert cache_key("/sources", a=1, b=None) == cache_key("/sources", b=None, a=1)
+    assert cache_key("/sources", a=1) != cache_key("/sentiment-timeseries", a=1)
+    assert cache_key("/sources", watermark=(1, 2)) != cache_key("/sources", watermark=(1, 3))
+
+def test_entries_expire_after_ttl(clock):
+    responses = ResponseCache(ttl=10, max_entries=10)
+    responses.put("k", "v")
+    clock[0] += 9.9
+    assert responses.get("k") == "v"
+    clock[0] += 0.2
+    assert responses.get("k", "missing") == "missing"
+    assert responses.stats()["expirations"] == 1
+    assert responses.stats()["entries"] == 0
+
+def test_put_restarts_the_ttl(clock):
+    responses = ResponseCache(ttl=10, max_entries=10)
+    responses.put("k", "old")
+    clock[0] += 8
+    responses.put("k", "new")
+    clock[0] += 8
+    assert responses.get("k") == "new"
+
+def test_least_recently_used_entry_is_evicted(clock):
+    responses = ResponseCache(ttl=10, max_entries=2)
+    responses.put("a", 1)
+    responses.put("b", 2)
+    assert responses.get("a") == 1 # "b" is now the least recently used
+    responses.put("c", 3)
+    assert responses.get("b") is None
+    assert (responses.get("a"), responses.get("c")) == (1, 3)
+    assert responses.stats()["evictions"] == 1
+
+def test_clear_drops_every_entry(clock):
+    responses = ResponseCache(ttl=10, max_entries=10)
+    responses.put("a", 1)
+    responses.put("b", 2)
+    responses.clear()
+    assert responses.get("a") is None and responses.get("b") is None
+    assert responses.stats()["invalidations"] == 1
+
+@pytest.mark.parametrize("ttl, max_entries", [(0, 10), (10, 0)])
+def test_disabled_cache_stores_nothing(clock, ttl, max_entries):
+    responses = ResponseCache(ttl=ttl, max_entries=max_entries)
+    responses.put("a", 1)
+    assert responses.get("a") is None
+
+def test_hit_rate(clock):
+    responses = ResponseCache(ttl=10, max_entries=10)
+    responses.put("a", 1)
+    responses.get("a")
+    responses.get("b")
+    assert responses.stats()["hit_rate"] == 0.5
@@ -0,0 +1,50 @@
+import pytest
+from dashboard.dashboard import table_params
+
+NO_FILTERS = (None, None, None)
+
+@pytest.mark.parametrize("filter_query, expected", [
+    ("{source} = Reuters", {"source": "Reuters"}),
+    ("{source} s= Reuters", {"source": "Reuters"}),
+    ('{source} eq "Economic Times"', {"source": "Economic Times"}),
+    ("{sentiment_label} seq Negative", {"sentiment_label": "negative"}),
+    ("{published} datestartswith 2025-01", {"published_from": "2025-01-01", "published_to": "2025-02-01"}),
+    ("{published} s= 2025-01-01", {"published_from": "2025-01-01", "published_to": "2025-01-02"}),
+    ("{published} s> 2025-01-01", {"published_from": "2025-01-02"}),
+    ("{published} ge 2025-01-01", {"published_from": "2025-01-01"}),
+    ("{published} s< 2025-01-01", {"published_to": "2025-01-01"}),
+    ("{published} le 2025", {"published_to": "2026-01-01"}),
+    ("{source} = Reuters && {published} >= 2025-01-01", {"source": "Reuters", "published_from": "2025-01-01"}),
+])
+def test_column_filters_the_api_can_express(filter_query, expected):
+    assert table_params(NO_FILTERS, filter_query=filter_query) == expected
+
+@pytest.mark.parametrize("filter_query", [
+    "{source} != Reuters",
+    "{source} sne Reuters",
+    "{sentiment_label} ne negative",
+    "{source} scontains Reut",
+    "{source} is blank",
+    "{source} > Reuters",
+    "{published} != 2025-01-01",
+    "{published} scontains 2025",
+    "{published} >= someday",
+    "{title} = Markets",
+])
+def test_other_column_filters_are_ignored(filter_query):
+    assert table_params(NO_FILTERS, filter_query=filter_query) == {}
+
+def test_column_filters_narrow_the_dashboard_filters():
+    params = table_params(("positive", None, "2025"), filter_query="{published} >= 2025-06-01 && {sentiment_label} = positive")
+    assert params == {"sentiment_label": "positive", "published_from": "2025-06-01", "published_to": "2026-01-01"}
+
+@pytest.mark.parametrize("filters, filter_query", [
+    (("positive", None, None), "{sentiment_label} = negative"),
+    (NO_FILTERS, "{published} >= 2025-06-01 && {published} < 2025-01-01"),
+])
+def test_contradicting_filters_match_nothing(filters, filter_query):
+    assert table_params(filters, filter_query=filter_query) is None
+
+def test_sort_by_indexed_columns_only():
+    assert table_params(NO_FILTERS, [{"column_id": "source", "direction": "desc"}]) == {"sort": "-source"}
+    assert table_params(NO_FILTERS, [{"column_id": "title", "direction": "asc"}]) == {}
@@ -0,0 +1,25 @@
+import asyncio
+from api import db
+
+def test_placeholders_are_numbered_in_order():
+    params = db.QueryParams()
+    assert [params.add("a"), params.add(None), params.add(["x", "y"])] == ["$1", "$2", "$3"]
+    assert params.values == ["a", None, ["x", "y"]]
+
+def test_the_same_value_added_twice_gets_two_placeholders():
+    params = db.QueryParams()
+    assert params.add(5) == "$1"
+    assert params.add(5) == "$2"
+    assert params.values == [5, 5]
+
+def test_each_query_starts_at_one():
+    db.QueryParams().add("a")
+    assert db.QueryParams().add("b") == "$1"
+
+def test_acquire_yields_none_without_a_pool(monkeypatch):
+    monkeypatch.setattr(db, "_pool", None)
+
+    async def check():
+        async with db.acquire() as conn:
+            return conn
+    assert asyncio.run(check()) is None
@@ -0,0 +1,110 @@
+import asyncio
+import json
+import os
+from datetime import date, datetime, timezone
+from typing import List
+import asyncpg
+import psycopg2
+import pytest
+from api import db
+from api.app import _article_filters
+from api.articles import articles_sql
+from api.pagination import encode_cursor
+from src.migrations import apply_migrations
+from src.sentiment.analyzer import SELECT_UNSCORED_SQL
+
+# The hot-path queries must be served by the indexes from sql/migrations. The
+# /articles queries are the ones get_articles sends, built by articles_sql. Rows are
+# seeded inside a transaction that is rolled back, so the database is left as it was.
+
+pytestmark = pytest.mark.skipif(not os.getenv("DATABASE_URL"), reason="DATABASE_URL is not set")
+
+SEED_ROWS = 50000
+
+SEED_SQL = f"""
+    INSERT INTO stage.raw_articles (title, link, published, summary, source, type, created_at, sentiment_score, sentiment_label)
+    SELECT 'Seed article ' || g, 'explain-seed/' || g,
+           timestamptz '2020-01-01 00:00+00' + (g % 2000) * interval '1 day' + (g % 1440) * interval '1 minute',
+           'seed', 'Source ' || (g % 20), 'news', '', 0.1,
+           CASE WHEN g % 50 = 0 THEN NULL ELSE (ARRAY['positive', 'negative', 'neutral'])[1 + g % 3] END
+    FROM generate_series(1, {SEED_ROWS}) AS g
+"""
+
+def _utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+# (description, /articles arguments, index that must appear in the plan, or a tuple of equally good ones)
+ARTICLES_CASES = [
+    ("first page", {}, "raw_articles_published_id_idx"),
+    ("after=", {"cursor": encode_cursor(_utc(2023, 6, 1), 0)}, "raw_articles_published_id_idx"),
+    # An equality on the group column is served by its index either way round
+    ("source=", {"filters": {"source": "Source 7"}},
+     ("raw_articles_source_published_idx", "raw_articles_source_published_asc_idx")),
+    ("sentiment_label=", {"filters": {"sentiment_label": "negative"}},
+     ("raw_articles_label_published_idx", "raw_articles_label_published_asc_idx")),
+    ("published=", {"filters": {"published": date(2023, 6, 1)}}, "raw_articles_published_id_idx"),
+    ("published_from=&published_to=",
+     {"filters": {"published_from": _utc(2021, 1, 1), "published_to": _utc(2021, 4, 1)}}, "raw_articles_published_id_idx"),
+    ("since= (dashboard delta poll)",
+     {"cursor": encode_cursor(_utc(2025, 6, 1), 0), "since": True, "limit": 1000}, "raw_articles_published_id_idx"),
+    ("sort=source&after= (table page)",
+     {"sort": "source", "cursor": encode_cursor(_utc(2022, 3, 1), 0, "Source 7")}, "raw_articles_source_published_idx"),
+    ("sort=-source (table page)", {"sort": "-source"}, "raw_articles_source_published_asc_idx"),
+    ("sort=-sentiment_label&after= (table page)",
+     {"sort": "-sentiment_label", "cursor": encode_cursor(_utc(2024, 3, 1), 0, "neutral")}, "raw_articles_label_published_asc_idx"),
+]
+
+def _plan_nodes(node: dict) -> List[dict]:
+    nodes = [node]
+    for child in node.get("Plans", []):
+        nodes.extend(_plan_nodes(child))
+    return nodes
+
+def _check_plan(description: str, plan, index) -> None:
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    nodes = _plan_nodes(plan[0]["Plan"])
+    indexes = {n.get("Index Name") for n in nodes if n.get("Index Name")}
+    wanted = index if isinstance(index, tuple) else (index,)
+    assert indexes & set(wanted), f"{description}: uses {sorted(indexes) or 'no index'}, not {' or '.join(wanted)}"
+    assert not any(n["Node Type"] == "Seq Scan" for n in nodes), f"{description}: sequential scan"
+
+@pytest.fixture(scope="module", autouse=True)
+def migrated():
+    conn = psycopg2.connect(os.environ["DATABASE_URL"])
+    try:
+        apply_migrations(conn)
+    finally:
+        conn.close()
+
+@pytest.mark.parametrize("description, arguments, index", ARTICLES_CASES, ids=[case[0] for case in ARTICLES_CASES])
+def test_articles_page_uses_its_index(description, arguments, index):
+    async def check():
+        conn = await asyncpg.connect(os.environ["DATABASE_URL"])
+        transaction = conn.transaction()
+        await transaction.start()
+        try:
+            await conn.execute(SEED_SQL)
+            await conn.execute("ANALYZE stage.raw_articles")
+            params = db.QueryParams()
+            filters = {"sentiment_label": None, "source": None, "published": None, "published_from": None, "published_to": None}
+            filters.update(arguments.get("filters", {}))
+            conditions = _article_filters(params, **filters)
+            query = articles_sql(params, conditions, arguments.get("sort", "-published"), arguments.get("cursor"),
+                                 since=arguments.get("since", False), limit=arguments.get("limit", 100))
+            _check_plan(description, await conn.fetchval("EXPLAIN (FORMAT JSON) " + query, *params.values), index)
+        finally:
+            await transaction.rollback() # Drop the seed rows
+            await conn.close()
+    asyncio.run(check())
+
+def test_analyzer_backlog_scan_uses_its_index():
+    conn = psycopg2.connect(os.environ["DATABASE_URL"])
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(SEED_SQL)
+            cursor.execute("ANALYZE stage.raw_articles")
+            cursor.execute("EXPLAIN (FORMAT JSON) " + SELECT_UNSCORED_SQL, (0, 1000))
+            _check_plan("analyzer backlog scan", cursor.fetchone()[0], "raw_articles_unscored_idx")
+    finally:
+        conn.rollback() # Drop the seed rows
+        conn.close()
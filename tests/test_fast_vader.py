@@ -0,0 +1,58 @@
+import pytest
+from nltk.sentiment.vader import SentimentIntensityAnalyzer
+from benchmarks.sentiment_scorer import synthetic_corpus
+from src.sentiment.fast_vader import FastVaderScorer
+
+TOLERANCE = 1e-9
+
+# One or more texts per VADER rule
+RULE_CASES = [
+    "",
+    "a",
+    "Profit rises",
+    "Profit rises!!!",
+    "Profit rises!!!!!!",
+    "Is profit rising??",
+    "Is profit rising?!?!?",
+    "Shares are very good",
+    "Shares are not very good",
+    "Shares aren't good",
+    "Shares are never so good",
+    "Shares are never this good",
+    "Not only good but great",
+    "The results are GOOD despite the slump",
+    "THE RESULTS ARE GOOD",
+    "Margins were good but the outlook is terrible",
+    "At least the dividend is safe",
+    "least bad quarter in years",
+    "The merger is the kiss of death for the brand",
+    "This stock is the bomb",
+    "He is a cut the mustard kind of trader",
+    "The rally is sort of impressive",
+    "kind of disappointing guidance",
+    "Without doubt a great quarter",
+    "The board will not approve the deal, nor will it reject it",
+    "Exports slump :( but imports :) recover",
+    "\"Record\" profit, analysts say... (maybe)",
+    "RBI cuts rate; Sensex SURGES, Nifty gains!",
+]
+
+@pytest.fixture(scope="module")
+def analyzer() -> SentimentIntensityAnalyzer:
+    return SentimentIntensityAnalyzer()
+
+def assert_same_scores(analyzer: SentimentIntensityAnalyzer, texts) -> None:
+    expected = [analyzer.polarity_scores(text)["compound"] for text in texts]
+    actual = FastVaderScorer(analyzer.lexicon).compound_scores(texts)
+    mismatches = [(text, e, a) for text, e, a in zip(texts, expected, actual) if abs(e - a) > TOLERANCE]
+    assert not mismatches, mismatches[:5]
+
+def test_rule_cases_match_nltk(analyzer):
+    assert_same_scores(analyzer, RULE_CASES)
+
+def test_synthetic_corpus_matches_nltk(analyzer):
+    assert_same_scores(analyzer, synthetic_corpus(3000, seed=7))
+
+def test_compound_matches_batch(analyzer):
+    scorer = FastVaderScorer(analyzer.lexicon)
+    assert [scorer.compound(text) for text in RULE_CASES] == scorer.compound_scores(RULE_CASES)
@@ -0,0 +1,50 @@
+import threading
+import time
+from src.scrapers import fetcher
+
+def _sources(*urls):
+    return [{"name": "Test", "urls": list(urls)}]
+
+def test_feeds_finished_while_the_caller_works_are_still_yielded(monkeypatch):
+    def fetch_articles(source, session=None, cache=None):
+        if source["url"] != "http://a/1":
+            time.sleep(0.1) # Finishes while the caller is busy with the first feed
+        return [source["url"]]
+
+    monkeypatch.setattr(fetcher, "fetch_articles", fetch_articles)
+    results = []
+    for _, url, entries in fetcher.fetch_all_sources(_sources("http://a/1", "http://a/2", "http://b/1"), run_deadline=0.2):
+        time.sleep(0.3) # Saving takes longer than the whole fetch deadline
+        results.append((url, entries))
+    assert sorted(results) == [("http://a/1", ["http://a/1"]), ("http://a/2", ["http://a/2"]), ("http://b/1", ["http://b/1"])]
+
+def test_unfinished_feeds_are_abandoned_at_the_deadline_and_sessions_outlive_them(monkeypatch):
+    release = threading.Event()
+    sessions = []
+
+    def fetch_articles(source, session=None, cache=None):
+        sessions.append(session)
+        if source["url"] == "http://slow/1":
+            release.wait(5)
+            assert not session.closed # Still usable by the abandoned download
+        return [source["url"]]
+
+    class TrackedSession(fetcher.requests.Session):
+        closed = False
+
+        def close(self):
+            self.closed = True
+            super().close()
+
+    monkeypatch.setattr(fetcher, "fetch_articles", fetch_articles)
+    monkeypatch.setattr(fetcher.requests, "Session", TrackedSession)
+    started = time.monotonic()
+    urls = [url for _, url, _ in fetcher.fetch_all_sources(_sources("http://fast/1", "http://slow/1"), run_deadline=0.2)]
+    assert urls == ["http://fast/1"]
+    assert time.monotonic() - started < 2
+    assert not any(session.closed for session in sessions)
+    release.set()
+    deadline = time.monotonic() + 5
+    while not all(session.closed for session in sessions) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert all(session.closed for session in sessions)
@@ -0,0 +1,94 @@
+import json
+from datetime import datetime, timezone
+from src import metrics
+from src.metrics import Registry, StatementTimers, statement_label, write_profile
+
+def test_render_counters_and_gauges():
+    registry = Registry()
+    registry.counter("b_total", "Things counted.", ["source"]).labels("A").inc(2)
+    registry.gauge("a_size", "Current size.").set(1.5)
+    assert registry.render() == (
+        "# HELP a_size Current size.\n"
+        "# TYPE a_size gauge\n"
+        "a_size 1.5\n"
+        "# HELP b_total Things counted.\n"
+        "# TYPE b_total counter\n"
+        'b_total{source="A"} 2\n'
+    )
+
+def test_render_histogram_buckets_are_cumulative():
+    registry = Registry()
+    histogram = registry.histogram("t_seconds", "Latency.", ["client"], buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.labels("api").observe(value)
+    assert registry.render().splitlines()[2:] == [
+        't_seconds_bucket{client="api",le="0.1"} 2', # Bounds are inclusive
+        't_seconds_bucket{client="api",le="1"} 3',
+        't_seconds_bucket{client="api",le="+Inf"} 4',
+        't_seconds_count{client="api"} 4',
+        't_seconds_sum{client="api"} 3.65',
+    ]
+
+def test_render_escapes_label_values():
+    registry = Registry()
+    registry.counter("c_total", "Escaping.", ["source"]).labels('Say "hi"\\\nbye').inc()
+    assert registry.render().splitlines()[-1] == r'c_total{source="Say \"hi\"\\\nbye"} 1'
+
+def test_histogram_folds_observations_past_the_threshold(monkeypatch):
+    monkeypatch.setattr(metrics, "_FOLD_AFTER", 3)
+    child = Registry().histogram("f_seconds", "Folding.", buckets=(1,)).labels()
+    for _ in range(4):
+        child.observe(0.5)
+    assert len(child._pending) == 1 # The first three were folded
+    assert child.totals() == ([4, 0], 4, 2.0)
+
+def test_registering_twice_keeps_the_live_series():
+    registry = Registry()
+    registry.counter("d_total", "Once.").inc()
+    registry.counter("d_total", "Once.").inc()
+    assert registry.snapshot()["d_total"]["samples"] == [{"labels": {}, "value": 2.0}]
+
+def test_write_profile_records_what_changed(tmp_path, monkeypatch):
+    registry = Registry()
+    monkeypatch.setattr(metrics, "REGISTRY", registry)
+    counter = registry.counter("rows_total", "Rows.", ["source"])
+    histogram = registry.histogram("run_seconds", "Runs.")
+    counter.labels("A").inc(5)
+    histogram.observe(1.0)
+    before = registry.snapshot()
+    counter.labels("A").inc(2)
+    counter.labels("B").inc()
+    histogram.observe(3.0)
+    started_at = datetime(2024, 3, 1, 9, 30, 5, tzinfo=timezone.utc)
+
+    path = write_profile(str(tmp_path / "profiles"), "scrape", before, started_at)
+    assert path == str(tmp_path / "profiles" / "scrape-20240301T093005Z.json")
+    with open(path, encoding="utf-8") as f:
+        profile = json.load(f)
+    assert profile["run"] == "scrape"
+    assert profile["started_at"] == started_at.isoformat()
+    assert profile["metrics"] == {
+        "rows_total": [{"labels": {"source": "A"}, "value": 2.0}, {"labels": {"source": "B"}, "value": 1.0}],
+        "run_seconds": [{"labels": {}, "count": 1, "sum": 3.0, "avg": 3.0}],
+    }
+
+def test_write_profile_returns_none_when_it_cannot_write(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    assert write_profile(str(blocker / "profiles"), "scrape", {}, datetime.now(timezone.utc)) is None
+
+def test_statement_label():
+    assert statement_label("  SELECT id FROM stage.raw_articles WHERE 1=1") == "select stage.raw_articles"
+    assert statement_label(b"INSERT INTO Stage.Word_Daily VALUES (1)") == "insert stage.word_daily"
+    assert statement_label("BEGIN") == "begin -"
+
+def test_statement_timers_share_the_labelled_series():
+    timer = StatementTimers("test")
+    query = "UPDATE stage.data_watermark SET analyzed_at = now()"
+    assert timer(query) is timer(query) is metrics.DB_QUERY_SECONDS.labels("test", "update stage.data_watermark")
+
+def test_statement_timers_do_not_keep_long_statements():
+    timer = StatementTimers("test")
+    batch = "INSERT INTO stage.raw_articles VALUES " + ",".join(["('x')"] * 1000)
+    assert timer(batch) is metrics.DB_QUERY_SECONDS.labels("test", "insert stage.raw_articles")
+    assert batch not in timer._children
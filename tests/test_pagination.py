@@ -0,0 +1,202 @@
+import asyncio
+import base64
+import os
+from datetime import datetime, timedelta, timezone
+import asyncpg
+import pytest
+from fastapi import HTTPException
+from api import db
+from api.articles import after_group, after_published, articles_sql
+from api.pagination import (
+    decode_cursor, decode_group_cursor, decode_rank_cursor, encode_cursor, encode_rank_cursor,
+)
+
+PUBLISHED = datetime(2024, 3, 1, 9, 30, tzinfo=timezone.utc)
+
+def _raw(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode("utf-8")).decode("ascii").rstrip("=")
+
+# --- Cursors ---
+
+@pytest.mark.parametrize("published", [PUBLISHED, None])
+def test_cursor_round_trip(published):
+    assert decode_cursor(encode_cursor(published, 42)) == (published, 42)
+
+@pytest.mark.parametrize("group", ["Moneycontrol", None])
+@pytest.mark.parametrize("published", [PUBLISHED, None])
+def test_group_cursor_round_trip(published, group):
+    assert decode_group_cursor(encode_cursor(published, 42, group)) == (published, 42, group)
+
+def test_rank_cursor_round_trip():
+    assert decode_rank_cursor(encode_rank_cursor(0.1, 7)) == (0.1, 7)
+
+def test_cursors_are_url_safe():
+    cursor = encode_cursor(PUBLISHED, 2 ** 40, "Économie & Marchés ??")
+    assert cursor.replace("-", "").replace("_", "").isalnum()
+
+MALFORMED = [
+    "",
+    "not a cursor!",
+    _raw("not json"),
+    _raw("{}"),
+    _raw("[]"),
+    _raw('["2024-03-01T09:30:00+00:00"]'),
+    _raw('["yesterday", 1]'),
+    _raw('["2024-03-01T09:30:00+00:00", "x"]'),
+    _raw('[null, 1, "a", "b"]'),
+]
+
+@pytest.mark.parametrize("cursor", MALFORMED)
+@pytest.mark.parametrize("decode", [decode_cursor, decode_group_cursor, decode_rank_cursor])
+def test_malformed_cursor_is_400(decode, cursor):
+    with pytest.raises(HTTPException) as raised:
+        decode(cursor)
+    assert raised.value.status_code == 400
+
+def test_cursor_of_another_order_is_400():
+    with pytest.raises(HTTPException):
+        decode_group_cursor(encode_cursor(PUBLISHED, 1))
+    with pytest.raises(HTTPException):
+        decode_cursor(encode_cursor(PUBLISHED, 1, "Moneycontrol"))
+
+# --- Keyset conditions ---
+
+def _conditions(fn, *args):
+    params = db.QueryParams()
+    return fn(params, *args), params.values
+
+def test_after_published_descending():
+    assert _conditions(after_published, PUBLISHED, 5, True) == (["(published, id) < ($1, $2)"], [PUBLISHED, 5])
+
+def test_after_undated_descending_continues_into_dated_rows():
+    # published DESC puts NULLs first: the rest of the undated rows, then every dated one
+    assert _conditions(after_published, None, 5, True) == (
+        ["published IS NULL AND id < $1", "published IS NOT NULL"], [5]
+    )
+
+def test_after_published_ascending_ends_with_undated_rows():
+    assert _conditions(after_published, PUBLISHED, 5, False) == (
+        ["(published, id) > ($1, $2)", "published IS NULL"], [PUBLISHED, 5]
+    )
+
+def test_after_undated_ascending():
+    assert _conditions(after_published, None, 5, False) == (["published IS NULL AND id > $1"], [5])
+
+@pytest.mark.parametrize("descending, value, expected", [
+    (False, "b", (["source > $1", "source IS NULL"], ["b"])),
+    (False, None, ([], [])),                      # The NULL group is last ascending
+    (True, "b", (["source < $1"], ["b"])),
+    (True, None, (["source IS NOT NULL"], [])),  # ... and first descending
+])
+def test_after_group(descending, value, expected):
+    assert _conditions(after_group, "source", value, descending) == expected
+
+def test_since_leaves_undated_rows_out():
+    params = db.QueryParams()
+    query = articles_sql(params, "", cursor=encode_cursor(PUBLISHED, 5), since=True)
+    assert "(published, id) > ($1, $2)" in query
+    assert "IS NULL" not in query and "UNION" not in query
+
+def test_since_from_an_undated_cursor_is_400():
+    with pytest.raises(HTTPException) as raised:
+        articles_sql(db.QueryParams(), "", cursor=encode_cursor(None, 5), since=True)
+    assert raised.value.status_code == 400
+
+# The conditions against Postgres' own ordering, NULLs and ties included
+
+DAY = datetime(2024, 1, 1, tzinfo=timezone.utc)
+ROWS = [ # (id, published, source)
+    (1, DAY, "a"), (2, DAY, "b"), (3, DAY + timedelta(days=1), None), (4, None, "a"),
+    (5, DAY, "a"), (6, None, None), (7, DAY + timedelta(days=2), "b"), (8, None, "b"),
+    (9, DAY + timedelta(days=1), "a"), (10, DAY - timedelta(days=1), None),
+]
+
+def _rows(params: db.QueryParams) -> str:
+    """ROWS as a FROM item with the columns of stage.raw_articles the conditions use."""
+    return (f"unnest({params.add([r[0] for r in ROWS])}::int[], {params.add([r[1] for r in ROWS])}::timestamptz[], "
+            f"{params.add([r[2] for r in ROWS])}::text[]) AS t(id, published, source)")
+
+async def _matching_ids(conn, make_conditions) -> set:
+    params = db.QueryParams()
+    rows = _rows(params)
+    conditions = make_conditions(params)
+    if not conditions:
+        return set()
+    where = " OR ".join(f"({condition})" for condition in conditions)
+    records = await conn.fetch(f"SELECT id FROM {rows} WHERE {where}", *params.values)
+    return {record["id"] for record in records}
+
+async def _ordered_ids(conn, order: str) -> list:
+    params = db.QueryParams()
+    records = await conn.fetch(f"SELECT id FROM {_rows(params)} ORDER BY {order}", *params.values)
+    return [record["id"] for record in records]
+
+def _run(check):
+    async def main():
+        conn = await asyncpg.connect(os.environ["DATABASE_URL"])
+        try:
+            await check(conn)
+        finally:
+            await conn.close()
+    asyncio.run(main())
+
+@pytest.mark.skipif(not os.getenv("DATABASE_URL"), reason="DATABASE_URL is not set")
+@pytest.mark.parametrize("descending", [True, False])
+def test_after_published_selects_the_rows_after_the_cursor(descending):
+    order = "published DESC, id DESC" if descending else "published ASC NULLS LAST, id ASC"
+
+    async def check(conn):
+        ordered = await _ordered_ids(conn, order)
+        for position, (article_id, published, _) in enumerate(sorted(ROWS, key=lambda r: ordered.index(r[0]))):
+            after = await _matching_ids(conn, lambda params: after_published(params, published, article_id, descending))
+            assert after == set(ordered[position + 1:]), (article_id, published)
+    _run(check)
+
+@pytest.mark.skipif(not os.getenv("DATABASE_URL"), reason="DATABASE_URL is not set")
+@pytest.mark.parametrize("descending", [True, False])
+def test_after_group_selects_the_later_groups(descending):
+    order = "source DESC" if descending else "source ASC"
+
+    async def check(conn):
+        ordered = await _ordered_ids(conn, order)
+        groups = [next(r[2] for r in ROWS if r[0] == article_id) for article_id in ordered]
+        for value in set(groups):
+            later = {ordered[i] for i in range(groups.index(value), len(ordered)) if groups[i] != value}
+            assert await _matching_ids(conn, lambda params: after_group(params, "source", value, descending)) == later, value
+    _run(check)
+
+@pytest.mark.skipif(not os.getenv("DATABASE_URL"), reason="DATABASE_URL is not set")
+@pytest.mark.parametrize("sort", ["-published", "published", "source", "-source", "sentiment_label", "-sentiment_label"])
+def test_pages_walk_every_row_in_order(sort):
+    group = sort.lstrip("-") if sort.lstrip("-") != "published" else None
+    if group is None:
+        expected_order = "published DESC, id DESC" if sort.startswith("-") else "published ASC NULLS LAST, id ASC"
+    else: # Groups either way round, each newest first
+        expected_order = f"{group} {'DESC' if sort.startswith('-') else 'ASC'}, published DESC, id DESC"
+    conditions = " AND link LIKE 'pagination-test/%'"
+
+    async def check(conn):
+        transaction = conn.transaction()
+        await transaction.start()
+        try:
+            await conn.executemany(
+                "INSERT INTO stage.raw_articles (title, link, published, source, sentiment_label, type, created_at) "
+                "VALUES ('t', $1, $2, $3, $4, 'news', '')",
+                [(f"pagination-test/{i}", published, source, ["positive", None, "negative"][i % 3])
+                 for i, (_, published, source) in enumerate(ROWS * 2)], # Twice, for ties on every column
+            )
+            expected = [r["id"] for r in await conn.fetch(
+                f"SELECT id FROM stage.raw_articles WHERE 1=1{conditions} ORDER BY {expected_order}")]
+            walked, cursor = [], None
+            while True:
+                params = db.QueryParams()
+                page = await conn.fetch(articles_sql(params, conditions, sort, cursor, limit=3), *params.values)
+                walked += [row["id"] for row in page]
+                if len(page) < 3:
+                    break
+                last = page[-1]
+                cursor = encode_cursor(last["published"], last["id"], *((last[group],) if group else ()))
+            assert walked == expected
+        finally:
+            await transaction.rollback()
+    _run(check)
@@ -0,0 +1,53 @@
+from contextlib import contextmanager
+import pytest
+from src.jobs import Job, JobCancelled
+from src.scrapers import __main__ as scraper
+from src.scrapers.saver import SaveResult
+
+class FakeCache:
+    def __init__(self, path):
+        self.committed, self.saved = [], None
+
+    def load(self):
+        pass
+
+    def commit(self, url):
+        self.committed.append(url)
+
+    def save(self):
+        self.saved = list(self.committed)
+
+    def log_stats(self):
+        pass
+
+class FakeSeen:
+    links_filtered = round_trips_saved = 0
+    saved_to = None
+
+    def save(self, path):
+        self.saved_to = path
+
+def test_cancelled_run_still_saves_the_feed_cache_and_seen_index(monkeypatch):
+    job, caches, seen = Job("scrape"), [], FakeSeen()
+
+    @contextmanager
+    def db_connection():
+        yield object()
+
+    def save_articles(articles, source_name, conn=None, seen=None):
+        if articles == ["y"]:
+            job.cancel() # Takes effect at the next progress report
+        return SaveResult(inserted=len(articles))
+
+    monkeypatch.setattr(scraper, "init_app_config", lambda: None)
+    monkeypatch.setattr(scraper, "init_db", lambda: None)
+    monkeypatch.setattr(scraper, "db_connection", db_connection)
+    monkeypatch.setattr(scraper, "FeedCache", lambda path: caches.append(FakeCache(path)) or caches[-1])
+    monkeypatch.setattr(scraper, "load_seen_index", lambda *args: seen)
+    monkeypatch.setattr(scraper, "fetch_all_sources", lambda sources, cache: iter([("A", "http://a/1", ["x"]), ("A", "http://a/2", ["y"])]))
+    monkeypatch.setattr(scraper, "save_articles", save_articles)
+
+    with pytest.raises(JobCancelled):
+        scraper.main(score_at_ingest=False, job=job)
+    assert caches[0].saved == ["http://a/1"]
+    assert seen.saved_to == scraper.SEEN_INDEX_PATH
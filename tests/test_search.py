@@ -0,0 +1,64 @@
+import asyncio
+import os
+import asyncpg
+import pytest
+from api import db
+from api.search import split_query, tsquery_sql
+
+@pytest.mark.parametrize("q, expected", [
+    ("repo rate", [("repo rate", [])]),
+    ('"repo rate" cut', [('"repo rate" cut', [])]),
+    ('"reli* OR bank" cut', [('"reli* OR bank" cut', [])]),  # Quoted, so neither a prefix nor an OR
+    ('-"repo rate" cut', [('-"repo rate" cut', [])]),
+    ('"repo rate', [('"repo rate', [])]),                   # Unterminated quote runs to the end
+    ("reli* bank", [("bank", [("reli", False)])]),
+    ("-reli* bank", [("bank", [("reli", True)])]),
+    ("reli*** bank", [("bank", [("reli", False)])]),
+    ("reli* OR bank", [("", [("reli", False)]), ("bank", [])]),
+    ("banks or rates", [("banks", []), ("rates", [])]),
+    ("OR bank OR OR", [("bank", [])]),
+    ("   ", []),
+])
+def test_split_query(q, expected):
+    assert split_query(q) == expected
+
+def test_tsquery_of_one_alternative():
+    params = db.QueryParams()
+    assert tsquery_sql(params, "bank -reli*") == (
+        "(websearch_to_tsquery('english', $1) && to_tsquery('english', $2))"
+    )
+    assert params.values == ["bank", "!reli:*"]
+
+def test_tsquery_alternatives_are_parenthesised():
+    params = db.QueryParams()
+    assert tsquery_sql(params, "reli* OR bank rate") == (
+        "((to_tsquery('english', $1)) || (websearch_to_tsquery('english', $2)))"
+    )
+    assert params.values == ["reli:*", "bank rate"]
+
+@pytest.mark.parametrize("q", ["", "  ", "OR", "OR OR"])
+def test_tsquery_without_terms(q):
+    assert tsquery_sql(db.QueryParams(), q) is None
+
+# What Postgres makes of it: websearch_to_tsquery's own reading, plus :* on prefix words
+TSQUERY_CASES = [
+    ("repo rate", "'repo' & 'rate'"),
+    ('"repo rate" -cut', "'repo' <-> 'rate' & !'cut'"),
+    ('"repo rate', "'repo' <-> 'rate'"),
+    ("-reli* bank", "'bank' & !'reli':*"),
+    ("reli* OR bank", "'reli':* | 'bank'"),
+    ("a rbi OR sensex nifty*", "'rbi' | 'sensex' & 'nifti':*"),
+    ('-"repo OR rate" bank', "!( 'repo' <2> 'rate' ) & 'bank'"), # "or" is a stop word inside the phrase
+]
+
+@pytest.mark.skipif(not os.getenv("DATABASE_URL"), reason="DATABASE_URL is not set")
+@pytest.mark.parametrize("q, expected", TSQUERY_CASES, ids=[case[0] for case in TSQUERY_CASES])
+def test_tsquery_in_postgres(q, expected):
+    async def check():
+        conn = await asyncpg.connect(os.environ["DATABASE_URL"])
+        try:
+            params = db.QueryParams()
+            return await conn.fetchval(f"SELECT ({tsquery_sql(params, q)})::text", *params.values)
+        finally:
+            await conn.close()
+    assert asyncio.run(check()) == expected